@@ -1,18 +1,27 @@
 import streamlit as st
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import pandas as pd
 from utils.data_fetcher import CryptoDataFetcher
 from utils.technical_analysis import TechnicalAnalyzer
 from utils.backtester import Backtester
-from utils.incremental_learner import IncrementalLearner
+from utils.model_registry import get_model_registry
+from utils.candle_stream import CandleStreamer, PollingCandleSource, get_streamer
+from utils.signal_scanner import scan
+from utils.results_server import ResultsServer
+from utils.chart_downsampling import DEFAULT_CHART_WIDTH
+from utils.charts import ChartSettings, DashboardCharts
 import logging
-import time
+import os
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Precomputed results older than this many seconds are ignored
+RESULT_MAX_AGE = float(os.environ.get('RESULT_MAX_AGE', 300))
+# Seconds between two publishes of a pair's shared results
+RESULTS_INTERVAL = float(os.environ.get('RESULTS_INTERVAL', 60))
+
 st.set_page_config(page_title="Crypto Analysis Bot", layout="wide")
 
 # Initialize session state
@@ -28,11 +37,26 @@ if 'show_bb' not in st.session_state:
     st.session_state.show_bb = True
 if 'show_volume' not in st.session_state:
     st.session_state.show_volume = True
+if 'chart_width' not in st.session_state:
+    st.session_state.chart_width = DEFAULT_CHART_WIDTH
+if 'stream_key' not in st.session_state:
+    st.session_state.stream_key = None
+
+@st.cache_resource
+def get_data_fetcher():
+    # One fetcher per process: sessions share provider caches and in-flight requests
+    return CryptoDataFetcher()
+
+@st.cache_resource
+def get_results_server():
+    # One worker per viewed pair for the whole process; sessions only read
+    # what it publishes (or what `python -m utils.results_server` publishes)
+    return ResultsServer(fetcher=get_data_fetcher(), interval=RESULTS_INTERVAL)
 
 def initialize_learner(analyzer):
-    if st.session_state.learner is None:
-        st.session_state.learner = IncrementalLearner(analyzer.model)
-        st.session_state.learner.start()
+    # The registry keeps one learner per model, so the learner always trains
+    # the same instance the analyzer predicts with
+    st.session_state.learner = get_model_registry().get_learner(analyzer.model_key)
 
 def show_trading_guidance(price, signal_strength, rsi, macd):
     # Trading guidance container
@@ -108,17 +132,152 @@ def show_trading_guidance(price, signal_strength, rsi, macd):
         else:
             st.info("Monitor - No clear signal")
 
+def chart_columns(analyzer):
+    """Indicator columns the dashboard draws with the current overlay toggles"""
+    columns = list(analyzer.PANEL_COLUMNS)
+    if st.session_state.show_ma:
+        columns += analyzer.MA_COLUMNS
+    if st.session_state.show_bb:
+        columns += analyzer.BB_COLUMNS
+    return columns
+
+def chart_settings(coin, ma_colors):
+    state = st.session_state
+    return ChartSettings(coin, state.chart_type, state.show_ma, state.show_bb, state.show_volume,
+                         state.chart_width, tuple(ma_colors.items()))
+
+def build_dashboard(coin, df, signals, analyzer, backtester, ma_colors, backtest=None, data_key=None):
+    """
+    Figures and backtest metrics for one version of the data; backtest may be
+    precomputed. data_key names that version process-wide so sessions
+    showing the same data share its chart traces.
+    """
+    entry_points, exit_points = analyzer.get_signal_points(df, signals)
+
+    # The session's figures are only restyled when the chart settings change;
+    # new data is patched into their traces
+    if 'charts' not in st.session_state:
+        st.session_state.charts = DashboardCharts()
+    figures = st.session_state.charts.update(df, entry_points, exit_points, chart_settings(coin, ma_colors),
+                                             data_key=data_key)
+
+    if backtest is None:
+        backtest = backtester.run_backtest(df, signals)
+    return dict(figures, backtest=backtest)
+
+def render_dashboard(coin, df, signals, prediction, view):
+    # Main chart
+    st.subheader(f"{coin} Price Analysis")
+    st.plotly_chart(view['price'], use_container_width=True)
+
+    # Live Predictions and Signals
+    if prediction:
+        st.subheader("Live Trading Signals")
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            st.metric("Current Price", 
+                     f"${prediction['current_price']:.2f}",
+                     delta=f"{df['Price_Change'].iloc[-1]*100:.2f}%")
+
+        with col2:
+            predicted_change = prediction['predicted_change']
+            st.metric("Predicted Change", 
+                     f"{predicted_change:.2f}%",
+                     delta=f"{predicted_change:.2f}%")
+
+        with col3:
+            confidence = prediction['pattern_confidence']
+            st.metric("Signal Confidence", 
+                     f"{confidence:.1f}%")
+
+        with col4:
+            latest_signal = signals['Final_Signal'].iloc[-1]
+            signal_color = "green" if latest_signal == "BUY" else "red" if latest_signal == "SELL" else "gray"
+            st.markdown(f"<h1 style='text-align: center; color: {signal_color};'>{latest_signal}</h1>", 
+                      unsafe_allow_html=True)
+
+        if abs(predicted_change) > 5:
+            warning = f"ALERT: Strong {'upward' if predicted_change > 0 else 'downward'} movement expected!"
+            st.warning(warning)
+
+    # Technical Analysis Indicators
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("RSI")
+        st.plotly_chart(view['rsi'], use_container_width=True)
+
+    with col2:
+        st.subheader("MACD")
+        st.plotly_chart(view['macd'], use_container_width=True)
+
+    # Backtesting Results
+    st.subheader("Strategy Performance")
+    backtest_results = view['backtest']
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Return", f"{backtest_results['Total Return']:.2f}%")
+    with col2:
+        st.metric("Win Rate", f"{backtest_results['Win Rate']*100:.1f}%")
+    with col3:
+        st.metric("Max Drawdown", f"{backtest_results['Max Drawdown']:.2f}%")
+
+@st.fragment(run_every=1)
+def render_live(coin, streamer, analyzer, backtester, ma_colors):
+    # Pull only the candles the streamer wrote since the last run; the page
+    # itself is not rerun and nothing is rebuilt while the version is unchanged
+    state = st.session_state
+    if state.stream_key != (coin, id(streamer)):
+        state.stream_key = (coin, id(streamer))
+        state.stream_version = 0
+        state.stream_df = None
+        state.stream_signals = None
+        state.stream_view = None
+
+    delta, delta_signals, version = streamer.buffer.since(state.stream_version)
+    if version != state.stream_version:
+        if state.stream_df is None:
+            state.stream_df, state.stream_signals = delta, delta_signals
+        else:
+            # A delta can revise the newest candle, so drop the rows it replaces
+            keep = ~state.stream_df.index.isin(delta.index)
+            limit = streamer.buffer.capacity
+            state.stream_df = pd.concat([state.stream_df[keep], delta]).iloc[-limit:]
+            state.stream_signals = pd.concat([state.stream_signals[keep], delta_signals]).iloc[-limit:]
+        state.stream_version = version
+        state.stream_view = None
+
+    df, signals = state.stream_df, state.stream_signals
+    if df is None or df.empty:
+        st.info("Waiting for the first candles...")
+        return
+
+    settings = chart_settings(coin, ma_colors)
+    if state.stream_view is None or state.stream_view[0] != settings:
+        state.stream_view = (settings, build_dashboard(coin, df, signals, analyzer, backtester, ma_colors,
+                                                       data_key=('stream', id(streamer), version)))
+
+    st.caption(f"Last candle: {df.index[-1]} (stream version {version})")
+    render_dashboard(coin, df, signals, streamer.prediction, state.stream_view[1])
+
 
 def main():
     st.title("Cryptocurrency Analysis Bot")
 
     # Get list of supported coins from provider
-    data_fetcher = CryptoDataFetcher()
+    data_fetcher = get_data_fetcher()
     provider = data_fetcher.providers[1]  # Use Yahoo Finance provider for coin list
     available_coins = provider.get_supported_coins()
 
     # Sidebar controls
     st.sidebar.header("Configuration")
+    live_mode = st.sidebar.toggle(
+        "Live streaming mode",
+        value=True,
+        help="Update from a background candle stream instead of recomputing the whole page"
+    )
 
     # Advanced Settings
     with st.sidebar.expander("Advanced Chart Settings", expanded=False):
@@ -131,6 +290,10 @@ def main():
         st.session_state.show_ma = st.checkbox("Show Moving Averages", value=st.session_state.show_ma)
         st.session_state.show_bb = st.checkbox("Show Bollinger Bands", value=st.session_state.show_bb)
         st.session_state.show_volume = st.checkbox("Show Volume", value=st.session_state.show_volume)
+        st.session_state.chart_width = st.slider(
+            "Chart width (px)", 600, 3000, st.session_state.chart_width, step=100,
+            help="Charts are reduced to about one point per pixel and one candle per 4 pixels"
+        )
 
         # Color settings
         ma_colors = {
@@ -147,11 +310,6 @@ def main():
     )
 
     try:
-        analyzer = TechnicalAnalyzer()
-        backtester = Backtester()
-
-        initialize_learner(analyzer)
-
         # Get supported timeframes from data fetcher
         supported_timeframes = data_fetcher.get_supported_timeframes()
         timeframe = st.sidebar.selectbox(
@@ -160,211 +318,88 @@ def main():
             index=min(2, len(supported_timeframes)-1)
         )
 
-        with st.spinner('Fetching latest data...'):
-            df = data_fetcher.get_historical_data(coin.lower(), timeframe)
+        if st.sidebar.button("Scan all coins", help=f"Current signal of every coin on the {timeframe} timeframe"):
+            with st.spinner('Scanning...'):
+                st.subheader(f"Signal Scanner ({timeframe})")
+                st.dataframe(scan(data_fetcher, available_coins, [timeframe]), hide_index=True)
 
-            if df.empty:
-                st.error("Unable to fetch data. Please try again in a few minutes (rate limit reached).")
-                return
-
-            df = analyzer.calculate_indicators(df)
-            signals, prediction = analyzer.generate_signals(df)
-
-            if signals.empty:
-                st.error("Unable to generate trading signals.")
-                return
-
-            entry_points, exit_points = analyzer.get_entry_exit_points(df, signals)
+        analyzer = TechnicalAnalyzer(coin.lower(), timeframe)
+        backtester = Backtester()
 
-            # Show trading guidance in sidebar
-            if prediction:
+        initialize_learner(analyzer)
+        learner_stats = st.session_state.learner.get_stats()
+        if learner_stats['updates']:
+            st.sidebar.caption(
+                f"Model updates: {learner_stats['updates']} · loss {learner_stats['last_loss']:.5f} · "
+                f"{learner_stats['samples_per_second']:.0f} samples/s"
+            )
+
+        if live_mode:
+            streamer = get_streamer(
+                (coin.lower(), timeframe),
+                # The streamer feeds the learner, once per candle for all viewers
+                lambda: CandleStreamer(analyzer, PollingCandleSource(data_fetcher, coin.lower(), timeframe),
+                                       learner=st.session_state.learner)
+            )
+            if streamer.prediction:
+                # Sidebar guidance follows full page runs; the fragment below refreshes the rest
+                latest = streamer.engine.latest
                 show_trading_guidance(
-                    prediction['current_price'],
-                    prediction['pattern_confidence'],
-                    df['RSI'].iloc[-1],
-                    df['MACD'].iloc[-1]
+                    streamer.prediction['current_price'],
+                    streamer.prediction['pattern_confidence'],
+                    latest.get('RSI', float('nan')),
+                    latest.get('MACD', float('nan'))
                 )
-
-            if len(df) >= 30:
-                features = df[['close', 'RSI', 'MACD', 'volume', 'Price_Change']].values[-30:]
-                label = df['Price_Change'].iloc[-1]
-                st.session_state.learner.add_training_data(features, label)
-
-        st.sidebar.write(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-        # Main chart
-        st.subheader(f"{coin} Price Analysis")
-        fig = go.Figure()
-
-        # Base chart based on type
-        if st.session_state.chart_type == 'candlestick':
-            fig.add_trace(go.Candlestick(
-                x=df.index,
-                open=df['open'],
-                high=df['high'],
-                low=df['low'],
-                close=df['close'],
-                name="Price"
-            ))
-        elif st.session_state.chart_type == 'line':
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['close'],
-                name="Price",
-                line=dict(color='#00BCD4')
-            ))
-        elif st.session_state.chart_type == 'area':
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['close'],
-                fill='tonexty',
-                name="Price",
-                line=dict(color='#00BCD4')
-            ))
-        else:  # scatter
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df['close'],
-                mode='markers',
-                name="Price",
-                marker=dict(color='#00BCD4')
-            ))
-
-        # Add technical indicators based on settings
-        if st.session_state.show_ma and all(col in df.columns for col in ['MA20', 'MA50', 'MA200']):
-            fig.add_trace(go.Scatter(x=df.index, y=df['MA20'], 
-                               name="20 MA", line=dict(color=ma_colors['MA20'])))
-            fig.add_trace(go.Scatter(x=df.index, y=df['MA50'], 
-                               name="50 MA", line=dict(color=ma_colors['MA50'])))
-            fig.add_trace(go.Scatter(x=df.index, y=df['MA200'], 
-                               name="200 MA", line=dict(color=ma_colors['MA200'])))
-
-        if st.session_state.show_bb and all(col in df.columns for col in ['BB_upper', 'BB_middle', 'BB_lower']):
-            fig.add_trace(go.Scatter(x=df.index, y=df['BB_upper'], 
-                               name="BB Upper", line=dict(color='gray', dash='dash')))
-            fig.add_trace(go.Scatter(x=df.index, y=df['BB_lower'], 
-                               name="BB Lower", line=dict(color='gray', dash='dash')))
-
-        # Add entry/exit points
-        if entry_points:
-            fig.add_trace(go.Scatter(
-                x=[p['timestamp'] for p in entry_points],
-                y=[p['price'] for p in entry_points],
-                mode='markers+text',
-                name='Buy Signal',
-                marker=dict(symbol='triangle-up', size=15, color='green'),
-                text=['BUY HERE' for _ in entry_points],
-                textposition='top center'
-            ))
-
-        if exit_points:
-            fig.add_trace(go.Scatter(
-                x=[p['timestamp'] for p in exit_points],
-                y=[p['price'] for p in exit_points],
-                mode='markers+text',
-                name='Sell Signal',
-                marker=dict(symbol='triangle-down', size=15, color='red'),
-                text=['SELL HERE' for _ in exit_points],
-                textposition='bottom center',
-                textfont=dict(color='red', size=12)
-            ))
-
-        # Volume subplot if enabled
-        if st.session_state.show_volume:
-            fig.add_trace(go.Bar(
-                x=df.index,
-                y=df['volume'],
-                name='Volume',
-                marker_color='rgba(128,128,128,0.5)',
-                yaxis='y2'
-            ))
-
-        # Layout updates
-        fig.update_layout(
-            title=f"{coin} Price Chart with Trading Signals",
-            yaxis_title="Price (USD)",
-            xaxis_title="Date",
-            height=600,
-            template='plotly_dark',
-            hovermode='x unified',
-            yaxis2=dict(
-                title="Volume",
-                overlaying="y",
-                side="right",
-                showgrid=False
-            ) if st.session_state.show_volume else None
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Live Predictions and Signals
+            st.sidebar.write(f"Streaming since: {st.session_state.last_update.strftime('%Y-%m-%d %H:%M:%S')}")
+            render_live(coin, streamer, analyzer, backtester, ma_colors)
+            return
+
+        # Every session viewing this pair reads the same published result
+        with st.spinner('Waiting for shared results...'):
+            result = get_results_server().latest(coin.lower(), timeframe, wait=30, max_age=RESULT_MAX_AGE)
+        if result is not None:
+            df, signals, prediction, backtest = result.df, result.signals, result.prediction, result.backtest
+            updated = datetime.fromtimestamp(result.created_at)
+            data_key = ('result', coin.lower(), timeframe, result.version)
+        else:
+            with st.spinner('Fetching latest data...'):
+                df = data_fetcher.get_historical_data(coin.lower(), timeframe)
+
+                if df.empty:
+                    st.error("Unable to fetch data. Please try again in a few minutes (rate limit reached).")
+                    return
+
+                # Only what is on screen is computed here; generate_signals pulls
+                # in the columns its rules and the model features need
+                df = analyzer.calculate_indicators(df, columns=chart_columns(analyzer))
+                signals, prediction = analyzer.generate_signals(df)
+                backtest = None
+                updated = datetime.now()
+                data_key = None
+
+        if signals.empty:
+            st.error("Unable to generate trading signals.")
+            return
+
+        # Show trading guidance in sidebar
         if prediction:
-            st.subheader("Live Trading Signals")
-            col1, col2, col3, col4 = st.columns(4)
-
-            with col1:
-                st.metric("Current Price", 
-                         f"${prediction['current_price']:.2f}",
-                         delta=f"{df['Price_Change'].iloc[-1]*100:.2f}%")
-
-            with col2:
-                predicted_change = prediction['predicted_change']
-                st.metric("Predicted Change", 
-                         f"{predicted_change:.2f}%",
-                         delta=f"{predicted_change:.2f}%")
-
-            with col3:
-                confidence = prediction['pattern_confidence']
-                st.metric("Signal Confidence", 
-                         f"{confidence:.1f}%")
-
-            with col4:
-                latest_signal = signals['Final_Signal'].iloc[-1]
-                signal_color = "green" if latest_signal == "BUY" else "red" if latest_signal == "SELL" else "gray"
-                st.markdown(f"<h1 style='text-align: center; color: {signal_color};'>{latest_signal}</h1>", 
-                          unsafe_allow_html=True)
-
-            if abs(predicted_change) > 5:
-                warning = f"ALERT: Strong {'upward' if predicted_change > 0 else 'downward'} movement expected!"
-                st.warning(warning)
-
-        # Technical Analysis Indicators
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.subheader("RSI")
-            fig_rsi = go.Figure()
-            fig_rsi.add_trace(go.Scatter(x=df.index, y=df['RSI'], name="RSI"))
-            fig_rsi.add_hline(y=70, line_dash="dash", line_color="red")
-            fig_rsi.add_hline(y=30, line_dash="dash", line_color="green")
-            fig_rsi.update_layout(height=300, template='plotly_dark')
-            st.plotly_chart(fig_rsi, use_container_width=True)
-
-        with col2:
-            st.subheader("MACD")
-            fig_macd = go.Figure()
-            fig_macd.add_trace(go.Scatter(x=df.index, y=df['MACD'], name="MACD"))
-            if 'MACD_Signal' in df.columns:
-                fig_macd.add_trace(go.Scatter(x=df.index, y=df['MACD_Signal'], name="Signal"))
-            if 'MACD_Hist' in df.columns:
-                fig_macd.add_bar(x=df.index, y=df['MACD_Hist'], name="Histogram")
-            fig_macd.update_layout(height=300, template='plotly_dark')
-            st.plotly_chart(fig_macd, use_container_width=True)
-
-        # Backtesting Results
-        st.subheader("Strategy Performance")
-        backtest_results = backtester.run_backtest(df, signals)
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Return", f"{backtest_results['Total Return']:.2f}%")
-        with col2:
-            st.metric("Win Rate", f"{backtest_results['Win Rate']*100:.1f}%")
-        with col3:
-            st.metric("Max Drawdown", f"{backtest_results['Max Drawdown']:.2f}%")
-
-        time.sleep(1)  # 1-second refresh rate
-        st.rerun()
+            show_trading_guidance(
+                prediction['current_price'],
+                prediction['pattern_confidence'],
+                df['RSI'].iloc[-1],
+                df['MACD'].iloc[-1]
+            )
+
+        # Candles no other session or run has trained on yet
+        analyzer.feature_window(df)
+        windows, labels = analyzer.training_windows()
+        for window, label in zip(windows, labels):
+            st.session_state.learner.add_training_data(window, label)
+
+        st.sidebar.write(f"Last updated: {updated.strftime('%Y-%m-%d %H:%M:%S')}")
+
+        view = build_dashboard(coin, df, signals, analyzer, backtester, ma_colors, backtest, data_key)
+        render_dashboard(coin, df, signals, prediction, view)
 
     except Exception as e:
         logger.error(f"Error in main app: {str(e)}")
@@ -0,0 +1,89 @@
+"""
+Compare the vectorized Backtester.run_backtest with the previous
+iterrows-based implementation on synthetic random-walk data.
+
+    python -m benchmarks.backtest_benchmark --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.backtester import Backtester
+
+
+def legacy_run_backtest(df, signals, initial_capital=10000):
+    """The per-row loop run_backtest used before vectorization"""
+    capital = initial_capital
+    position = 0
+    trades = []
+    portfolio_value = [capital]
+
+    for idx, row in signals.iterrows():
+        price = df.loc[idx, 'close']
+        if row['Final_Signal'] == 'BUY' and position == 0:
+            position = capital / price
+            trades.append({'type': 'BUY', 'price': price, 'position': position})
+        elif row['Final_Signal'] == 'SELL' and position > 0:
+            capital = position * price
+            position = 0
+            trades.append({'type': 'SELL', 'price': price, 'capital': capital})
+        portfolio_value.append(capital if position == 0 else position * price)
+
+    returns = np.array(portfolio_value) / initial_capital - 1
+    trade_pairs = len(trades) // 2
+    profitable = sum(
+        1 for i in range(0, len(trades) - 1, 2)
+        if trades[i + 1]['capital'] > trades[i]['position'] * trades[i]['price']
+    )
+    peak = np.maximum.accumulate(portfolio_value)
+    drawdown = (peak - portfolio_value) / np.where(peak == 0, 1, peak)
+    return {
+        'Total Return': returns[-1] * 100,
+        'Win Rate': profitable / trade_pairs if trade_pairs else 0.0,
+        'Max Drawdown': np.max(drawdown) * 100,
+        'Number of Trades': len(trades),
+    }
+
+
+def make_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=n, freq='1min')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    df = pd.DataFrame({'close': close}, index=index)
+    signals = pd.DataFrame({
+        'Final_Signal': rng.choice(['BUY', 'SELL', 'HOLD'], size=n, p=[0.05, 0.05, 0.9])
+    }, index=index)
+    return df, signals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--legacy-max', type=int, default=1_000_000,
+                        help='skip the slow legacy loop above this many bars')
+    args = parser.parse_args()
+
+    backtester = Backtester()
+    print(f"{'bars':>10} {'vectorized':>12} {'legacy':>12} {'speedup':>9}")
+    for n in args.sizes:
+        df, signals = make_data(n)
+
+        start = time.perf_counter()
+        result = backtester.run_backtest(df, signals)
+        vectorized = time.perf_counter() - start
+
+        if n <= args.legacy_max:
+            start = time.perf_counter()
+            expected = legacy_run_backtest(df, signals)
+            legacy = time.perf_counter() - start
+            for key, value in expected.items():
+                assert np.isclose(result[key], value, rtol=1e-9), (key, result[key], value)
+            print(f"{n:>10} {vectorized:>11.4f}s {legacy:>11.4f}s {legacy / vectorized:>8.1f}x")
+        else:
+            print(f"{n:>10} {vectorized:>11.4f}s {'-':>12} {'-':>9}")
+
+
+if __name__ == '__main__':
+    main()
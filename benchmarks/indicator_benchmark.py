@@ -0,0 +1,92 @@
+"""
+Compare the indicator kernel registry with the previous pandas
+calculate_indicators on synthetic random-walk candles.
+
+    python -m benchmarks.indicator_benchmark --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.indicators import DEFAULT_INDICATORS, HAS_NUMBA, compute_indicators, get_indicator_cache
+
+
+def legacy_calculate_indicators(df):
+    """The pandas rolling/ewm implementation calculate_indicators used before the registry"""
+    df['MA20'] = df['close'].rolling(window=20).mean()
+    df['MA50'] = df['close'].rolling(window=50).mean()
+    df['MA200'] = df['close'].rolling(window=200).mean()
+
+    std20 = df['close'].rolling(window=20).std()
+    df['BB_middle'] = df['MA20']
+    df['BB_upper'] = df['BB_middle'] + 2*std20
+    df['BB_lower'] = df['BB_middle'] - 2*std20
+
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    df['RSI'] = 100 - (100 / (1 + gain / loss))
+
+    exp1 = df['close'].ewm(span=12, adjust=False).mean()
+    exp2 = df['close'].ewm(span=26, adjust=False).mean()
+    df['MACD'] = exp1 - exp2
+    df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
+    df['MACD_Hist'] = df['MACD'] - df['MACD_Signal']
+    return df
+
+
+def make_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=n, freq='1min')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spread = close * rng.uniform(0, 0.002, n)
+    return pd.DataFrame({
+        'open': close, 'high': close + spread, 'low': close - spread, 'close': close,
+        'volume': rng.uniform(1, 100, n),
+    }, index=index)
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cache = get_indicator_cache()
+    print(f"numba kernels: {'yes' if HAS_NUMBA else 'no (NumPy fallback)'}")
+    print(f"{'rows':>10} {'pandas':>10} {'kernels':>10} {'cached':>10} {'speedup':>9} {'max rel err':>12}")
+    for n in args.sizes:
+        df = make_data(n)
+
+        legacy, expected = timed(lambda: legacy_calculate_indicators(df.copy()), args.repeat)
+
+        def cold():
+            cache.clear()
+            return compute_indicators(df, DEFAULT_INDICATORS)
+        kernel, result = timed(cold, args.repeat)
+        warm, _ = timed(lambda: compute_indicators(df, DEFAULT_INDICATORS), args.repeat)
+
+        error = 0.0
+        for column, values in result.items():
+            reference = expected[column].to_numpy()
+            assert np.array_equal(np.isnan(values), np.isnan(reference)), column
+            mask = ~np.isnan(reference)
+            error = max(error, float(np.max(
+                np.abs(values[mask] - reference[mask]) / np.maximum(1.0, np.abs(reference[mask]))
+            )))
+        print(f"{n:>10} {legacy:>9.4f}s {kernel:>9.4f}s {warm:>9.4f}s {legacy / kernel:>8.1f}x {error:>12.1e}")
+
+
+if __name__ == '__main__':
+    main()
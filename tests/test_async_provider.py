@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import pandas as pd
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from utils.data_fetcher import CryptoDataFetcher
+from utils.data_providers import CoinGeckoProvider
+from utils.data_providers.async_provider import AsyncCoinGeckoProvider
+from utils.frame_cache import FrameCache
+from utils.rate_limiter import TokenBucket
+
+
+def market_chart(hours=96):
+    start = pd.Timestamp('2024-01-01').value // 10**6
+    return {'prices': [[start + i * 3_600_000, 100.0 + i] for i in range(hours)]}
+
+
+async def answer(request):
+    return web.json_response(market_chart())
+
+
+def stub_provider(server, timeout=5.0):
+    """Async CoinGecko client pointed at server, with its own cache and an unthrottled bucket"""
+    provider = CoinGeckoProvider()
+    provider.frame_cache = FrameCache()
+    provider._rate_limiter = TokenBucket('stub', rate=1000, capacity=100, state_dir=None)
+    return AsyncCoinGeckoProvider(provider, base_url=str(server.make_url('')), timeout=timeout)
+
+
+def serve(handler):
+    app = web.Application()
+    app.router.add_get('/coins/{coin}/market_chart', handler)
+    return TestServer(app)
+
+
+def test_fetch_from_stub_server_reuses_one_session():
+    async def run():
+        async with serve(answer) as server, stub_provider(server) as client:
+            first = await client.get_historical_data('bitcoin', '1d')
+            session = client._session
+            client.provider.frame_cache = FrameCache()  # force a second request
+            second = await client.get_historical_data('bitcoin', '1d')
+            return first, second, session is client._session
+
+    first, second, reused = asyncio.run(run())
+    assert not first.empty and len(first) == len(second)
+    assert reused
+
+
+def test_slow_server_times_out_with_an_empty_frame():
+    async def slow(request):
+        await asyncio.sleep(3)
+        return await answer(request)
+
+    async def run():
+        async with serve(slow) as server, stub_provider(server, timeout=0.2) as client:
+            start = time.perf_counter()
+            df = await client.get_historical_data('bitcoin', '1d')
+            return df, time.perf_counter() - start
+
+    df, elapsed = asyncio.run(run())
+    assert df.empty
+    assert elapsed < 2
+
+
+def test_429_blocks_the_bucket_for_retry_after():
+    async def limited(request):
+        return web.Response(status=429, headers={'Retry-After': '60'})
+
+    async def run():
+        async with serve(limited) as server, stub_provider(server) as client:
+            return await client.get_historical_data('bitcoin', '1d'), client.provider
+
+    df, provider = asyncio.run(run())
+    assert df.empty
+    assert provider.rate_limited
+    assert provider.rate_limiter.wait_time() > 50
+
+
+def test_first_answer_wins_and_the_slower_request_is_cancelled():
+    cancelled = []
+
+    async def slow(request):
+        await asyncio.sleep(3)
+        return await answer(request)
+
+    async def run():
+        async with serve(answer) as fast_server, serve(slow) as slow_server, \
+                stub_provider(fast_server) as fast, stub_provider(slow_server) as slower:
+            fetch = slower._fetch
+
+            async def tracked(*args):
+                try:
+                    return await fetch(*args)
+                except asyncio.CancelledError:
+                    cancelled.append(args)
+                    raise
+            slower._fetch = tracked
+
+            fetcher = object.__new__(CryptoDataFetcher)
+            fetcher.async_providers = [slower, fast]
+            start = time.perf_counter()
+            df = await fetcher.get_historical_data_async('bitcoin', '1d')
+            elapsed = time.perf_counter() - start
+            await asyncio.sleep(0)  # let the cancellation reach the slower fetch
+            return df, elapsed
+
+    df, elapsed = asyncio.run(run())
+    assert not df.empty
+    assert elapsed < 2
+    assert cancelled == [('bitcoin', '1d')]
+
+
+def test_new_event_loop_closes_the_previous_session():
+    async def fetch(client):
+        await client.get_historical_data('bitcoin', '1d')
+        return client._session
+
+    async def run_twice():
+        async with serve(answer) as server:
+            client = stub_provider(server)
+            session = await fetch(client)
+            # Pretend the next call comes from another event loop
+            client._loop = None
+            client.provider.frame_cache = FrameCache()
+            await fetch(client)
+            await client.close()
+            return session
+
+    assert asyncio.run(run_twice()).closed
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from utils.candle_stream import CandleStreamer, ReplayCandleSource
+from utils.indicators import DEFAULT_INDICATORS, compute_indicators
+
+
+class StubAnalyzer:
+    """Indicator and signal columns without the model"""
+
+    def calculate_indicators(self, df):
+        for column, values in compute_indicators(df, DEFAULT_INDICATORS).items():
+            df[column] = values
+        return df
+
+    def compute_signals(self, df):
+        vote = np.sign(df['close'] - df['MA50']).fillna(0)
+        return pd.DataFrame({
+            'MA_Signal': vote, 'RSI_Signal': 0, 'MACD_Signal': 0,
+            'Signal_Strength': vote, 'Confidence': vote.abs() / 3 * 100,
+            'Final_Signal': np.where(vote.abs() >= 2, 'BUY', 'HOLD'),
+        }, index=df.index)
+
+    def _generate_prediction(self, df):
+        return None
+
+
+def make_candles(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                         'volume': 1.0, 'Price_Change': 0.0},
+                        index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+def test_poll_repeating_last_seeded_candle_then_new_one():
+    df = make_candles()
+    streamer = CandleStreamer(StubAnalyzer(), ReplayCandleSource(df, warmup=250))
+    streamer.seed()
+    seeded = streamer.buffer.version
+
+    revised = df.iloc[249:251].copy()
+    revised.iloc[0, revised.columns.get_loc('close')] += 2.0
+    assert streamer.process(revised) == 2
+
+    rows, _, version = streamer.buffer.since(seeded)
+    assert version > seeded
+    assert list(rows.index) == list(df.index[249:251])
+    assert rows['close'].iloc[0] == revised['close'].iloc[0]
+
+    expected = StubAnalyzer().calculate_indicators(pd.concat([df.iloc[:249], revised]))
+    for column in ('MA20', 'MA50', 'RSI', 'MACD', 'MACD_Signal'):
+        np.testing.assert_allclose(rows[column].to_numpy(), expected[column].iloc[-2:].to_numpy(), rtol=1e-9)
+
+
+def assert_matches_batch(streamer, df, rows):
+    stored, _, _ = streamer.buffer.since(0)
+    expected = StubAnalyzer().calculate_indicators(df.copy())
+    assert list(stored.index[-rows:]) == list(df.index[-rows:])
+    for column in ('MA20', 'MA50', 'MA200', 'RSI', 'MACD', 'MACD_Signal', 'BB_upper'):
+        np.testing.assert_allclose(stored[column].iloc[-rows:].to_numpy(),
+                                   expected[column].iloc[-rows:].to_numpy(), rtol=1e-9)
+
+
+def test_polls_with_more_than_tail_candles_are_applied_in_full():
+    df = make_candles()
+    source = ReplayCandleSource(df, warmup=252, batch=12)
+    streamer = CandleStreamer(StubAnalyzer(), source)
+    streamer.seed()
+
+    while (candles := source.poll(streamer._last_ts)) is not None:
+        assert len(candles) == 13  # the last processed candle and 12 new ones, over the default tail of 5
+        streamer.process(candles)
+
+    assert streamer.buffer.size == len(df)
+    assert_matches_batch(streamer, df, 60)
+
+
+def test_gap_after_the_last_candle_reseeds_from_history():
+    df = make_candles()
+    source = ReplayCandleSource(df, warmup=250)
+    streamer = CandleStreamer(StubAnalyzer(), source)
+    streamer.seed()
+
+    source.position = 256  # the source moved on while polls were missed
+    assert streamer.process(df.iloc[253:256]) == 7  # the last seeded candle and 250..255
+    assert streamer._last_ts == df.index[255]
+    assert_matches_batch(streamer, df.iloc[:256], 20)
+
+    # Back in step: the next poll continues from the reseeded state
+    streamer.process(source.poll(streamer._last_ts))
+    assert_matches_batch(streamer, df.iloc[:257], 20)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from utils.chart_downsampling import downsample_line, downsample_ohlc, lttb_indices
+
+
+def hourly(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(n).cumsum()
+    index = pd.date_range('2024-01-01', periods=n, freq='h')
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                         'volume': 1.0}, index=index)
+
+
+def test_line_stays_within_the_target_and_keeps_the_ends():
+    df = hourly(5000)
+    ma = df['close'].rolling(200).mean()
+    x, y = downsample_line(df.index, ma, 300)
+    assert len(x) <= 300
+    assert x[0] == ma.first_valid_index() and x[-1] == df.index[-1]
+    assert not np.isnan(y).any()
+
+
+def test_appending_a_candle_only_changes_the_last_points():
+    df = hourly(5001)
+    before, after = df.iloc[:-1], df
+    old_x, old_y = downsample_line(before.index, before['close'], 300)
+    new_x, new_y = downsample_line(after.index, after['close'], 300)
+    # The neighbours of the last bucket may pick another point; everything before is unchanged
+    assert old_x[:-3].equals(new_x[:len(old_x) - 3])
+    np.testing.assert_array_equal(old_y[:-3], new_y[:len(old_y) - 3])
+
+    old_candles, new_candles = downsample_ohlc(before, 200), downsample_ohlc(after, 200)
+    assert len(new_candles) <= 200
+    pd.testing.assert_frame_equal(old_candles.iloc[:-1], new_candles.iloc[:len(old_candles) - 1])
+
+
+def test_merged_candles_cover_every_row():
+    df = hourly(1000)
+    candles = downsample_ohlc(df, 64)
+    assert candles['volume'].sum() == len(df)
+    assert candles['high'].max() == df['high'].max() and candles['low'].min() == df['low'].min()
+    assert candles['open'].iloc[0] == df['open'].iloc[0] and candles['close'].iloc[-1] == df['close'].iloc[-1]
+
+
+def test_lttb_keeps_a_lone_spike():
+    values = np.zeros(1000)
+    values[437] = 50.0
+    assert 437 in lttb_indices(values, 50)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from utils.feature_scaler import FEATURE_COLUMNS
+from utils.feature_windows import FeatureWindowBuffer
+
+
+def make_features(n):
+    index = pd.date_range('2024-01-01', periods=n, freq='h')
+    values = np.random.default_rng(0).random((n, len(FEATURE_COLUMNS)))
+    return pd.DataFrame(values, index=index, columns=FEATURE_COLUMNS)
+
+
+def test_returned_rows_survive_compaction():
+    df = make_features(200)
+    buffer = FeatureWindowBuffer(capacity=64, window=30)
+    written = buffer.append(df.iloc[:60])
+    latest, windows = buffer.latest(), buffer.windows(5)
+    expected = latest.copy(), windows.copy(), written.copy()
+
+    buffer.append(df.iloc[60:100])  # overflows and moves the newest rows to the front
+
+    for returned, before in zip((latest, windows, written), expected):
+        np.testing.assert_array_equal(returned, before)
+    np.testing.assert_array_equal(buffer.latest(), df.iloc[70:100].to_numpy(dtype=np.float32))
+
+
+def test_each_training_sample_is_claimed_once_with_the_next_rows_label():
+    df = make_features(200)
+    buffer = FeatureWindowBuffer(capacity=64, window=30)
+    buffer.append(df.iloc[:50])
+    windows, labels = buffer.claim_training('Price_Change')
+    assert len(windows) == 0  # the seeded history is not trained on
+
+    buffer.append(df.iloc[50:53])
+    buffer.append(df.iloc[52:53])  # a revision of the forming candle adds nothing
+    windows, labels = buffer.claim_training('Price_Change')
+    # Rows 49..51 closed; row 52 is still forming
+    assert len(windows) == 3
+    np.testing.assert_array_equal(windows[0], df.iloc[19:49].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(labels, df['Price_Change'].iloc[49:52].to_numpy(dtype=np.float32))
+    assert len(buffer.claim_training('Price_Change')[0]) == 0
+
+    buffer.append(df.iloc[53:70])  # compacts
+    windows, labels = buffer.claim_training('Price_Change')
+    np.testing.assert_array_equal(labels, df['Price_Change'].iloc[52:69].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(windows[-1], df.iloc[38:68].to_numpy(dtype=np.float32))
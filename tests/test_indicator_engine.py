@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.indicator_engine import TOLERANCE, StreamingIndicators
+
+
+def make_candles(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0},
+                        index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+def assert_close(actual, expected):
+    for name, value in expected.items():
+        if math.isnan(value):
+            assert math.isnan(actual[name]), name
+        else:
+            assert abs(actual[name] - value) <= TOLERANCE * max(1.0, abs(value)), name
+
+
+def test_revise_last_candle_right_after_seed():
+    df = make_candles()
+    revised = df.iloc[:250].copy()
+    revised.iloc[-1, revised.columns.get_loc('close')] += 3.0
+
+    engine = StreamingIndicators()
+    engine.seed(df.iloc[:250])
+    latest = engine.update(revised.iloc[-1], replace_last=True)
+
+    reference = StreamingIndicators()
+    assert_close(latest, reference.seed(revised))
+
+    # The engine keeps advancing normally after the revision
+    reference_next = reference.update(df.iloc[250])
+    assert_close(engine.update(df.iloc[250]), reference_next)
+
+
+def test_revise_after_seeding_a_single_candle():
+    df = make_candles(2)
+    engine = StreamingIndicators()
+    engine.seed(df.iloc[:1])
+    latest = engine.update(df.iloc[1], replace_last=True)
+    assert_close(latest, StreamingIndicators().seed(df.iloc[1:2]))
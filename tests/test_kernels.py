@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.indicators import kernels
+
+WINDOW = 14
+
+
+def series_with_gaps(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    x = 100 + np.cumsum(rng.normal(size=n))
+    x[[5, 60, 61, 200, n - 1]] = np.nan
+    return x
+
+
+# Each kernel as the NumPy and (when installed) numba implementations, next to the pandas formula it replaced
+PANDAS = {
+    'sma': lambda s: s.rolling(WINDOW).mean(),
+    'rolling_std': lambda s: s.rolling(WINDOW).std(),
+    'rolling_max': lambda s: s.rolling(WINDOW).max(),
+    'rolling_min': lambda s: s.rolling(WINDOW).min(),
+}
+IMPLEMENTATIONS = {
+    'numpy': {
+        'sma': lambda x: kernels._sma_numpy(x, WINDOW),
+        'rolling_std': lambda x: kernels._rolling_std_numpy(x, WINDOW),
+        'rolling_max': lambda x: kernels._rolling_max_numpy(x, WINDOW),
+        'rolling_min': lambda x: kernels._rolling_min_numpy(x, WINDOW),
+    },
+}
+if kernels.HAS_NUMBA:
+    IMPLEMENTATIONS['numba'] = {
+        'sma': lambda x: kernels._sma_loop(x, WINDOW),
+        'rolling_std': lambda x: kernels._rolling_std_loop(x, WINDOW),
+        'rolling_max': lambda x: kernels._rolling_extreme_loop(x, WINDOW, 1.0),
+        'rolling_min': lambda x: kernels._rolling_extreme_loop(x, WINDOW, -1.0),
+    }
+
+
+@pytest.mark.parametrize('implementation', sorted(IMPLEMENTATIONS))
+@pytest.mark.parametrize('kernel', sorted(PANDAS))
+def test_windowed_kernels_match_pandas_on_data_with_nans(implementation, kernel):
+    x = series_with_gaps()
+    expected = PANDAS[kernel](pd.Series(x)).to_numpy()
+    actual = IMPLEMENTATIONS[implementation][kernel](x)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, equal_nan=True)
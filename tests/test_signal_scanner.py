@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from utils.signal_scanner import scan
+
+
+class StubFetcher:
+    """get_many over fixed frames"""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_many(self, pairs):
+        frames = {pair: self.frames.get(pair[0], pd.DataFrame()) for pair in pairs}
+        return frames, {pair: {'source': 'stub', 'latency': 0.0, 'attempts': 1} for pair in pairs}
+
+
+def candles(close):
+    return pd.DataFrame({'close': close}, index=pd.date_range('2024-01-01', periods=len(close), freq='h'))
+
+
+def test_bearish_agreement_is_a_sell_ranked_with_the_buys():
+    # A zigzag with an accelerating drift: the close leaves its MA, MACD leaves
+    # its signal line the same way, and RSI stays in its neutral band
+    i = np.arange(120)
+    drift = np.where(i % 2 == 0, 3.0, -3.0) - 0.3 - 0.004 * i
+    fetcher = StubFetcher({
+        'down': candles(200 + np.cumsum(drift)),
+        'up': candles(100 - np.cumsum(drift)),
+        'flat': candles(np.full(120, 100.0)),
+    })
+    table = scan(fetcher, ['flat', 'down', 'up'])
+
+    signals = dict(zip(table['coin'], table['signal']))
+    assert signals['down'] == 'SELL' and signals['up'] == 'BUY' and signals['flat'] == 'HOLD'
+    assert table['coin'].iloc[-1] == 'flat'
+    np.testing.assert_allclose(table.loc[table['signal'] != 'HOLD', 'confidence'], 200 / 3)
@@ -0,0 +1,319 @@
+"""
+Headless fetch -> indicators -> signals and prediction -> backtest runs.
+
+AnalysisPipeline runs the stages the dashboard runs, without Streamlit,
+for one (coin, timeframe) pair or for many fetched together through
+CryptoDataFetcher.get_many. Results go to a ResultStore directory, which
+the dashboard reads instead of computing per viewer, or to stdout as JSON
+lines. With --interval the run repeats on a fixed schedule.
+
+    python -m utils.analysis_pipeline --coins btc eth --timeframes 1h --store ~/.aphator/results
+    python -m utils.analysis_pipeline --timeframes 1h 1d --store results --format parquet --interval 60
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtester import TRADE_DTYPE, Backtester
+from .data_fetcher import CryptoDataFetcher
+from .data_providers import YahooFinanceProvider
+from .technical_analysis import TechnicalAnalyzer
+
+DEFAULT_RESULTS_DIR = os.environ.get(
+    'RESULTS_DIR', os.path.join(os.path.expanduser('~'), '.aphator', 'results')
+)
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+try:
+    import fcntl
+except ImportError:  # saves are then only safe from a single writer
+    fcntl = None
+
+_SIGNAL_PREFIX = 'signal:'
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+
+class AnalysisResult:
+    """Everything one dashboard render needs for a (coin, timeframe) pair"""
+
+    def __init__(self, coin: str, timeframe: str, df: pd.DataFrame, signals: pd.DataFrame,
+                 prediction: Optional[dict], backtest: dict, timings: Optional[Dict[str, float]] = None,
+                 created_at: Optional[float] = None, version: int = 0):
+        self.coin = coin
+        self.timeframe = timeframe
+        self.df = df
+        self.signals = signals
+        self.prediction = prediction
+        self.backtest = backtest
+        self.timings = timings or {}
+        self.created_at = created_at if created_at is not None else time.time()
+        self.version = version
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def summary(self) -> dict:
+        """JSON-safe description of the result without the frames"""
+        latest = self.signals.iloc[-1] if not self.signals.empty else None
+        backtest = {name: _json_value(value) for name, value in self.backtest.items() if name != 'Trades'}
+        backtest['Trades'] = [
+            {field: _json_value(trade[field]) for field in TRADE_DTYPE.names}
+            for trade in self.backtest.get('Trades', np.zeros(0, dtype=TRADE_DTYPE))
+        ]
+        return {
+            'coin': self.coin,
+            'timeframe': self.timeframe,
+            'version': self.version,
+            'created_at': self.created_at,
+            'rows': len(self.df),
+            'last_candle': _json_value(self.df.index[-1]) if len(self.df) else None,
+            'signal': None if latest is None else latest['Final_Signal'],
+            'confidence': None if latest is None else _json_value(latest['Confidence']),
+            'prediction': None if self.prediction is None else {
+                name: _json_value(value) for name, value in self.prediction.items()
+            },
+            'backtest': backtest,
+            'timings': self.timings,
+        }
+
+    @classmethod
+    def from_summary(cls, summary: dict, df: pd.DataFrame, signals: pd.DataFrame) -> 'AnalysisResult':
+        backtest = dict(summary['backtest'])
+        backtest['Trades'] = np.array(
+            [tuple(trade[field] for field in TRADE_DTYPE.names) for trade in backtest.get('Trades', [])],
+            dtype=TRADE_DTYPE
+        )
+        return cls(summary['coin'], summary['timeframe'], df, signals, summary['prediction'], backtest,
+                   summary['timings'], summary['created_at'], summary.get('version', 0))
+
+
+class AnalysisPipeline:
+    """The dashboard's analysis stages for any number of pairs, one analyzer per pair"""
+
+    def __init__(self, fetcher: Optional[CryptoDataFetcher] = None, backtester: Optional[Backtester] = None):
+        self.fetcher = fetcher or CryptoDataFetcher()
+        self.backtester = backtester or Backtester()
+        self._analyzers: Dict[Tuple[str, str], TechnicalAnalyzer] = {}
+
+    def analyzer(self, coin: str, timeframe: str) -> TechnicalAnalyzer:
+        key = (coin, timeframe)
+        if key not in self._analyzers:
+            self._analyzers[key] = TechnicalAnalyzer(coin, timeframe)
+        return self._analyzers[key]
+
+    def analyze(self, coin: str, timeframe: str, df: pd.DataFrame,
+                timings: Optional[Dict[str, float]] = None) -> Optional[AnalysisResult]:
+        """Run indicators, signals with prediction and backtest on an already fetched frame"""
+        if df.empty:
+            logging.error(f"No data to analyze for {coin} {timeframe}")
+            return None
+        timings = dict(timings or {})
+        analyzer = self.analyzer(coin, timeframe)
+
+        start = time.perf_counter()
+        df = analyzer.calculate_indicators(df.copy())
+        timings['indicators'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        signals, prediction = analyzer.generate_signals(df)
+        timings['signals'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        backtest = self.backtester.run_backtest(df, signals)
+        timings['backtest'] = time.perf_counter() - start
+
+        return AnalysisResult(coin, timeframe, df, signals, prediction, backtest, timings)
+
+    def run(self, coin: str, timeframe: str) -> Optional[AnalysisResult]:
+        start = time.perf_counter()
+        df = self.fetcher.get_historical_data(coin, timeframe)
+        return self.analyze(coin, timeframe, df, {'fetch': time.perf_counter() - start})
+
+    def run_many(self, pairs: Sequence[Tuple[str, str]]) -> List[AnalysisResult]:
+        """Fetch all pairs in one bulk request, then analyze each one that returned data"""
+        frames, metadata = self.fetcher.get_many(list(pairs))
+        results = []
+        for pair, df in frames.items():
+            if df.empty:
+                continue
+            result = self.analyze(*pair, df, {'fetch': metadata[pair]['latency']})
+            if result is not None:
+                results.append(result)
+        return results
+
+
+class ResultStore:
+    """
+    Directory holding the latest AnalysisResult per (coin, timeframe).
+    The frames are written to a new file first and the result JSON naming it
+    is then atomically replaced, so readers in other processes only ever see
+    complete results. Saves to a pair hold an exclusive lock file, so
+    concurrent writers get distinct versions. Frames are Parquet when
+    pyarrow is installed and pandas table-JSON otherwise.
+    """
+
+    RESULT = 'result.json'
+    LOCK = 'save.lock'
+
+    def __init__(self, root: Optional[str] = None, fmt: Optional[str] = None, keep_last: int = 2):
+        self.root = root or DEFAULT_RESULTS_DIR
+        self.fmt = fmt or ('parquet' if HAS_PARQUET else 'json')
+        if self.fmt == 'parquet' and not HAS_PARQUET:
+            raise ValueError("Parquet output needs pyarrow installed")
+        self.keep_last = keep_last
+
+    def pair_dir(self, coin: str, timeframe: str) -> str:
+        """Directory of the pair's files"""
+        return os.path.join(self.root, f"{coin.lower()}_{timeframe}".replace(os.sep, '-'))
+
+    def save(self, result: AnalysisResult) -> int:
+        """Write result as the pair's latest and return its version"""
+        pair_dir = self.pair_dir(result.coin, result.timeframe)
+        os.makedirs(pair_dir, exist_ok=True)
+        frame = result.df.join(result.signals.add_prefix(_SIGNAL_PREFIX), how='left')
+
+        with self._save_lock(pair_dir):
+            previous = self._read_summary(pair_dir)
+            result.version = (previous['version'] if previous else 0) + 1
+
+            frame_name = f"frame-{result.version:06d}.{self.fmt}"
+            if self.fmt == 'parquet':
+                self._write_atomic(pair_dir, frame_name, frame.to_parquet)
+            else:
+                self._write_atomic(pair_dir, frame_name,
+                                   lambda path: frame.to_json(path, orient='table', date_unit='ns'))
+
+            summary = dict(result.summary(), frame=frame_name)
+            self._write_atomic(pair_dir, self.RESULT, lambda path: self._dump_json(summary, path))
+            self._prune(pair_dir, result.version)
+        return result.version
+
+    def version(self, coin: str, timeframe: str) -> int:
+        """Version of the pair's latest result, 0 when there is none"""
+        summary = self._read_summary(self.pair_dir(coin, timeframe))
+        return summary['version'] if summary else 0
+
+    def load(self, coin: str, timeframe: str, max_age: Optional[float] = None) -> Optional[AnalysisResult]:
+        """The pair's latest result, or None when missing, unreadable or older than max_age seconds"""
+        pair_dir = self.pair_dir(coin, timeframe)
+        summary = self._read_summary(pair_dir)
+        if summary is None or (max_age is not None and time.time() - summary['created_at'] > max_age):
+            return None
+        frame_path = os.path.join(pair_dir, summary['frame'])
+        try:
+            if frame_path.endswith('.parquet'):
+                frame = pd.read_parquet(frame_path)
+            else:
+                with open(frame_path) as f:
+                    frame = pd.read_json(io.StringIO(f.read()), orient='table')
+        except (OSError, ValueError, ImportError) as e:
+            logging.error(f"Failed to read results for {coin} {timeframe}: {str(e)}")
+            return None
+
+        signal_columns = [column for column in frame.columns if column.startswith(_SIGNAL_PREFIX)]
+        signals = frame[signal_columns].rename(columns=lambda column: column[len(_SIGNAL_PREFIX):])
+        return AnalysisResult.from_summary(summary, frame.drop(columns=signal_columns), signals)
+
+    @contextlib.contextmanager
+    def _save_lock(self, pair_dir: str):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(pair_dir, self.LOCK), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield  # closing the file drops the flock
+
+    @staticmethod
+    def _write_atomic(pair_dir: str, name: str, write) -> None:
+        # Written under a temporary name and renamed, so a reader never opens a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=pair_dir, prefix='.tmp-', suffix=os.path.splitext(name)[1])
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, os.path.join(pair_dir, name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _dump_json(summary: dict, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(summary, f)
+
+    def _read_summary(self, pair_dir: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(pair_dir, self.RESULT)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.error(f"Unreadable result in {pair_dir}: {str(e)}")
+            return None
+
+    def _prune(self, pair_dir: str, version: int) -> None:
+        # The previous frame stays for readers that loaded the old result.json
+        for path in glob.glob(os.path.join(pair_dir, 'frame-*')):
+            try:
+                if int(os.path.basename(path).split('-')[1].split('.')[0]) <= version - self.keep_last:
+                    os.remove(path)
+            except (ValueError, OSError):
+                continue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--coins', nargs='+', help='Coins to analyze (default: all supported)')
+    parser.add_argument('--timeframes', nargs='+', default=['1h'])
+    parser.add_argument('--store', help='Write results to this ResultStore directory instead of stdout')
+    parser.add_argument('--format', choices=['json', 'parquet'], help='Frame format in the store')
+    parser.add_argument('--interval', type=float, default=0, help='Repeat every N seconds (default: run once)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pipeline = AnalysisPipeline()
+    store = ResultStore(args.store, args.format) if args.store else None
+    coins = args.coins or next(
+        p for p in pipeline.fetcher.providers if isinstance(p, YahooFinanceProvider)
+    ).get_supported_coins()
+    pairs = [(coin, tf) for tf in args.timeframes for coin in coins]
+
+    while True:
+        start = time.perf_counter()
+        for result in pipeline.run_many(pairs):
+            if store is not None:
+                version = store.save(result)
+                logging.info(f"Stored {result.coin} {result.timeframe} v{version}")
+            else:
+                print(json.dumps(result.summary()), flush=True)
+        elapsed = time.perf_counter() - start
+        logging.info(f"Analyzed {len(pairs)} pairs in {elapsed:.2f}s")
+        if args.interval <= 0:
+            break
+        time.sleep(max(0.0, args.interval - elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,72 @@ import pandas as pd
 import numpy as np
 import logging
 
+TRADE_DTYPE = np.dtype([
+    ('entry_index', 'i8'),
+    ('entry_price', 'f8'),
+    ('exit_index', 'i8'),
+    ('exit_price', 'f8'),
+    ('return_pct', 'f8'),
+])
+
+
+def simulate_long_only(prices, signal_codes, initial_capital=10000):
+    """
+    Vectorized all-in/all-out long-only simulation.
+    signal_codes holds 1 for BUY, -1 for SELL and 0 for HOLD per bar. A BUY
+    opens a position only when flat and a SELL closes it only when long.
+    Returns the equity curve (starting with initial_capital), the trade
+    array (one row per round trip; open trades have exit_index -1), the
+    number of BUY/SELL executions and the number of winning round trips.
+    """
+    prices = np.asarray(prices, dtype=float)
+    codes = np.asarray(signal_codes)
+    n = len(prices)
+    bars = np.arange(n)
+
+    # A bar is long when the most recent non-HOLD signal was a BUY
+    last_signal = np.maximum.accumulate(np.where(codes != 0, bars, -1))
+    long = (last_signal >= 0) & (codes[np.maximum(last_signal, 0)] == 1)
+    prev_long = np.concatenate(([False], long[:-1]))
+    entry_bars = np.flatnonzero(long & ~prev_long)
+    exit_bars = np.flatnonzero(~long & prev_long)
+
+    entry_prices = prices[entry_bars]
+    exit_prices = prices[exit_bars]
+    closed = len(exit_bars)
+
+    # Capital compounds through each closed round trip
+    growth = exit_prices / entry_prices[:closed]
+    capital_after = initial_capital * np.cumprod(growth)
+    capital_before = np.concatenate(([initial_capital], capital_after))[:len(entry_bars)]
+    units = capital_before / entry_prices
+
+    trade_id = np.cumsum(long & ~prev_long) - 1
+    exits_done = np.cumsum(~long & prev_long)
+    flat_capital = np.concatenate(([initial_capital], capital_after))[exits_done]
+    held_units = units[np.maximum(trade_id, 0)] if len(units) else np.zeros(n)
+    equity = np.where(long, held_units * prices, flat_capital)
+
+    trades = np.zeros(len(entry_bars), dtype=TRADE_DTYPE)
+    trades['entry_index'] = entry_bars
+    trades['entry_price'] = entry_prices
+    trades['exit_index'] = -1
+    trades['exit_price'] = np.nan
+    trades['return_pct'] = np.nan
+    trades['exit_index'][:closed] = exit_bars
+    trades['exit_price'][:closed] = exit_prices
+    trades['return_pct'][:closed] = (growth - 1) * 100
+
+    wins = int(np.count_nonzero(units[:closed] * exit_prices > units[:closed] * entry_prices[:closed]))
+
+    return {
+        'equity': np.concatenate(([initial_capital], equity)),
+        'trades': trades,
+        'executions': len(entry_bars) + closed,
+        'wins': wins,
+    }
+
+
 class Backtester:
     def __init__(self):
         self.initial_capital = 10000
@@ -16,66 +82,32 @@ class Backtester:
                     'Total Return': 0.0,
                     'Win Rate': 0.0,
                     'Max Drawdown': 0.0,
-                    'Number of Trades': 0
+                    'Number of Trades': 0,
+                    'Trades': np.zeros(0, dtype=TRADE_DTYPE)
                 }
 
-            capital = self.initial_capital
-            position = 0
-            trades = []
-            self.portfolio_value = [capital]  # Initialize with starting capital
-
-            for idx, row in signals.iterrows():
-                try:
-                    price = df.loc[idx, 'close']
-
-                    if row['Final_Signal'] == 'BUY' and position == 0:
-                        position = capital / price
-                        trades.append({
-                            'type': 'BUY',
-                            'price': price,
-                            'position': position,
-                            'date': idx
-                        })
-                    elif row['Final_Signal'] == 'SELL' and position > 0:
-                        capital = position * price
-                        position = 0
-                        trades.append({
-                            'type': 'SELL',
-                            'price': price,
-                            'capital': capital,
-                            'date': idx
-                        })
-
-                    current_value = capital if position == 0 else position * price
-                    self.portfolio_value.append(current_value)
-                except KeyError:
-                    continue
+            # Signals without a matching price row are skipped
+            signals = signals[signals.index.isin(df.index)]
+            prices = df['close'].reindex(signals.index).to_numpy(dtype=float)
+            final_signal = signals['Final_Signal'].to_numpy()
+            codes = np.where(final_signal == 'BUY', 1, np.where(final_signal == 'SELL', -1, 0))
+
+            result = simulate_long_only(prices, codes, self.initial_capital)
+            self.portfolio_value = result['equity']
+            trades = result['trades']
 
             # Calculate performance metrics safely
             if len(self.portfolio_value) > 1:
-                returns = np.array(self.portfolio_value) / self.initial_capital - 1
-                total_return = returns[-1] * 100
+                total_return = (self.portfolio_value[-1] / self.initial_capital - 1) * 100
 
-                # Calculate win rate
-                profitable_trades = 0
-                trade_pairs = len(trades) // 2
-
-                if trade_pairs > 0:
-                    for i in range(0, len(trades)-1, 2):
-                        if i+1 < len(trades):
-                            buy_trade = trades[i]
-                            sell_trade = trades[i+1]
-                            if sell_trade['capital'] > buy_trade['position'] * buy_trade['price']:
-                                profitable_trades += 1
-
-                    win_rate = profitable_trades / trade_pairs
-                else:
-                    win_rate = 0.0
+                # Win rate over complete BUY/SELL pairs
+                trade_pairs = result['executions'] // 2
+                win_rate = result['wins'] / trade_pairs if trade_pairs > 0 else 0.0
 
                 # Calculate maximum drawdown
                 peak = np.maximum.accumulate(self.portfolio_value)
                 drawdown = (peak - self.portfolio_value) / np.where(peak == 0, 1, peak)
-                max_drawdown = np.max(drawdown) * 100 if len(drawdown) > 0 else 0.0
+                max_drawdown = np.max(drawdown) * 100
 
             else:
                 total_return = 0.0
@@ -86,7 +118,8 @@ class Backtester:
                 'Total Return': total_return,
                 'Win Rate': win_rate,
                 'Max Drawdown': max_drawdown,
-                'Number of Trades': len(trades)
+                'Number of Trades': result['executions'],
+                'Trades': trades
             }
 
         except Exception as e:
@@ -95,5 +128,6 @@ class Backtester:
                 'Total Return': 0.0,
                 'Win Rate': 0.0,
                 'Max Drawdown': 0.0,
-                'Number of Trades': 0
-            }
\ No newline at end of file
+                'Number of Trades': 0,
+                'Trades': np.zeros(0, dtype=TRADE_DTYPE)
+            }
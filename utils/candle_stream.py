@@ -0,0 +1,302 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicator_engine import StreamingIndicators
+
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'Price_Change']
+INDICATOR_COLUMNS = ['MA20', 'MA50', 'MA200', 'BB_middle', 'BB_upper', 'BB_lower',
+                     'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist']
+_SIGNAL_CODES = {'BUY': 1.0, 'SELL': -1.0, 'HOLD': 0.0}
+_SIGNAL_LABELS = np.array(['SELL', 'HOLD', 'BUY'])
+
+
+class CandleRingBuffer:
+    """
+    Fixed-capacity buffer of enriched candles (OHLCV, indicators, signals).
+    Every write bumps a version number and stamps the row with it, so a
+    reader can ask for just the rows written after the version it last saw.
+    Writing a candle with the newest timestamp again revises it in place.
+    """
+
+    FRAME_COLUMNS = CANDLE_COLUMNS + INDICATOR_COLUMNS
+    # MACD_Signal is both an indicator and a signal vote, so signal votes are stored separately
+    SIGNAL_STORE = ['MA_Vote', 'RSI_Vote', 'MACD_Vote', 'Signal_Strength', 'Confidence', 'Final_Code']
+
+    def __init__(self, capacity: int = 5000):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        width = len(self.FRAME_COLUMNS) + len(self.SIGNAL_STORE)
+        self._values = np.full((capacity, width), np.nan)
+        self._timestamps = np.zeros(capacity, dtype='int64')
+        self._row_versions = np.zeros(capacity, dtype='int64')
+        self._tz = None
+        self.start = 0
+        self.size = 0
+        self.version = 0
+
+    def append(self, timestamp: pd.Timestamp, values: np.ndarray) -> None:
+        with self._lock:
+            ts = pd.Timestamp(timestamp)
+            self._tz = ts.tz
+            key = ts.as_unit('ns').value
+            last = (self.start + self.size - 1) % self.capacity
+            if self.size and self._timestamps[last] == key:
+                slot = last
+            else:
+                if self.size == self.capacity:
+                    self.start = (self.start + 1) % self.capacity
+                else:
+                    self.size += 1
+                slot = (self.start + self.size - 1) % self.capacity
+            self.version += 1
+            self._values[slot] = values
+            self._timestamps[slot] = key
+            self._row_versions[slot] = self.version
+
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        with self._lock:
+            if not self.size:
+                return None
+            return self._to_index(self._timestamps[[(self.start + self.size - 1) % self.capacity]])[0]
+
+    def since(self, version: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+        """Rows written after version as (candles+indicators, signals, current version)"""
+        with self._lock:
+            order = (self.start + np.arange(self.size)) % self.capacity
+            # Row versions increase along the buffer, so the delta is a tail slice
+            first = int(np.searchsorted(self._row_versions[order], version, side='right'))
+            rows = order[first:]
+            return self._frames(rows) + (self.version,)
+
+    def _frames(self, rows: np.ndarray):
+        index = self._to_index(self._timestamps[rows])
+        n_frame = len(self.FRAME_COLUMNS)
+        values = self._values[rows]
+        df = pd.DataFrame(values[:, :n_frame], index=index, columns=self.FRAME_COLUMNS)
+        votes = values[:, n_frame:]
+        signals = pd.DataFrame(index=index)
+        signals['MA_Signal'] = votes[:, 0].astype(int)
+        signals['RSI_Signal'] = votes[:, 1].astype(int)
+        signals['MACD_Signal'] = votes[:, 2].astype(int)
+        signals['Signal_Strength'] = votes[:, 3].astype(int)
+        signals['Confidence'] = votes[:, 4]
+        signals['Final_Signal'] = _SIGNAL_LABELS[votes[:, 5].astype(int) + 1]
+        return df, signals
+
+    def _to_index(self, values: np.ndarray) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(values.astype('datetime64[ns]'))
+        return index.tz_localize('UTC').tz_convert(self._tz) if self._tz is not None else index
+
+
+class ReplayCandleSource:
+    """Replays a historical frame candle by candle; handy for tests and demos"""
+
+    def __init__(self, df: pd.DataFrame, warmup: int = 200, batch: int = 1, poll_interval: float = 0.0):
+        self.df = df
+        self.warmup = warmup
+        self.batch = batch
+        self.poll_interval = poll_interval
+        self.position = warmup
+
+    def history(self) -> pd.DataFrame:
+        """Every candle replayed so far, as a live source's history would be"""
+        return self.df.iloc[:self.position]
+
+    def poll(self, since: Optional[pd.Timestamp] = None) -> Optional[pd.DataFrame]:
+        """Next batch of candles, from since on when given; None once the frame is exhausted"""
+        if self.position >= len(self.df):
+            return None
+        start = self.position if since is None else min(self.position, int(self.df.index.searchsorted(since)))
+        rows = self.df.iloc[start:self.position + self.batch]
+        self.position = min(self.position + self.batch, len(self.df))
+        return rows
+
+
+class PollingCandleSource:
+    """
+    Polls CryptoDataFetcher for the latest candles.
+    The fetcher's frame cache, single-flight and candle store keep each
+    poll cheap; new candles appear at the provider's cache_timeout cadence,
+    often several at once, so a poll returns every candle from the last
+    one processed on (only the last tail candles before the first one).
+    """
+
+    def __init__(self, fetcher, coin_id: str, timeframe: str, poll_interval: float = 5.0, tail: int = 5):
+        self.fetcher = fetcher
+        self.coin_id = coin_id
+        self.timeframe = timeframe
+        self.poll_interval = poll_interval
+        self.tail = tail
+
+    def history(self) -> pd.DataFrame:
+        return self.fetcher.get_historical_data(self.coin_id, self.timeframe)
+
+    def poll(self, since: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        df = self.fetcher.get_historical_data(self.coin_id, self.timeframe)
+        return df.iloc[-self.tail:] if since is None else df[df.index >= since]
+
+
+class CandleStreamer(threading.Thread):
+    """
+    Background producer for one coin/timeframe.
+    Pulls candles from a source, advances StreamingIndicators and the
+    signal rules one candle at a time, and refreshes the model prediction
+    only when at least one candle changed. Readers pull deltas from buffer.
+    With a learner, each candle that closes becomes one training sample.
+    Polls start at the last candle processed, so its final revision is
+    applied; when that candle is missing from a poll or candles were
+    skipped, the engine is reseeded from the source's history instead of
+    advancing over the gap.
+    """
+
+    def __init__(self, analyzer, source, capacity: int = 5000, learner=None):
+        super().__init__(daemon=True, name='candle-streamer')
+        self.analyzer = analyzer
+        self.source = source
+        self.learner = learner
+        self.buffer = CandleRingBuffer(capacity)
+        self.engine = StreamingIndicators()
+        self.prediction = None
+        self.running = True
+        self.exhausted = False
+        self._last_ts = None
+        self._interval = None
+        self._prediction_version = 0
+
+    def seed(self) -> None:
+        self._seed_from(self.source.history())
+
+    def _seed_from(self, history: pd.DataFrame, since: Optional[pd.Timestamp] = None) -> int:
+        """Seed the engine from history and write its candles from since on; returns how many"""
+        if history.empty:
+            return 0
+        history = self.analyzer.calculate_indicators(history.copy())
+        signals = self.analyzer.compute_signals(history)
+        if since is not None:
+            if history.index[-1] < since:
+                return 0  # older than what was already processed; keep the current state
+            keep = history.index >= since
+            written, written_signals = history[keep], signals[keep]
+        else:
+            written, written_signals = history, signals
+        self.engine.seed(history)
+        if len(history) > 1:
+            self._interval = history.index.to_series().diff().median()
+
+        written = written.iloc[-self.buffer.capacity:]
+        written_signals = written_signals.iloc[-self.buffer.capacity:]
+        for (ts, row), (_, signal) in zip(written.iterrows(), written_signals.iterrows()):
+            self.buffer.append(ts, self._pack(row, signal))
+
+        self._last_ts = written.index[-1]
+        self._refresh_prediction()
+        return len(written)
+
+    def _has_gap(self, candles: pd.DataFrame) -> bool:
+        """Whether candles skip past the last processed candle or leave out candles after it"""
+        if self._last_ts is None:
+            return False
+        newer = candles.index[candles.index > self._last_ts]
+        if newer.empty:
+            return False
+        if self._last_ts not in candles.index:
+            return True
+        if self._interval is None:
+            return False
+        steps = np.diff(newer.insert(0, self._last_ts).asi8)
+        return bool(steps.max() > 1.5 * self._interval.value)
+
+    def process(self, candles: pd.DataFrame) -> int:
+        """
+        Apply new or revised candles, which should start at the last one
+        processed; returns how many were applied.
+        """
+        if self._has_gap(candles):
+            logging.warning(f"Candle stream has a gap after {self._last_ts}; reseeding from history")
+            return self._seed_from(self.source.history(), self._last_ts)
+
+        applied = 0
+        for ts, candle in candles.iterrows():
+            if self._last_ts is not None and ts < self._last_ts:
+                continue
+            revise = self._last_ts is not None and ts == self._last_ts
+            indicators = self.engine.update(candle, replace_last=revise)
+
+            # After update the engine's previous close is the one this candle changes from
+            row = {col: float(candle.get(col, np.nan)) for col in CANDLE_COLUMNS[:5]}
+            row['Price_Change'] = row['close'] / self.engine._prev_close - 1
+            row.update(indicators)
+
+            frame = pd.DataFrame([row], index=[ts])
+            signal = self.analyzer.compute_signals(frame).iloc[0]
+            self.buffer.append(ts, self._pack(frame.iloc[0], signal))
+
+            self._last_ts = ts
+            applied += 1
+
+        if applied:
+            self._refresh_prediction()
+        return applied
+
+    def run(self):
+        try:
+            self.seed()
+        except Exception as e:
+            logging.error(f"Error seeding candle stream: {str(e)}")
+
+        while self.running:
+            try:
+                candles = self.source.poll(self._last_ts)
+                if candles is None:
+                    self.exhausted = True
+                    break
+                self.process(candles)
+            except Exception as e:
+                logging.error(f"Error in candle stream: {str(e)}")
+            time.sleep(self.source.poll_interval)
+
+    def stop(self):
+        self.running = False
+
+    def _refresh_prediction(self) -> None:
+        # The analyzer keeps its own feature windows, so only rows written
+        # since the last prediction need to be handed over
+        df, _, self._prediction_version = self.buffer.since(self._prediction_version)
+        if not df.empty:
+            self.prediction = self.analyzer._generate_prediction(df)
+            self._feed_learner()
+
+    def _feed_learner(self) -> None:
+        if self.learner is None:
+            return
+        windows, labels = self.analyzer.training_windows()
+        for window, label in zip(windows, labels):
+            self.learner.add_training_data(window, label)
+
+    def _pack(self, row: pd.Series, signal: pd.Series) -> np.ndarray:
+        frame_values = [float(row.get(col, np.nan)) for col in CandleRingBuffer.FRAME_COLUMNS]
+        votes = [
+            signal['MA_Signal'], signal['RSI_Signal'], signal['MACD_Signal'],
+            signal['Signal_Strength'], signal['Confidence'], _SIGNAL_CODES[signal['Final_Signal']],
+        ]
+        return np.array(frame_values + [float(v) for v in votes])
+
+
+_streamers: Dict[tuple, CandleStreamer] = {}
+_streamers_lock = threading.Lock()
+
+
+def get_streamer(key: tuple, factory) -> CandleStreamer:
+    """Process-wide streamer for key (e.g. (coin, timeframe)), started on first use"""
+    with _streamers_lock:
+        streamer = _streamers.get(key)
+        if streamer is None or not streamer.is_alive():
+            streamer = factory()
+            streamer.start()
+            _streamers[key] = streamer
+        return streamer
@@ -0,0 +1,141 @@
+"""
+Point reduction for chart traces.
+
+Plotly serializes every point of every trace into the figure JSON, so
+without a reduction step the payload grows with the history loaded rather
+than with the screen. Line series are thinned with a Largest-Triangle-Three-
+Buckets variant, which keeps the peaks and troughs a reader would notice,
+and candles are merged into wider OHLC candles. Point targets follow from
+the chart width in pixels.
+
+Buckets are anchored to the time axis rather than to the first row: a row
+falls in bucket timestamp // width, and the width only changes in
+quarter-octave steps as the history grows. Appending a candle (or dropping
+the oldest one) therefore changes only the buckets at the ends, and the
+rest of every trace stays identical, which lets cached figures skip
+unchanged traces. Each bucket's point is chosen against the averages of
+both neighbouring buckets (plain LTTB uses the previously chosen point),
+so one changed bucket cannot ripple through the rest of the series, and
+all buckets are reduced in one vectorized pass.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHART_WIDTH = 1200
+CANDLE_PIXELS = 4  # screen pixels per candle body plus gap
+LINE_POINTS_PER_PIXEL = 1
+WIDTH_STEPS_PER_OCTAVE = 4
+
+
+def candle_target(width: int) -> int:
+    """Most candles worth drawing on a chart width pixels wide"""
+    return max(1, int(width) // CANDLE_PIXELS)
+
+
+def line_target(width: int) -> int:
+    """Most points per line trace worth drawing on a chart width pixels wide"""
+    return max(3, int(width) * LINE_POINTS_PER_PIXEL)
+
+
+def row_positions(index: pd.Index) -> np.ndarray:
+    """int64 position of every row on the time axis: nanoseconds for a DatetimeIndex, else the row number"""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8
+    return np.arange(len(index), dtype=np.int64)
+
+
+def bucket_starts(positions: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Row offsets where each anchored bucket starts, for at most buckets
+    buckets over the sorted positions. The bucket width is a whole number
+    of row spacings, rounded up to the next quarter octave, so it stays the
+    same while the covered span grows by up to a fifth.
+    """
+    n = len(positions)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    spacing = np.diff(positions)
+    unit = float(np.median(spacing)) if len(spacing) else 1.0
+    unit = max(unit, 1.0)
+    span = float(positions[-1] - positions[0])
+    ratio = span / (unit * max(buckets - 1, 1))
+    steps = np.ceil(np.log2(ratio) * WIDTH_STEPS_PER_OCTAVE) if ratio > 1 else 0
+    width = max(int(np.ceil(unit * 2.0 ** (steps / WIDTH_STEPS_PER_OCTAVE))), 1)
+    keys = positions // width
+    return np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+
+
+def lttb_indices(values: np.ndarray, threshold: int, positions: np.ndarray = None) -> np.ndarray:
+    """
+    Row positions the LTTB variant keeps from values, at most threshold.
+    positions places each row on the time axis (default: the row number).
+    NaN rows (such as the warm-up of a moving average) are dropped first;
+    the first and last remaining rows are always kept.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(values))
+    n = len(valid)
+    threshold = max(3, int(threshold))
+    if n <= threshold:
+        return valid
+
+    positions = np.arange(len(values), dtype=np.int64) if positions is None else np.asarray(positions)
+    interior = valid[1:-1]
+    starts = bucket_starts(positions[interior], threshold - 2)
+    counts = np.diff(np.append(starts, len(interior)))
+
+    # Triangle areas in units of the row spacing, so time and value scales stay comparable
+    valid_positions = positions[valid]
+    unit = max(float(np.median(np.diff(valid_positions))), 1.0)
+    x = (valid_positions - valid_positions[0]) / unit
+    first_x, last_x, x = x[0], x[-1], x[1:-1]
+    y = values[interior]
+    avg_x = np.add.reduceat(x, starts) / counts
+    avg_y = np.add.reduceat(y, starts) / counts
+    prev_x = np.repeat(np.concatenate(([first_x], avg_x[:-1])), counts)
+    prev_y = np.repeat(np.concatenate(([values[valid[0]]], avg_y[:-1])), counts)
+    next_x = np.repeat(np.concatenate((avg_x[1:], [last_x])), counts)
+    next_y = np.repeat(np.concatenate((avg_y[1:], [values[valid[-1]]])), counts)
+    area = np.abs((prev_x - next_x) * (y - prev_y) - (prev_x - x) * (next_y - prev_y))
+
+    # First row holding its bucket's largest area
+    bucket = np.repeat(np.arange(len(starts)), counts)
+    best = np.flatnonzero(area == np.repeat(np.maximum.reduceat(area, starts), counts))
+    best = best[np.diff(bucket[best], prepend=-1) != 0]
+    return np.concatenate(([valid[0]], interior[best], [valid[-1]]))
+
+
+def downsample_line(index: pd.Index, values, threshold: int) -> Tuple[pd.Index, np.ndarray]:
+    """(x, y) for a line trace reduced to at most threshold points"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= threshold:
+        return index, values
+    keep = lttb_indices(values, threshold, row_positions(index))
+    return index[keep], values[keep]
+
+
+def downsample_ohlc(df: pd.DataFrame, target: int) -> pd.DataFrame:
+    """
+    Merge the candles of each anchored bucket so at most target remain.
+    Each merged candle opens at its first open, closes at its last close,
+    spans the highest high and lowest low, and sums the volume. It is
+    stamped with the time of its first candle.
+    """
+    n = len(df)
+    if n <= target:
+        return df
+
+    starts = bucket_starts(row_positions(df.index), max(1, int(target)))
+    ends = np.append(starts[1:], n) - 1
+    merged = {
+        'open': df['open'].to_numpy(dtype=np.float64)[starts],
+        # fmax/fmin so a missing high or low in a bucket does not blank the whole candle
+        'high': np.fmax.reduceat(df['high'].to_numpy(dtype=np.float64), starts),
+        'low': np.fmin.reduceat(df['low'].to_numpy(dtype=np.float64), starts),
+        'close': df['close'].to_numpy(dtype=np.float64)[ends],
+    }
+    if 'volume' in df.columns:
+        merged['volume'] = np.add.reduceat(np.nan_to_num(df['volume'].to_numpy(dtype=np.float64)), starts)
+    return pd.DataFrame(merged, index=df.index[starts])
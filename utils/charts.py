@@ -0,0 +1,240 @@
+"""
+Plotly figures for the dashboard, built once per chart settings and then
+patched with new data.
+
+Constructing a figure validates and styles every trace plus the layout, and
+rebuilding the price, RSI and MACD figures for every new candle was most of
+the server time of the live view. Figures are therefore split into trace
+data, recomputed per data version, and styling, applied once per
+ChartSettings. When only the data changed, the cached figures get their
+trace arrays replaced in place and only the traces whose data changed are
+touched. Trace data is also memoized per (data version, ChartSettings) for
+the whole process, so concurrent viewers of the same data share one copy.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from .chart_downsampling import DEFAULT_CHART_WIDTH, candle_target, downsample_line, downsample_ohlc, line_target
+
+PRICE_COLOR = '#00BCD4'
+DEFAULT_MA_COLORS = (('MA20', '#FF9800'), ('MA50', '#2196F3'), ('MA200', '#9C27B0'))
+
+
+class ChartSettings(NamedTuple):
+    """Everything that changes how the figures look, as opposed to what they show"""
+    coin: str
+    chart_type: str = 'candlestick'
+    show_ma: bool = True
+    show_bb: bool = True
+    show_volume: bool = True
+    chart_width: int = DEFAULT_CHART_WIDTH
+    ma_colors: Tuple[Tuple[str, str], ...] = DEFAULT_MA_COLORS
+
+
+def trace_data(df: pd.DataFrame, entry_points, exit_points, settings: ChartSettings) -> Dict[str, Dict[str, dict]]:
+    """
+    Data arrays of every trace, keyed by figure and trace name in drawing order.
+    Lines and candles are reduced to the chart width; signal markers are exact.
+    """
+    points = line_target(settings.chart_width)
+
+    def line(column):
+        x, y = downsample_line(df.index, df[column], points)
+        return {'x': x, 'y': y}
+
+    price = {}
+    if settings.chart_type == 'candlestick':
+        candles = downsample_ohlc(df, candle_target(settings.chart_width))
+        price['Price'] = {'x': candles.index, 'open': candles['open'].to_numpy(), 'high': candles['high'].to_numpy(),
+                          'low': candles['low'].to_numpy(), 'close': candles['close'].to_numpy()}
+    else:
+        price['Price'] = line('close')
+
+    if settings.show_ma and all(col in df.columns for col in ['MA20', 'MA50', 'MA200']):
+        price['20 MA'], price['50 MA'], price['200 MA'] = line('MA20'), line('MA50'), line('MA200')
+    if settings.show_bb and all(col in df.columns for col in ['BB_upper', 'BB_middle', 'BB_lower']):
+        price['BB Upper'], price['BB Lower'] = line('BB_upper'), line('BB_lower')
+
+    if len(entry_points):
+        price['Buy Signal'] = {'x': entry_points.timestamps, 'y': entry_points.prices}
+    if len(exit_points):
+        price['Sell Signal'] = {'x': exit_points.timestamps, 'y': exit_points.prices}
+
+    if settings.show_volume:
+        # Summed per merged candle, so the bars line up with the candles
+        volume = downsample_ohlc(df, candle_target(settings.chart_width))['volume']
+        price['Volume'] = {'x': volume.index, 'y': volume.to_numpy()}
+
+    macd = {'MACD': line('MACD')}
+    if 'MACD_Signal' in df.columns:
+        macd['Signal'] = line('MACD_Signal')
+    if 'MACD_Hist' in df.columns:
+        macd['Histogram'] = line('MACD_Hist')
+
+    return {'price': price, 'rsi': {'RSI': line('RSI')}, 'macd': macd}
+
+
+class TraceCache:
+    """Thread-safe LRU of trace_data results keyed by (data key, ChartSettings)"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Dict[str, Dict[str, dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, data_key: Hashable, settings: ChartSettings, compute) -> Dict[str, Dict[str, dict]]:
+        """Cached traces for data_key and settings, computing them with compute() on a miss"""
+        key = (data_key, settings)
+        with self._lock:
+            traces = self._entries.get(key)
+            if traces is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return traces
+            self.stats['misses'] += 1
+
+        # Computed outside the lock; two sessions missing together both compute and one result is kept
+        traces = compute()
+        with self._lock:
+            self._entries[key] = traces
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return traces
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_trace_cache = TraceCache()
+
+
+def get_trace_cache() -> TraceCache:
+    """Return the trace cache shared by all dashboard sessions in the process"""
+    return _trace_cache
+
+
+def _price_trace(name: str, data: dict, settings: ChartSettings):
+    ma_colors = dict(settings.ma_colors)
+    if name == 'Price':
+        if settings.chart_type == 'candlestick':
+            return go.Candlestick(name=name, **data)
+        if settings.chart_type == 'line':
+            return go.Scatter(name=name, line=dict(color=PRICE_COLOR), **data)
+        if settings.chart_type == 'area':
+            return go.Scatter(name=name, fill='tonexty', line=dict(color=PRICE_COLOR), **data)
+        return go.Scatter(name=name, mode='markers', marker=dict(color=PRICE_COLOR), **data)
+    if name.endswith(' MA'):
+        return go.Scatter(name=name, line=dict(color=ma_colors['MA' + name.split()[0]]), **data)
+    if name.startswith('BB '):
+        return go.Scatter(name=name, line=dict(color='gray', dash='dash'), **data)
+    if name == 'Buy Signal':
+        return go.Scatter(name=name, mode='markers+text', marker=dict(symbol='triangle-up', size=15, color='green'),
+                          text='BUY HERE', textposition='top center', **data)
+    if name == 'Sell Signal':
+        return go.Scatter(name=name, mode='markers+text', marker=dict(symbol='triangle-down', size=15, color='red'),
+                          text='SELL HERE', textposition='bottom center', textfont=dict(color='red', size=12), **data)
+    return go.Bar(name=name, marker_color='rgba(128,128,128,0.5)', yaxis='y2', **data)
+
+
+def build_figures(traces: Dict[str, Dict[str, dict]], settings: ChartSettings) -> Dict[str, go.Figure]:
+    """Styled price, RSI and MACD figures holding the given trace data"""
+    fig = go.Figure([_price_trace(name, data, settings) for name, data in traces['price'].items()])
+    fig.update_layout(
+        title=f"{settings.coin} Price Chart with Trading Signals",
+        yaxis_title="Price (USD)",
+        xaxis_title="Date",
+        height=600,
+        template='plotly_dark',
+        hovermode='x unified',
+        yaxis2=dict(
+            title="Volume",
+            overlaying="y",
+            side="right",
+            showgrid=False
+        ) if settings.show_volume else None
+    )
+
+    fig_rsi = go.Figure([go.Scatter(name='RSI', **traces['rsi']['RSI'])])
+    fig_rsi.add_hline(y=70, line_dash="dash", line_color="red")
+    fig_rsi.add_hline(y=30, line_dash="dash", line_color="green")
+    fig_rsi.update_layout(height=300, template='plotly_dark')
+
+    fig_macd = go.Figure([
+        go.Bar(name=name, **data) if name == 'Histogram' else go.Scatter(name=name, **data)
+        for name, data in traces['macd'].items()
+    ])
+    fig_macd.update_layout(height=300, template='plotly_dark')
+
+    return {'price': fig, 'rsi': fig_rsi, 'macd': fig_macd}
+
+
+def _same(old, new) -> bool:
+    old, new = np.asarray(old), np.asarray(new)
+    try:
+        return np.array_equal(old, new, equal_nan=True)
+    except TypeError:  # object arrays cannot be tested for NaN
+        return np.array_equal(old, new)
+
+
+def patch_figures(figures: Dict[str, go.Figure], traces: Dict[str, Dict[str, dict]]) -> Optional[int]:
+    """
+    Replace the data of the traces that changed and return how many did.
+    Returns None when the set of traces differs (a marker trace appeared,
+    say), in which case the figures have to be rebuilt.
+    """
+    for name, fig in figures.items():
+        if [trace.name for trace in fig.data] != list(traces[name]):
+            return None
+
+    changed = 0
+    for name, fig in figures.items():
+        with fig.batch_update():
+            for trace in fig.data:
+                data = traces[name][trace.name]
+                updates = {key: value for key, value in data.items() if not _same(trace[key], value)}
+                if updates:
+                    trace.update(updates)
+                    changed += 1
+    return changed
+
+
+class DashboardCharts:
+    """Dashboard figures of one session: rebuilt when the settings change, patched when the data does"""
+
+    def __init__(self):
+        self.settings: Optional[ChartSettings] = None
+        self.figures: Optional[Dict[str, go.Figure]] = None
+        self.stats = {'builds': 0, 'patches': 0, 'traces_patched': 0}
+
+    def update(self, df: pd.DataFrame, entry_points, exit_points, settings: ChartSettings,
+               data_key: Optional[Hashable] = None) -> Dict[str, go.Figure]:
+        """
+        Figures for df. data_key identifies this version of the data (and its
+        signal points) process-wide; with it the trace arrays are shared
+        through the trace cache, without it they are computed for this call.
+        """
+        if data_key is None:
+            traces = trace_data(df, entry_points, exit_points, settings)
+        else:
+            traces = get_trace_cache().get(
+                data_key, settings, lambda: trace_data(df, entry_points, exit_points, settings)
+            )
+        if self.figures is not None and settings == self.settings:
+            changed = patch_figures(self.figures, traces)
+            if changed is not None:
+                self.stats['patches'] += 1
+                self.stats['traces_patched'] += changed
+                return self.figures
+
+        self.figures = build_figures(traces, settings)
+        self.settings = settings
+        self.stats['builds'] += 1
+        return self.figures
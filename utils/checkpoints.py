@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CHECKPOINT_DIR = os.environ.get(
+    'CHECKPOINT_DIR', os.path.join(os.path.expanduser('~'), '.aphator', 'checkpoints')
+)
+
+ModelKey = Tuple[str, str, str]
+
+
+class CheckpointManager:
+    """
+    Versioned on-disk checkpoints of model weights, scaler state and replay
+    buffer. Each save is written to a temporary directory and renamed into
+    place as the next version, then a LATEST pointer file is atomically
+    replaced; readers therefore only ever see complete checkpoints. Only the
+    newest keep_last versions are kept, and rollback moves LATEST back.
+    """
+
+    POINTER = 'LATEST'
+
+    def __init__(self, root: Optional[str] = None, keep_last: int = 5):
+        self.root = root or DEFAULT_CHECKPOINT_DIR
+        self.keep_last = keep_last
+        self._lock = threading.Lock()
+
+    def _key_dir(self, key: ModelKey) -> str:
+        name = '_'.join(part.replace('*', 'all').replace(os.sep, '-') for part in key)
+        return os.path.join(self.root, name)
+
+    def versions(self, key: ModelKey) -> List[int]:
+        """All complete checkpoint versions for key, oldest first"""
+        try:
+            names = os.listdir(self._key_dir(key))
+        except OSError:
+            return []
+        return sorted(int(name[1:]) for name in names if name.startswith('v') and name[1:].isdigit())
+
+    def latest_version(self, key: ModelKey) -> Optional[int]:
+        try:
+            with open(os.path.join(self._key_dir(key), self.POINTER)) as f:
+                version = int(f.read().strip())
+        except (OSError, ValueError):
+            versions = self.versions(key)
+            return versions[-1] if versions else None
+        return version if version in self.versions(key) else None
+
+    def save(self, key: ModelKey, weights: List[np.ndarray], scaler_state: Optional[dict] = None,
+             buffer_state: Optional[dict] = None, metadata: Optional[dict] = None) -> int:
+        """Write a new checkpoint version for key and point LATEST at it"""
+        key_dir = self._key_dir(key)
+        os.makedirs(key_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=key_dir, prefix='.tmp-')
+        try:
+            np.savez(os.path.join(tmp_dir, 'weights.npz'), **{f"w{i}": w for i, w in enumerate(weights)})
+            if buffer_state is not None:
+                np.savez(os.path.join(tmp_dir, 'replay.npz'), **buffer_state)
+            meta = dict(metadata or {}, key=list(key), created_at=time.time(), weight_count=len(weights))
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump({'meta': meta, 'scaler': scaler_state}, f)
+
+            with self._lock:
+                version = self._publish(key_dir, tmp_dir)
+                self._set_pointer(key_dir, version)
+                self._prune(key, version)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        logging.info(f"Saved checkpoint v{version} for {key}")
+        return version
+
+    def load(self, key: ModelKey, version: Optional[int] = None) -> Optional[dict]:
+        """Checkpoint contents (weights, scaler, replay, meta, version), latest by default"""
+        version = self.latest_version(key) if version is None else version
+        if version is None:
+            return None
+        path = os.path.join(self._key_dir(key), f"v{version:06d}")
+        try:
+            with np.load(os.path.join(path, 'weights.npz')) as data:
+                weights = [data[f"w{i}"] for i in range(len(data.files))]
+            with open(os.path.join(path, 'meta.json')) as f:
+                info = json.load(f)
+            replay = None
+            replay_path = os.path.join(path, 'replay.npz')
+            if os.path.exists(replay_path):
+                with np.load(replay_path) as data:
+                    replay = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Error loading checkpoint v{version} for {key}: {str(e)}")
+            return None
+        return {'version': version, 'weights': weights, 'scaler': info.get('scaler'),
+                'replay': replay, 'meta': info.get('meta', {})}
+
+    def rollback(self, key: ModelKey, version: Optional[int] = None) -> Optional[int]:
+        """Point LATEST at version, or the one before the current latest; returns it"""
+        with self._lock:
+            versions = self.versions(key)
+            if version is None:
+                current = self.latest_version(key)
+                older = [v for v in versions if current is None or v < current]
+                if not older:
+                    return None
+                version = older[-1]
+            elif version not in versions:
+                raise ValueError(f"No checkpoint v{version} for {key}")
+            self._set_pointer(self._key_dir(key), version)
+        logging.info(f"Rolled {key} back to checkpoint v{version}")
+        return version
+
+    def _publish(self, key_dir: str, tmp_dir: str) -> int:
+        # Renaming onto an existing version fails, so concurrent writers
+        # (other processes) simply take the next number
+        while True:
+            existing = [int(n[1:]) for n in os.listdir(key_dir) if n.startswith('v') and n[1:].isdigit()]
+            version = max(existing, default=0) + 1
+            try:
+                os.rename(tmp_dir, os.path.join(key_dir, f"v{version:06d}"))
+                return version
+            except OSError:
+                if not os.path.exists(os.path.join(key_dir, f"v{version:06d}")):
+                    raise
+
+    def _set_pointer(self, key_dir: str, version: int) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=key_dir, prefix='.pointer-')
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(version))
+        os.replace(tmp_path, os.path.join(key_dir, self.POINTER))
+
+    def _prune(self, key: ModelKey, latest: int) -> None:
+        for version in self.versions(key)[:-self.keep_last]:
+            if version != latest:
+                shutil.rmtree(os.path.join(self._key_dir(key), f"v{version:06d}"), ignore_errors=True)
@@ -1,14 +1,30 @@
+import asyncio
 import pandas as pd
 import logging
-from typing import Optional, List
-from .data_providers import CoinGeckoProvider, YahooFinanceProvider
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, List, Tuple
+from .data_providers import CandleStore, CoinGeckoProvider, YahooFinanceProvider
+from .data_providers.async_provider import AsyncCoinGeckoProvider, AsyncThreadedProvider
+from .frame_cache import get_frame_cache
+from .single_flight import SingleFlight
 from config.api_keys import COINGECKO_API_KEY
 
+# Shared by every fetcher in the process so concurrent sessions coalesce
+_flights = SingleFlight()
+
+
 class CryptoDataFetcher:
-    def __init__(self):
+    def __init__(self, store: Optional[CandleStore] = None):
+        self.store = store or CandleStore()
         self.providers = []
         self._initialize_providers()
         self.current_provider_index = 0
+        self.async_providers = [
+            AsyncCoinGeckoProvider(provider) if isinstance(provider, CoinGeckoProvider)
+            else AsyncThreadedProvider(provider)
+            for provider in self.providers
+        ]
 
     def _initialize_providers(self):
         # Initialize CoinGecko provider
@@ -20,6 +36,9 @@ class CryptoDataFetcher:
         # Initialize Yahoo Finance provider
         self.providers.append(YahooFinanceProvider())
 
+        for provider in self.providers:
+            provider.set_store(self.store)
+
     def _get_next_provider(self):
         """Rotate to next available provider"""
         attempts = 0
@@ -46,7 +65,7 @@ class CryptoDataFetcher:
                     logging.error("All providers are rate limited")
                     return pd.DataFrame()
 
-            df = provider.get_historical_data(coin_id, timeframe)
+            df = self._fetch_from(provider, coin_id, timeframe)
             if not df.empty:
                 logging.info(f"Data fetched successfully from {provider.name}")
                 return df
@@ -58,6 +77,116 @@ class CryptoDataFetcher:
         logging.error("Failed to fetch data from all providers")
         return pd.DataFrame()
 
+    def _fetch_from(self, provider, coin_id: str, timeframe: str) -> pd.DataFrame:
+        """
+        Fetch through the process-wide single-flight group so identical
+        concurrent requests share one upstream call. Callers get shallow
+        copies, so adding indicator columns never touches the shared frame.
+        """
+        key = (provider.name, coin_id.lower(), timeframe)
+
+        def fetch():
+            return _flights.do(key, lambda: provider.get_historical_data(coin_id, timeframe))
+
+        # Serve stale frames immediately and refresh them off the render path
+        cache_key = provider.cache_key(coin_id, timeframe)
+        cached, fresh = provider.frame_cache.lookup(cache_key, provider.cache_timeout)
+        if cached is not None:
+            if not fresh:
+                provider.frame_cache.refresh_in_background(cache_key, fetch)
+            _flights.record_hit()
+            return cached.copy(deep=False)
+
+        return fetch().copy(deep=False)
+
+    def get_fetch_stats(self) -> dict:
+        """Single-flight counters (hits, misses, coalesced) plus frame cache statistics"""
+        return {'single_flight': _flights.get_stats(), 'frame_cache': get_frame_cache().get_stats()}
+
+    async def get_historical_data_async(self, coin_id: str, timeframe: str) -> pd.DataFrame:
+        """
+        Ask every provider that supports the pair at once and return the
+        first non-empty answer; the slower requests are cancelled.
+        """
+        tasks = {
+            asyncio.create_task(provider.get_historical_data(coin_id, timeframe)): provider
+            for provider in self.async_providers if provider.supports(coin_id, timeframe)
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    df = task.result()
+                    if not df.empty:
+                        logging.info(f"Data fetched first from {tasks[task].name}")
+                        return df
+        finally:
+            for task in pending:
+                task.cancel()
+
+        logging.error("Failed to fetch data from all providers")
+        return pd.DataFrame()
+
+    def get_many(self, requests: List[Tuple[str, str]]) -> Tuple[Dict[Tuple[str, str], pd.DataFrame], Dict[Tuple[str, str], dict]]:
+        """
+        Fetch many (coin_id, timeframe) pairs at once.
+        Requests are grouped per provider, each group goes through the
+        provider's bulk path, and providers run concurrently. Pairs a
+        provider cannot serve fall back to the next provider in rotation.
+        Returns (frames, metadata); frames are shallow copies, and metadata
+        holds the source provider, latency in seconds and number of attempts
+        for every pair.
+        """
+        pending = list(dict.fromkeys(requests))
+        frames = {pair: pd.DataFrame() for pair in pending}
+        metadata = {pair: {'source': None, 'latency': 0.0, 'attempts': 0} for pair in pending}
+        order = self.providers[self.current_provider_index:] + self.providers[:self.current_provider_index]
+        tried = {pair: set() for pair in pending}
+
+        def fetch_group(provider, pairs):
+            start = time.perf_counter()
+            results = provider.get_many_historical_data(pairs)
+            return provider, results, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=len(self.providers)) as executor:
+            while pending:
+                groups = {}
+                for pair in pending:
+                    provider = next(
+                        (p for p in order if p.name not in tried[pair] and p.supports(*pair)), None
+                    )
+                    if provider is not None:
+                        tried[pair].add(provider.name)
+                        groups.setdefault(provider.name, (provider, []))[1].append(pair)
+
+                if not groups:
+                    break
+
+                futures = [executor.submit(fetch_group, provider, pairs) for provider, pairs in groups.values()]
+                pending = []
+                for future in as_completed(futures):
+                    try:
+                        provider, results, latency = future.result()
+                    except Exception as e:
+                        logging.error(f"Bulk fetch failed: {str(e)}")
+                        continue
+                    for pair, df in results.items():
+                        meta = metadata[pair]
+                        meta['attempts'] += 1
+                        meta['latency'] += latency
+                        if not df.empty:
+                            # Shallow copy, as in _fetch_from: the provider's frame may be the cached one
+                            frames[pair] = df.copy(deep=False)
+                            meta['source'] = provider.name
+                for provider, pairs in groups.values():
+                    pending.extend(pair for pair in pairs if frames[pair].empty)
+
+        missing = [pair for pair in frames if frames[pair].empty]
+        if missing:
+            logging.error(f"Failed to fetch data for {missing}")
+        return frames, metadata
+
     def get_supported_timeframes(self) -> List[str]:
         """Get intersection of supported timeframes across all providers"""
         timeframes = set(self.providers[0].get_supported_timeframes())
@@ -1,5 +1,6 @@
 from .base_provider import BaseDataProvider
+from .candle_store import CandleStore
 from .coingecko_provider import CoinGeckoProvider
 from .yahoo_provider import YahooFinanceProvider
 
-__all__ = ['BaseDataProvider', 'CoinGeckoProvider', 'YahooFinanceProvider']
+__all__ = ['BaseDataProvider', 'CandleStore', 'CoinGeckoProvider', 'YahooFinanceProvider']
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import aiohttp
+import pandas as pd
+
+from .base_provider import BaseDataProvider
+from .coingecko_provider import CoinGeckoProvider
+
+
+class AsyncDataProvider(ABC):
+    """
+    Asyncio counterpart of BaseDataProvider.
+    Requests share one keep-alive aiohttp session per event loop, at most
+    max_concurrency requests are in flight per provider, and each fetch is
+    cancelled once it exceeds timeout seconds.
+    """
+
+    def __init__(self, max_concurrency: int = 4, timeout: float = 10.0):
+        self.name = self.__class__.__name__
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._loop = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _bind_loop(self) -> None:
+        # Sessions and semaphores belong to one event loop; rebuild them on a new loop
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            stale, self._session = self._session, None
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            if stale is not None and not stale.closed:
+                try:
+                    # Releases the old connector; its sockets may already be gone with their loop
+                    await stale.close()
+                except Exception as e:
+                    logging.warning(f"{self.name}: error closing the previous session: {str(e)}")
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        await self._bind_loop()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.max_concurrency, keepalive_timeout=60, ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def get_historical_data(self, coin_id: str, timeframe: str) -> pd.DataFrame:
+        """Fetch historical price data, returning an empty frame on error or timeout"""
+        await self._bind_loop()
+        try:
+            async with self._semaphore:
+                return await asyncio.wait_for(self._fetch(coin_id, timeframe), self.timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"{self.name} timed out fetching {coin_id} {timeframe}")
+        except Exception as e:
+            logging.error(f"{self.name} error: {str(e)}")
+        return pd.DataFrame()
+
+    @abstractmethod
+    async def _fetch(self, coin_id: str, timeframe: str) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def supports(self, coin_id: str, timeframe: str) -> bool:
+        pass
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncCoinGeckoProvider(AsyncDataProvider):
+    """
+    Non-blocking CoinGecko client.
+    Request building, parsing, caching and the candle store are shared with
+    the wrapped CoinGeckoProvider; only the HTTP call runs on aiohttp. Candle
+    store reads and merges are file I/O and run in worker threads.
+    """
+
+    def __init__(self, provider: Optional[CoinGeckoProvider] = None,
+                 base_url: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.provider = provider or CoinGeckoProvider()
+        if base_url:
+            self.provider.base_url = base_url
+
+    def supports(self, coin_id: str, timeframe: str) -> bool:
+        return self.provider.supports(coin_id, timeframe)
+
+    async def _fetch(self, coin_id: str, timeframe: str) -> pd.DataFrame:
+        provider = self.provider
+        lookback = provider._lookback(timeframe)
+
+        cached = provider.get_cached(coin_id, timeframe)
+        if cached is not None:
+            return cached
+
+        if provider.is_rate_limited() or not await asyncio.to_thread(provider._needs_fetch, coin_id, timeframe):
+            df = await asyncio.to_thread(provider._load_stored, coin_id, timeframe, lookback)
+        else:
+            since = await asyncio.to_thread(provider._fetch_start, coin_id, timeframe, lookback)
+            raw = await self._fetch_candles(coin_id, timeframe, since)
+            df = await asyncio.to_thread(provider._load_incremental, coin_id, timeframe, lookback, lambda _: raw)
+
+        if df.empty:
+            stale = provider.get_cached(coin_id, timeframe, fresh_only=False)
+            return stale if stale is not None else df
+
+        df = provider._add_derived_columns(df)
+        provider.frame_cache.put(provider.cache_key(coin_id, timeframe), df)
+        return df
+
+    async def _fetch_candles(self, coin_id: str, timeframe: str, since=None) -> pd.DataFrame:
+        provider = self.provider
+        if not await provider.rate_limiter.acquire_async(timeout=provider.max_queue_wait):
+            return pd.DataFrame()
+
+        url, params, headers = provider._build_request(coin_id, timeframe, since)
+        session = await self._get_session()
+
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 429:
+                provider._handle_rate_limit_response(response.headers)
+                return pd.DataFrame()
+            response.raise_for_status()
+            data = await response.json()
+
+        provider.last_request_time = time.time()
+        provider.rate_limited = False
+        return provider._parse_market_chart(data, timeframe)
+
+
+class AsyncThreadedProvider(AsyncDataProvider):
+    """
+    Async adapter for a blocking provider such as YahooFinanceProvider.
+    Calls run in worker threads; cancelling the awaiting task stops waiting
+    for the result but cannot interrupt the underlying request.
+    """
+
+    def __init__(self, provider: BaseDataProvider, **kwargs):
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.name = f"Async{provider.name}"
+
+    def supports(self, coin_id: str, timeframe: str) -> bool:
+        return self.provider.supports(coin_id, timeframe)
+
+    async def _fetch(self, coin_id: str, timeframe: str) -> pd.DataFrame:
+        return await asyncio.to_thread(self.provider.get_historical_data, coin_id, timeframe)
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
+import logging
+import time
 import pandas as pd
-from typing import Optional, Dict
+from typing import Optional, Dict, Callable, List, Tuple
+from ..frame_cache import get_frame_cache
+from ..rate_limiter import get_bucket, parse_retry_after
 
 class BaseDataProvider(ABC):
     def __init__(self):
@@ -8,6 +12,12 @@ class BaseDataProvider(ABC):
         self.rate_limited = False
         self.last_request_time = 0
         self.min_request_interval = 30  # Default 30 seconds
+        self.frame_cache = get_frame_cache()
+        self.cache_timeout = 300
+        self.rate_limit_burst = 1
+        self.max_queue_wait = 5  # queue for a token at most this long before serving stale data
+        self.store = None
+        self._rate_limiter = None
 
     @abstractmethod
     def get_historical_data(self, coin_id: str, timeframe: str) -> pd.DataFrame:
@@ -27,3 +37,104 @@ class BaseDataProvider(ABC):
     def set_api_key(self, api_key: str) -> None:
         """Set API key if available"""
         self.api_key = api_key
+
+    @property
+    def rate_limiter(self):
+        """Token bucket shared by every instance of this provider, across processes"""
+        if self._rate_limiter is None:
+            self._rate_limiter = get_bucket(
+                self.name, 1.0 / self.min_request_interval, self.rate_limit_burst
+            )
+        return self._rate_limiter
+
+    def _wait_for_slot(self) -> bool:
+        """Queue for a request token; False if the wait would exceed max_queue_wait"""
+        if self.rate_limiter.acquire(timeout=self.max_queue_wait):
+            return True
+        logging.warning(f"{self.name}: no request slot within {self.max_queue_wait}s")
+        return False
+
+    def _handle_rate_limit_response(self, headers) -> None:
+        """Block the shared bucket after an HTTP 429, honouring Retry-After"""
+        self.rate_limited = True
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        self.rate_limiter.block_for(retry_after if retry_after is not None else self.min_request_interval)
+
+    @staticmethod
+    def cache_key(coin_id: str, timeframe: str) -> Tuple[str, str]:
+        """Frame cache key; shared by all providers so a pair is cached once"""
+        return (coin_id.lower(), timeframe)
+
+    def get_cached(self, coin_id: str, timeframe: str, fresh_only: bool = True) -> Optional[pd.DataFrame]:
+        """Return the in-memory frame for the pair, or None if missing (or stale when fresh_only)"""
+        max_age = self.cache_timeout if fresh_only else None
+        return self.frame_cache.get(self.cache_key(coin_id, timeframe), max_age)
+
+    def set_store(self, store) -> None:
+        """Attach a CandleStore used for incremental fetching"""
+        self.store = store
+
+    def _load_incremental(self, coin_id: str, timeframe: str, lookback: pd.Timedelta,
+                          fetch: Callable[[Optional[pd.Timestamp]], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Return the last `lookback` of candles, only asking upstream for the
+        part missing from the candle store.
+        fetch(since) must return raw OHLCV candles starting no later than
+        since, or the full window when since is None.
+        """
+        if self.store is None:
+            return fetch(None)
+
+        if self._needs_fetch(coin_id, timeframe):
+            since = self._fetch_start(coin_id, timeframe, lookback)
+            new = fetch(since)
+            if since is not None and not new.empty:
+                new = new[new.index >= since]
+            self.store.merge(self.name, coin_id, timeframe, new)
+            if not new.empty:
+                logging.info(f"{self.name}: merged {len(new)} new candles for {coin_id} {timeframe}")
+
+        return self._load_stored(coin_id, timeframe, lookback)
+
+    def _needs_fetch(self, coin_id: str, timeframe: str) -> bool:
+        """True when the stored series is missing or was last refreshed too long ago"""
+        if self.store is None:
+            return True
+        fetched_at = self.store.last_fetch_time(self.name, coin_id, timeframe)
+        return time.time() - fetched_at >= self.cache_timeout
+
+    def _fetch_start(self, coin_id: str, timeframe: str, lookback: pd.Timedelta) -> Optional[pd.Timestamp]:
+        """Where an incremental fetch should start, or None for the full window"""
+        if self.store is None:
+            return None
+        # Refetch from the newest stored candle: it may still have been forming
+        last = self.store.last_timestamp(self.name, coin_id, timeframe)
+        return last if last is not None and self._now(last) - last < lookback else None
+
+    def supports(self, coin_id: str, timeframe: str) -> bool:
+        """Whether this provider can serve the coin/timeframe pair at all"""
+        return timeframe in self.get_supported_timeframes()
+
+    def get_many_historical_data(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        Fetch several (coin_id, timeframe) pairs.
+        Providers with a bulk endpoint override this; the default fetches
+        one pair at a time so the provider's own rate limiting still applies.
+        """
+        return {pair: self.get_historical_data(*pair) for pair in pairs}
+
+    def _load_stored(self, coin_id: str, timeframe: str, lookback: pd.Timedelta) -> pd.DataFrame:
+        """Return the last `lookback` of stored candles without touching the network"""
+        if self.store is None:
+            return pd.DataFrame()
+        last = self.store.last_timestamp(self.name, coin_id, timeframe)
+        if last is None:
+            return pd.DataFrame()
+        return self.store.load(self.name, coin_id, timeframe, since=self._now(last) - lookback)
+
+    @staticmethod
+    def _now(like: pd.Timestamp) -> pd.Timestamp:
+        """Current time in the same timezone (or lack of one) as like"""
+        if like.tzinfo is not None:
+            return pd.Timestamp.now(tz=like.tzinfo)
+        return pd.Timestamp.now(tz='UTC').tz_localize(None)
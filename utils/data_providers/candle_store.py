@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.environ.get(
+    'CANDLE_STORE_DIR', os.path.join(os.path.expanduser('~'), '.aphator', 'candles')
+)
+
+
+class CandleStore:
+    """
+    Local columnar OHLCV store.
+    Every (provider, coin, timeframe) series lives in one structured .npy file
+    that is memory-mapped on read and atomically replaced on write, plus a
+    small JSON sidecar with the index timezone and the last fetch time.
+    """
+
+    COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+    DTYPE = np.dtype([('timestamp', 'i8')] + [(col, 'f8') for col in COLUMNS])
+
+    def __init__(self, root: Optional[str] = None, max_rows: int = 500_000):
+        self.root = root or DEFAULT_STORE_DIR
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+
+    def _series_path(self, provider: str, coin_id: str, timeframe: str) -> str:
+        return os.path.join(self.root, provider, f"{coin_id.lower()}_{timeframe}")
+
+    def _read_meta(self, path: str) -> dict:
+        try:
+            with open(path + '.json') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _read_array(self, path: str) -> Optional[np.ndarray]:
+        try:
+            return np.load(path + '.npy', mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+    def last_timestamp(self, provider: str, coin_id: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """Open time of the newest stored candle, or None if nothing is stored"""
+        path = self._series_path(provider, coin_id, timeframe)
+        data = self._read_array(path)
+        if data is None or len(data) == 0:
+            return None
+        tz = self._read_meta(path).get('tz')
+        ts = pd.Timestamp(int(data['timestamp'][-1]))
+        return ts.tz_localize('UTC').tz_convert(tz) if tz else ts
+
+    def last_fetch_time(self, provider: str, coin_id: str, timeframe: str) -> float:
+        """Unix time of the last successful merge, 0 if never fetched"""
+        path = self._series_path(provider, coin_id, timeframe)
+        return self._read_meta(path).get('fetched_at', 0)
+
+    def load(self, provider: str, coin_id: str, timeframe: str,
+             since: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Load stored candles, optionally only those at or after since"""
+        path = self._series_path(provider, coin_id, timeframe)
+        data = self._read_array(path)
+        if data is None or len(data) == 0:
+            return pd.DataFrame()
+
+        tz = self._read_meta(path).get('tz')
+        start = 0
+        if since is not None:
+            start = int(np.searchsorted(data['timestamp'], self._to_int(since, tz), side='left'))
+        data = data[start:]
+
+        index = pd.DatetimeIndex(np.asarray(data['timestamp']).astype('datetime64[ns]'))
+        if tz:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        df = pd.DataFrame({col: np.array(data[col]) for col in self.COLUMNS}, index=index)
+        df.index.name = 'timestamp'
+        return df
+
+    def merge(self, provider: str, coin_id: str, timeframe: str, df: pd.DataFrame) -> None:
+        """Merge new candles into the stored series; newer rows win on duplicate timestamps"""
+        if df.empty:
+            return
+
+        path = self._series_path(provider, coin_id, timeframe)
+        tz = str(df.index.tz) if df.index.tz is not None else None
+
+        incoming = np.empty(len(df), dtype=self.DTYPE)
+        incoming['timestamp'] = self._index_to_int(df.index)
+        for col in self.COLUMNS:
+            incoming[col] = df[col].to_numpy(dtype='f8') if col in df.columns else np.nan
+
+        with self._lock:
+            existing = self._read_array(path)
+            if existing is not None and len(existing):
+                # Only rows from the first incoming timestamp onwards can be replaced
+                cut = int(np.searchsorted(existing['timestamp'], incoming['timestamp'].min(), side='left'))
+                merged = np.concatenate([existing[:cut], incoming])
+            else:
+                merged = incoming
+
+            # Stable sort, then keep the last occurrence of every timestamp
+            merged = merged[np.argsort(merged['timestamp'], kind='stable')]
+            keep = np.append(merged['timestamp'][1:] != merged['timestamp'][:-1], True)
+            merged = merged[keep][-self.max_rows:]
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._atomic_write(path + '.npy', lambda f: np.save(f, merged))
+            meta = {'tz': tz, 'fetched_at': time.time(), 'rows': len(merged)}
+            self._atomic_write(path + '.json', lambda f: f.write(json.dumps(meta).encode()))
+
+        logging.debug(f"Stored {len(incoming)} candles for {provider}/{coin_id}_{timeframe}")
+
+    @staticmethod
+    def _atomic_write(target: str, write) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, target)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _index_to_int(index: pd.DatetimeIndex) -> np.ndarray:
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        return index.as_unit('ns').asi8
+
+    @staticmethod
+    def _to_int(ts: pd.Timestamp, tz: Optional[str]) -> int:
+        ts = pd.Timestamp(ts)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert('UTC').tz_localize(None)
+        elif tz:
+            ts = ts.tz_localize(tz).tz_convert('UTC').tz_localize(None)
+        return ts.as_unit('ns').value
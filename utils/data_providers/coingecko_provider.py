@@ -3,15 +3,18 @@ import requests
 from datetime import datetime, timedelta
 import time
 import logging
+import math
 from .base_provider import BaseDataProvider
 
 class CoinGeckoProvider(BaseDataProvider):
     def __init__(self):
         super().__init__()
         self.base_url = "https://api.coingecko.com/api/v3"
-        self.cache = {}
         self.cache_timeout = 300  # 5 minutes
         self.min_request_interval = 30  # 30 seconds between requests
+        self.request_timeout = 10
+        # Reuse one keep-alive connection pool instead of paying DNS/TCP/TLS per request
+        self.session = requests.Session()
 
     def _get_timeframe_params(self, timeframe):
         mapping = {
@@ -30,64 +33,92 @@ class CoinGeckoProvider(BaseDataProvider):
     def get_supported_timeframes(self):
         return ["1m", "5m", "15m", "30m", "1h", "4h", "1d", "7d", "30d"]
 
+    def _lookback(self, timeframe: str) -> pd.Timedelta:
+        return pd.Timedelta(days=int(self._get_timeframe_params(timeframe)["days"]))
+
     def is_rate_limited(self):
-        current_time = time.time()
-        if current_time - self.last_request_time < self.min_request_interval:
-            return True
-        return self.rate_limited
+        return self.rate_limiter.wait_time() > self.max_queue_wait
 
     def get_historical_data(self, coin_id: str, timeframe: str) -> pd.DataFrame:
         try:
-            cache_key = f"{coin_id}_{timeframe}"
-            current_time = time.time()
+            lookback = self._lookback(timeframe)
 
             # Check cache
-            if cache_key in self.cache:
-                data, timestamp = self.cache[cache_key]
-                if current_time - timestamp < self.cache_timeout:
-                    return data
+            cached = self.get_cached(coin_id, timeframe)
+            if cached is not None:
+                return cached
 
             # Check rate limit
             if self.is_rate_limited():
                 logging.warning("CoinGecko rate limited, returning cached data")
-                return self.cache.get(cache_key, (pd.DataFrame(), 0))[0]
+                stale = self.get_cached(coin_id, timeframe, fresh_only=False)
+                if stale is not None:
+                    return stale
+                df = self._load_stored(coin_id, timeframe, lookback)
+                return self._add_derived_columns(df) if not df.empty else df
+
+            df = self._load_incremental(
+                coin_id, timeframe, lookback,
+                lambda since: self._fetch_candles(coin_id, timeframe, since)
+            )
+            if df.empty:
+                stale = self.get_cached(coin_id, timeframe, fresh_only=False)
+                return stale if stale is not None else pd.DataFrame()
+
+            df = self._add_derived_columns(df)
 
-            params = self._get_timeframe_params(timeframe)
-            url = f"{self.base_url}/coins/{coin_id}/market_chart"
+            # Cache results
+            self.frame_cache.put(self.cache_key(coin_id, timeframe), df)
+            return df
 
-            headers = {}
-            if hasattr(self, 'api_key') and self.api_key:
-                headers['x-cg-pro-api-key'] = self.api_key
+        except Exception as e:
+            logging.error(f"CoinGecko error: {str(e)}")
+            return pd.DataFrame()
 
-            response = requests.get(url, params={
-                "vs_currency": "usd",
-                "days": params["days"],
-                "interval": params["interval"]
-            }, headers=headers)
+    def _fetch_candles(self, coin_id: str, timeframe: str, since=None) -> pd.DataFrame:
+        """Download OHLC candles, only covering the days since `since` when given"""
+        if not self._wait_for_slot():
+            return pd.DataFrame()
 
-            if response.status_code == 429:
-                self.rate_limited = True
-                return self.cache.get(cache_key, (pd.DataFrame(), 0))[0]
+        url, params, headers = self._build_request(coin_id, timeframe, since)
+        response = self.session.get(url, params=params, headers=headers, timeout=self.request_timeout)
 
-            response.raise_for_status()
-            self.last_request_time = current_time
-            self.rate_limited = False
+        if response.status_code == 429:
+            self._handle_rate_limit_response(response.headers)
+            return pd.DataFrame()
 
-            data = response.json()
-            df = pd.DataFrame(data["prices"], columns=["timestamp", "price"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-            df.set_index("timestamp", inplace=True)
+        response.raise_for_status()
+        self.last_request_time = time.time()
+        self.rate_limited = False
 
-            # Process data based on timeframe
-            df = self._process_dataframe(df, timeframe)
-            
-            # Cache results
-            self.cache[cache_key] = (df, current_time)
-            return df
+        return self._parse_market_chart(response.json(), timeframe)
 
-        except Exception as e:
-            logging.error(f"CoinGecko error: {str(e)}")
-            return pd.DataFrame()
+    def _build_request(self, coin_id: str, timeframe: str, since=None):
+        """URL, query parameters and headers for a market_chart request"""
+        params = self._get_timeframe_params(timeframe)
+        days = int(params["days"])
+        if since is not None:
+            missing = self._now(since) - since
+            days = max(1, min(days, math.ceil(missing / pd.Timedelta(days=1))))
+
+        headers = {}
+        if hasattr(self, 'api_key') and self.api_key:
+            headers['x-cg-pro-api-key'] = self.api_key
+
+        query = {
+            "vs_currency": "usd",
+            "days": str(days),
+            "interval": params["interval"]
+        }
+        return f"{self.base_url}/coins/{coin_id}/market_chart", query, headers
+
+    def _parse_market_chart(self, data: dict, timeframe: str) -> pd.DataFrame:
+        df = pd.DataFrame(data["prices"], columns=["timestamp", "price"])
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        df.set_index("timestamp", inplace=True)
+
+        # Process data based on timeframe
+        return self._process_dataframe(df, timeframe)
 
     def _process_dataframe(self, df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
         resample_map = {
@@ -106,7 +137,12 @@ class CoinGeckoProvider(BaseDataProvider):
             df["high"] = df["price"]
             df["low"] = df["price"]
             df["close"] = df["price"]
+            df = df.drop(columns=["price"])
+
+        return df
 
+    def _add_derived_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        # market_chart has no candle volume, so approximate it with short-term volatility
         df["volume"] = df["close"].rolling(window=2).std().fillna(0)
         df["Price_Change"] = df["close"].pct_change()
 
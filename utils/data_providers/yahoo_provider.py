@@ -8,9 +8,9 @@ from .base_provider import BaseDataProvider
 class YahooFinanceProvider(BaseDataProvider):
     def __init__(self):
         super().__init__()
-        self.cache = {}
         self.cache_timeout = 300
         self.min_request_interval = 5  # Yahoo has more lenient rate limits
+        self.rate_limit_burst = 3
         self.symbol_map = {
             'btc': 'BTC-USD',
             'eth': 'ETH-USD',
@@ -26,79 +26,194 @@ class YahooFinanceProvider(BaseDataProvider):
             'uni': 'UNI-USD',
             'xrp': 'XRP-USD'
         }
+        self.interval_map = {
+            "1m": "1m",
+            "3m": "3m",
+            "5m": "5m",
+            "15m": "15m",
+            "30m": "30m",
+            "1h": "1h",
+            "1d": "1d"
+        }
+        self.period_map = {
+            "1m": "1d",
+            "3m": "1d",
+            "5m": "1d",
+            "15m": "1d",
+            "30m": "5d",
+            "1h": "7d",
+            "1d": "60d"
+        }
 
     def get_supported_timeframes(self):
         return ["1m", "3m", "5m", "15m", "30m", "1h", "1d"]
 
     def is_rate_limited(self):
-        current_time = time.time()
-        return (current_time - self.last_request_time) < self.min_request_interval
+        return self.rate_limiter.wait_time() > self.max_queue_wait
 
     def get_supported_coins(self):
         return list(self.symbol_map.keys())
 
+    def supports(self, coin_id: str, timeframe: str) -> bool:
+        return coin_id.lower() in self.symbol_map and timeframe in self.get_supported_timeframes()
+
+    def _lookback(self, timeframe: str) -> pd.Timedelta:
+        return pd.Timedelta(days=int(self.period_map.get(timeframe, "7d").rstrip("d")))
+
     def get_historical_data(self, coin_id: str, timeframe: str) -> pd.DataFrame:
         try:
-            cache_key = f"{coin_id}_{timeframe}"
-            current_time = time.time()
+            lookback = self._lookback(timeframe)
 
-            if cache_key in self.cache:
-                data, timestamp = self.cache[cache_key]
-                if current_time - timestamp < self.cache_timeout:
-                    return data
+            cached = self.get_cached(coin_id, timeframe)
+            if cached is not None:
+                return cached
 
             if self.is_rate_limited():
-                return self.cache.get(cache_key, (pd.DataFrame(), 0))[0]
+                stale = self.get_cached(coin_id, timeframe, fresh_only=False)
+                if stale is not None:
+                    return stale
+                df = self._load_stored(coin_id, timeframe, lookback)
+                return self._add_derived_columns(df) if not df.empty else df
 
-            symbol = self.symbol_map.get(coin_id.lower())
-            if not symbol:
-                logging.error(f"Unsupported coin: {coin_id}")
-                return pd.DataFrame()
-
-            interval_map = {
-                "1m": "1m",
-                "3m": "3m",
-                "5m": "5m",
-                "15m": "15m",
-                "30m": "30m",
-                "1h": "1h",
-                "1d": "1d"
-            }
-
-            period_map = {
-                "1m": "1d",
-                "3m": "1d",
-                "5m": "1d",
-                "15m": "1d",
-                "30m": "5d",
-                "1h": "7d",
-                "1d": "60d"
-            }
-
-            interval = interval_map.get(timeframe, "1h")
-            period = period_map.get(timeframe, "7d")
-
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period=period, interval=interval)
+            return self._refresh(coin_id, timeframe)
 
-            if df.empty:
-                return pd.DataFrame()
+        except Exception as e:
+            logging.error(f"Yahoo Finance error: {str(e)}")
+            return pd.DataFrame()
 
-            df = df.rename(columns={
-                'Open': 'open',
-                'High': 'high',
-                'Low': 'low',
-                'Close': 'close',
-                'Volume': 'volume'
-            })
+    def _refresh(self, coin_id: str, timeframe: str) -> pd.DataFrame:
+        """Bring one series up to date from upstream, ignoring the request interval"""
+        symbol = self.symbol_map.get(coin_id.lower())
+        if not symbol:
+            logging.error(f"Unsupported coin: {coin_id}")
+            return pd.DataFrame()
 
-            df["Price_Change"] = df["close"].pct_change()
+        df = self._load_incremental(
+            coin_id, timeframe, self._lookback(timeframe),
+            lambda since: self._fetch_candles(symbol, timeframe, since)
+        )
 
-            self.cache[cache_key] = (df, current_time)
-            self.last_request_time = current_time
+        if df.empty:
+            return pd.DataFrame()
 
-            return df
+        df = self._add_derived_columns(df)
 
-        except Exception as e:
-            logging.error(f"Yahoo Finance error: {str(e)}")
-            return pd.DataFrame()
\ No newline at end of file
+        self.frame_cache.put(self.cache_key(coin_id, timeframe), df)
+
+        return df
+
+    def get_many_historical_data(self, pairs):
+        """Fetch several (coin_id, timeframe) pairs with one multi-ticker download per timeframe"""
+        results = {}
+        by_timeframe = {}
+
+        for coin_id, timeframe in pairs:
+            cached = self.get_cached(coin_id, timeframe)
+            if cached is not None:
+                results[(coin_id, timeframe)] = cached
+            elif coin_id.lower() in self.symbol_map:
+                by_timeframe.setdefault(timeframe, []).append(coin_id)
+            else:
+                logging.error(f"Unsupported coin: {coin_id}")
+                results[(coin_id, timeframe)] = pd.DataFrame()
+
+        # Serve stale data for the whole batch if no token is coming soon
+        rate_limited = self.is_rate_limited()
+        for timeframe, coins in by_timeframe.items():
+            if rate_limited:
+                for coin_id in coins:
+                    results[(coin_id, timeframe)] = self.get_historical_data(coin_id, timeframe)
+                continue
+
+            try:
+                if len(coins) == 1:
+                    results[(coins[0], timeframe)] = self._refresh(coins[0], timeframe)
+                    continue
+
+                lookback = self._lookback(timeframe)
+                symbols = {coin_id: self.symbol_map[coin_id.lower()] for coin_id in coins}
+                stale = [coin_id for coin_id in coins if self._needs_fetch(coin_id, timeframe)]
+                frames = {}
+                if stale:
+                    starts = [self._fetch_start(coin_id, timeframe, lookback) for coin_id in stale]
+                    since = None if any(start is None for start in starts) else min(starts)
+                    frames = self._download_many([symbols[c] for c in stale], timeframe, since)
+
+                for coin_id in coins:
+                    df = self._load_incremental(
+                        coin_id, timeframe, lookback,
+                        lambda since, symbol=symbols[coin_id]: frames.get(symbol, pd.DataFrame())
+                    )
+                    if not df.empty:
+                        df = self._add_derived_columns(df)
+                        self.frame_cache.put(self.cache_key(coin_id, timeframe), df)
+                    results[(coin_id, timeframe)] = df
+
+            except Exception as e:
+                logging.error(f"Yahoo Finance bulk download error: {str(e)}")
+                for coin_id in coins:
+                    results.setdefault((coin_id, timeframe), pd.DataFrame())
+
+        return results
+
+    def _download_many(self, symbols, timeframe: str, since=None):
+        """Download OHLCV candles for several symbols in one request, keyed by symbol"""
+        interval = self.interval_map.get(timeframe, "1h")
+        period = self.period_map.get(timeframe, "7d")
+        window = {"start": since} if since is not None else {"period": period}
+
+        if not self._wait_for_slot():
+            return {}
+
+        data = yf.download(
+            symbols, interval=interval, group_by='ticker', auto_adjust=True,
+            ignore_tz=False, threads=True, progress=False, **window
+        )
+        self.last_request_time = time.time()
+
+        frames = {}
+        if data.empty:
+            return frames
+        for symbol in symbols:
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            df = data[symbol].dropna(how='all')
+            if not df.empty:
+                frames[symbol] = df.rename(columns={
+                    'Open': 'open',
+                    'High': 'high',
+                    'Low': 'low',
+                    'Close': 'close',
+                    'Volume': 'volume'
+                })
+        return frames
+
+    def _fetch_candles(self, symbol: str, timeframe: str, since=None) -> pd.DataFrame:
+        """Download OHLCV candles, starting at `since` when given"""
+        interval = self.interval_map.get(timeframe, "1h")
+        period = self.period_map.get(timeframe, "7d")
+
+        if not self._wait_for_slot():
+            return pd.DataFrame()
+
+        ticker = yf.Ticker(symbol)
+        if since is not None:
+            df = ticker.history(start=since, interval=interval)
+        else:
+            df = ticker.history(period=period, interval=interval)
+        self.last_request_time = time.time()
+
+        if df.empty:
+            return pd.DataFrame()
+
+        return df.rename(columns={
+            'Open': 'open',
+            'High': 'high',
+            'Low': 'low',
+            'Close': 'close',
+            'Volume': 'volume'
+        })
+
+    def _add_derived_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        df["Price_Change"] = df["close"].pct_change()
+        return df
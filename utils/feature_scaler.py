@@ -0,0 +1,81 @@
+import threading
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+FEATURE_COLUMNS = ['close', 'RSI', 'MACD', 'volume', 'Price_Change']
+
+
+class FeatureScaler:
+    """
+    Persistent min/max scaling of the model features for one coin/timeframe.
+    The first update fits on the full history; later updates only feed the
+    rows at or after the last timestamp seen to MinMaxScaler.partial_fit,
+    so each tick costs O(new rows) and the scale only moves when a new
+    extreme appears. The last candle is refitted because it may be revised.
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        self.columns = columns or FEATURE_COLUMNS
+        self.scaler = MinMaxScaler()
+        self.last_timestamp = None
+        self._lock = threading.Lock()
+
+    @property
+    def fitted(self) -> bool:
+        return hasattr(self.scaler, 'data_min_')
+
+    def update(self, df: pd.DataFrame) -> int:
+        """Extend the fitted range with rows newer than the last update; returns rows used"""
+        with self._lock:
+            new_rows = df if self.last_timestamp is None else df[df.index >= self.last_timestamp]
+            if new_rows.empty:
+                return 0
+        self.partial_fit(self._features(new_rows), new_rows.index[-1])
+        return len(new_rows)
+
+    def partial_fit(self, rows: np.ndarray, last_timestamp=None) -> None:
+        """Extend the fitted range with a (rows, features) array, e.g. from a FeatureWindowBuffer"""
+        if len(rows) == 0:
+            return
+        with self._lock:
+            self.scaler.partial_fit(np.asarray(rows, dtype=float))
+            if last_timestamp is not None:
+                self.last_timestamp = last_timestamp
+
+    def transform(self, window: np.ndarray) -> np.ndarray:
+        """Scale a (rows, features) array into a new float32 array"""
+        with self._lock:
+            scaled = window * self.scaler.scale_ + self.scaler.min_
+        return scaled.astype(np.float32, copy=False)
+
+    def get_state(self) -> dict:
+        """Fitted statistics as plain values, for saving next to the model weights"""
+        with self._lock:
+            if not self.fitted:
+                return {'columns': list(self.columns), 'last_timestamp': None}
+            return {
+                'columns': list(self.columns),
+                'data_min': self.scaler.data_min_.tolist(),
+                'data_max': self.scaler.data_max_.tolist(),
+                'n_samples_seen': int(self.scaler.n_samples_seen_),
+                'last_timestamp': None if self.last_timestamp is None else str(self.last_timestamp),
+            }
+
+    def set_state(self, state: dict) -> None:
+        with self._lock:
+            self.columns = list(state['columns'])
+            self.scaler = MinMaxScaler()
+            self.last_timestamp = None
+            if 'data_min' not in state:
+                return
+            # Replaying the two extremes through partial_fit restores every fitted attribute
+            self.scaler.partial_fit(np.array([state['data_min'], state['data_max']], dtype=float))
+            self.scaler.n_samples_seen_ = state['n_samples_seen']
+            if state['last_timestamp'] is not None:
+                self.last_timestamp = pd.Timestamp(state['last_timestamp'])
+
+    def _features(self, df: pd.DataFrame) -> np.ndarray:
+        return np.column_stack([df[column].to_numpy(dtype=float) for column in self.columns])
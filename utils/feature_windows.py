@@ -0,0 +1,102 @@
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .feature_scaler import FEATURE_COLUMNS
+
+
+class FeatureWindowBuffer:
+    """
+    One contiguous float32 feature matrix with strided sliding windows.
+    Rows are written in place into a preallocated array, and windows are
+    cut from it with a strided view instead of being stored one by one.
+    When the array fills up, the newest half is moved to the front instead
+    of reallocating. The buffer is shared by every analyzer of a model, so
+    everything it returns is copied under its lock: an append from another
+    thread may overwrite or move the rows a view points at.
+
+    claim_training() hands out each (window, next-row label) pair once per
+    buffer, so a model's learner gets one sample per candle however many
+    readers append the same candles.
+    """
+
+    def __init__(self, capacity: int = 8192, window: int = 30, columns: Optional[List[str]] = None):
+        self.columns = columns or FEATURE_COLUMNS
+        self.window = window
+        self.capacity = max(capacity, 2 * window)
+        self.data = np.empty((self.capacity, len(self.columns)), dtype=np.float32)
+        self.size = 0
+        self.last_timestamp = None
+        self._claimed = None  # next row whose label claim_training hands out
+        self._lock = threading.Lock()
+
+    def append(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Write rows of df newer than the last one stored; a row with the last
+        stored timestamp replaces it. Returns a copy of the rows written.
+        """
+        with self._lock:
+            start = 0 if self.last_timestamp is None else int(
+                df.index.searchsorted(self.last_timestamp, side='left')
+            )
+            new = df.iloc[start:]
+            if new.empty:
+                return self.data[self.size:self.size]
+
+            position = self.size
+            if self.last_timestamp is not None and new.index[0] == self.last_timestamp:
+                position -= 1
+            new = new.iloc[-self.capacity:]
+            count = len(new)
+            if position + count > self.capacity:
+                keep = min(position, self.capacity // 2, self.capacity - count)
+                self.data[:keep] = self.data[position - keep:position]
+                if self._claimed is not None:
+                    self._claimed = max(self._claimed - (position - keep), 0)
+                position = keep
+
+            for j, column in enumerate(self.columns):
+                self.data[position:position + count, j] = new[column].to_numpy()
+            self.size = position + count
+            self.last_timestamp = new.index[-1]
+            return self.data[position:self.size].copy()
+
+    def windows(self, count: Optional[int] = None) -> np.ndarray:
+        """The newest count (default all) windows as a (count, window, features) array"""
+        with self._lock:
+            if self.size < self.window:
+                return np.empty((0, self.window, len(self.columns)), dtype=np.float32)
+            views = sliding_window_view(self.data[:self.size], (self.window, len(self.columns)))[:, 0]
+            return (views if count is None else views[max(0, len(views) - count):]).copy()
+
+    def latest(self) -> Optional[np.ndarray]:
+        """The newest (window, features) rows, or None until enough rows are stored"""
+        with self._lock:
+            if self.size < self.window:
+                return None
+            return self.data[self.size - self.window:self.size].copy()
+
+    def claim_training(self, label: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Windows not handed out before, each with the label column of the row
+        that follows it. The newest row is still forming and is never used as
+        a label. The first call only sets the starting point, so rows that
+        were stored before it (seeded history) are not claimed.
+        """
+        column = self.columns.index(label)
+        with self._lock:
+            end = self.size - 1
+            if self._claimed is None:
+                self._claimed = max(end, self.window)
+            start = max(self._claimed, self.window)
+            if start >= end:
+                return np.empty((0, self.window, len(self.columns)), dtype=np.float32), np.empty(0, dtype=np.float32)
+            views = sliding_window_view(self.data[:end - 1], (self.window, len(self.columns)))[:, 0]
+            self._claimed = end
+            return views[start - self.window:].copy(), self.data[start:end, column].copy()
+
+    def __len__(self):
+        return self.size
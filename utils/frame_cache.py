@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Optional, Tuple
+
+import pandas as pd
+
+
+class FrameCache:
+    """
+    Bounded LRU cache of DataFrames with a byte budget.
+    Entries younger than the caller's max_age are fresh. Older entries are
+    still served (stale-while-revalidate) until they are stale_ttl seconds
+    past that age, while refresh_in_background reloads them off the render
+    path. The least recently used entries are evicted once the summed
+    DataFrame memory usage exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, stale_ttl: float = 3600,
+                 refresh_workers: int = 2):
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[pd.DataFrame, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='frame-refresh')
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'refreshes': 0}
+
+    def lookup(self, key: Hashable, max_age: float) -> Tuple[Optional[pd.DataFrame], bool]:
+        """Return (frame, is_fresh); frame is None on a miss or once it is too stale to serve"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None, False
+
+            df, stored_at, _ = entry
+            age = time.time() - stored_at
+            if age >= max_age + self.stale_ttl:
+                self._remove(key)
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None, False
+
+            self._entries.move_to_end(key)
+            fresh = age < max_age
+            self.stats['hits' if fresh else 'stale_hits'] += 1
+            return df, fresh
+
+    def get(self, key: Hashable, max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """Frame for key if younger than max_age (any age when None), without touching stats"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if max_age is not None and time.time() - entry[1] >= max_age:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(deep=True, index=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                logging.warning(f"Frame for {key} ({size} bytes) exceeds the cache budget, not cached")
+                return
+            self._entries[key] = (df, time.time(), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def refresh_in_background(self, key: Hashable, refresh: Callable[[], object]) -> None:
+        """Run refresh once per key in a worker thread; refresh is expected to put() the new frame"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.stats['refreshes'] += 1
+
+        def run():
+            try:
+                refresh()
+            except Exception as e:
+                logging.error(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+_frame_cache = FrameCache()
+
+
+def get_frame_cache() -> FrameCache:
+    """Return the frame cache shared by all providers in the process"""
+    return _frame_cache
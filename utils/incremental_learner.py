@@ -1,40 +1,155 @@
 import tensorflow as tf
 import numpy as np
-from threading import Thread
+from threading import Event, Lock, RLock, Thread
 import time
 import logging
 
+
+class ReplayBuffer:
+    """Preallocated ring buffer of (window, label) samples with random minibatch sampling"""
+
+    def __init__(self, capacity=1000, sample_shape=(30, 5)):
+        self.capacity = capacity
+        self.features = np.zeros((capacity,) + tuple(sample_shape), dtype=np.float32)
+        self.labels = np.zeros(capacity, dtype=np.float32)
+        self.position = 0
+        self.size = 0
+        self._lock = Lock()
+
+    def add(self, features, label):
+        with self._lock:
+            self.features[self.position] = features
+            self.labels[self.position] = label
+            self.position = (self.position + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size, rng):
+        """Copy out a random minibatch so training never reads rows being overwritten"""
+        with self._lock:
+            rows = rng.choice(self.size, size=min(batch_size, self.size), replace=False)
+            return self.features[rows], self.labels[rows]
+
+    def get_state(self):
+        with self._lock:
+            return {
+                'features': self.features[:self.size].copy() if self.size < self.capacity else self.features.copy(),
+                'labels': self.labels[:self.size].copy() if self.size < self.capacity else self.labels.copy(),
+                'position': np.array(self.position),
+            }
+
+    def set_state(self, state):
+        """Restore samples saved by get_state, keeping the newest ones if capacity shrank"""
+        features = np.asarray(state['features'], dtype=np.float32)
+        labels = np.asarray(state['labels'], dtype=np.float32)
+        if features.shape[1:] != self.features.shape[1:]:
+            raise ValueError(f"Replay sample shape {features.shape[1:]} does not match {self.features.shape[1:]}")
+        # Unroll the saved ring into oldest-first order
+        order = np.roll(np.arange(len(features)), -int(state['position']))
+        features, labels = features[order][-self.capacity:], labels[order][-self.capacity:]
+        with self._lock:
+            self.size = len(features)
+            self.features[:self.size] = features
+            self.labels[:self.size] = labels
+            self.position = self.size % self.capacity
+
+    def __len__(self):
+        return self.size
+
+
 class IncrementalLearner(Thread):
-    def __init__(self, model, update_interval=300):
+    """
+    Background trainer for a shared model.
+    Samples go into a ReplayBuffer; an update runs once train_every new
+    samples have arrived or update_interval seconds have passed, and trains
+    a shadow copy of the model on random minibatches. The trained weights
+    are copied into the live model under model_lock, which inference holds
+    for each forward pass, so predictions never see a half-updated model.
+    """
+
+    def __init__(self, model, update_interval=300, on_update=None, capacity=1000,
+                 batch_size=32, train_every=32, steps_per_update=4, model_lock=None, seed=None):
         super().__init__()
         self.model = model
         self.update_interval = update_interval
+        self.on_update = on_update
+        self.batch_size = batch_size
+        self.train_every = train_every
+        self.steps_per_update = steps_per_update
+        self.model_lock = model_lock or RLock()
+        self.buffer = ReplayBuffer(capacity, model.input_shape[1:])
         self.running = True
         self.daemon = True
-        self.training_data = []
-        
+        self._shadow = None
+        self._new_samples = 0
+        self._wake = Event()
+        self._rng = np.random.default_rng(seed)
+        self.stats = {
+            'samples_added': 0,
+            'updates': 0,
+            'samples_trained': 0,
+            'last_loss': None,
+            'samples_per_second': 0.0,
+            'last_update': None,
+        }
+
     def add_training_data(self, features, labels):
-        self.training_data.append((features, labels))
-        if len(self.training_data) > 1000:  # Keep last 1000 samples
-            self.training_data.pop(0)
-    
+        self.buffer.add(features, labels)
+        self.stats['samples_added'] += 1
+        self._new_samples += 1
+        if self._new_samples >= self.train_every:
+            self._wake.set()
+
     def run(self):
         while self.running:
+            self._wake.wait(self.update_interval)
+            self._wake.clear()
+            if not self.running:
+                break
             try:
-                if len(self.training_data) >= 32:  # Minimum batch size
-                    features = np.array([x[0] for x in self.training_data[-32:]])
-                    labels = np.array([x[1] for x in self.training_data[-32:]])
-                    
-                    # Incremental training with small batch
-                    self.model.train_on_batch(features, labels)
-                    
-                    logging.info("Incremental model update completed")
-                
-                time.sleep(self.update_interval)
-                
+                if len(self.buffer) >= self.batch_size:
+                    self.train_step()
             except Exception as e:
                 logging.error(f"Error in incremental learning: {str(e)}")
-                time.sleep(self.update_interval)
-    
+
+    def train_step(self):
+        """Train the shadow model on random minibatches and publish its weights"""
+        self._new_samples = 0
+        shadow = self._get_shadow()
+
+        start = time.perf_counter()
+        loss = None
+        for _ in range(self.steps_per_update):
+            features, labels = self.buffer.sample(self.batch_size, self._rng)
+            loss = shadow.train_on_batch(features, labels)
+        elapsed = time.perf_counter() - start
+
+        with self.model_lock:
+            self.model.set_weights(shadow.get_weights())
+
+        trained = self.batch_size * self.steps_per_update
+        self.stats['updates'] += 1
+        self.stats['samples_trained'] += trained
+        self.stats['last_loss'] = float(np.ravel(loss)[0])
+        self.stats['samples_per_second'] = trained / elapsed if elapsed > 0 else 0.0
+        self.stats['last_update'] = time.time()
+        if self.on_update:
+            self.on_update()
+        logging.info(f"Incremental model update completed, loss {self.stats['last_loss']:.6f}")
+
+    def get_stats(self):
+        return dict(self.stats, buffered=len(self.buffer))
+
+    def _get_shadow(self):
+        # Start every update from the live weights, which may have been
+        # replaced (e.g. by a checkpoint restore) since the last update
+        with self.model_lock:
+            weights = self.model.get_weights()
+        if self._shadow is None:
+            self._shadow = tf.keras.models.clone_model(self.model)
+            self._shadow.compile(optimizer='adam', loss=self.model.loss or 'mse')
+        self._shadow.set_weights(weights)
+        return self._shadow
+
     def stop(self):
         self.running = False
+        self._wake.set()
@@ -0,0 +1,236 @@
+import math
+from typing import Dict, Mapping
+
+import numpy as np
+import pandas as pd
+
+# Streaming values agree with TechnicalAnalyzer.calculate_indicators to within
+# this relative tolerance (running sums are re-summed periodically to bound drift)
+TOLERANCE = 1e-9
+
+
+class _RollingWindow:
+    """Fixed-size ring buffer with O(1) rolling sum, mean and sample variance"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.buffer = np.zeros(size)
+        self.head = 0
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.pushes = 0
+        self.run = 0  # length of the trailing run of identical values
+        self._undo = None
+
+    def push(self, value: float) -> None:
+        full = self.count == self.size
+        evicted = self.buffer[self.head]
+        last = self.buffer[self.head - 1]
+        self._undo = (self.head, evicted, self.count, self.total, self.mean, self.m2, self.pushes, self.run)
+        self.run = self.run + 1 if self.count and value == last else 1
+
+        if full:
+            # Welford update for replacing the oldest value with the newest
+            old_mean = self.mean
+            self.mean += (value - evicted) / self.size
+            self.m2 += (value - evicted) * (value - self.mean + evicted - old_mean)
+            self.total += value - evicted
+        else:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+            self.total += value
+
+        self.buffer[self.head] = value
+        self.head = (self.head + 1) % self.size
+        self.pushes += 1
+
+        if self.pushes % (self.size * 64) == 0:
+            self._resum()
+
+    def pop_last(self) -> None:
+        """Undo the most recent push"""
+        if self._undo is None:
+            raise RuntimeError("Nothing to undo")
+        self.head, evicted, self.count, self.total, self.mean, self.m2, self.pushes, self.run = self._undo
+        self.buffer[self.head] = evicted
+        self._undo = None
+
+    def seed(self, values: np.ndarray, pushes: int) -> None:
+        """Load the trailing window of values; the last one is pushed so it can be undone"""
+        values = np.asarray(values, dtype=float)
+        self._load(values[:-1], pushes - 1)
+        if len(values):
+            self.push(values[-1])
+
+    def _load(self, values: np.ndarray, pushes: int) -> None:
+        values = values[-self.size:]
+        self.buffer[:] = 0.0
+        self.buffer[:len(values)] = values
+        self.count = len(values)
+        self.head = self.count % self.size
+        self.pushes = pushes
+        self.run = 1
+        while self.run < len(values) and values[-self.run - 1] == values[-1]:
+            self.run += 1
+        self._undo = None
+        self._resum()
+
+    def _resum(self) -> None:
+        if self.count == 0:
+            self.total = self.mean = self.m2 = 0.0
+            return
+        values = self.buffer[:self.count]
+        self.total = float(values.sum())
+        self.mean = self.total / self.count
+        self.m2 = float(((values - self.mean) ** 2).sum())
+
+    @property
+    def ready(self) -> bool:
+        return self.count == self.size
+
+    def sma(self) -> float:
+        return self.total / self.size if self.ready else math.nan
+
+    def std(self) -> float:
+        if not self.ready:
+            return math.nan
+        # A constant window has exactly zero spread; don't let rounding in m2 say otherwise
+        if self.run >= self.size:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (self.size - 1))
+
+
+class _EMA:
+    """Recursive EMA equivalent to pandas ewm(span=..., adjust=False)"""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1)
+        self.value = math.nan
+        self._undo = math.nan
+
+    def push(self, x: float) -> float:
+        self._undo = self.value
+        self.value = x if math.isnan(self.value) else self.value + self.alpha * (x - self.value)
+        return self.value
+
+    def pop_last(self) -> None:
+        self.value = self._undo
+
+    def seed(self, value: float, previous: float = math.nan) -> None:
+        """Set the state after the last seeded value, with previous as the state to undo to"""
+        self.value = value
+        self._undo = previous
+
+
+class StreamingIndicators:
+    """
+    Stateful counterpart of TechnicalAnalyzer.calculate_indicators.
+    Seed it once from history, then advance it one candle at a time with
+    update(); each update is O(1) regardless of how much history was seen.
+    RSI uses the same 14-period simple averages of gains and losses as the
+    pandas path (not Wilder smoothing), so both produce identical values.
+    """
+
+    def __init__(self, rsi_period: int = 14, bb_width: float = 2.0):
+        self.bb_width = bb_width
+        self.ma = {window: _RollingWindow(window) for window in (20, 50, 200)}
+        self.gains = _RollingWindow(rsi_period)
+        self.losses = _RollingWindow(rsi_period)
+        self.ema_fast = _EMA(12)
+        self.ema_slow = _EMA(26)
+        self.ema_signal = _EMA(9)
+        self.last_close = math.nan
+        self._prev_close = math.nan
+        self.latest: Dict[str, float] = {}
+
+    def seed(self, df: pd.DataFrame) -> Dict[str, float]:
+        """Initialise state from historical candles with vectorized pandas calls"""
+        close = df['close'].to_numpy(dtype=float)
+        n = len(close)
+        if n == 0:
+            return {}
+
+        for window in self.ma.values():
+            window.seed(close, n)
+
+        delta = np.diff(close, prepend=np.nan)
+        delta[0] = 0.0  # matches delta.where(...) filling the leading NaN with 0
+        self.gains.seed(np.where(delta > 0, delta, 0.0), n)
+        self.losses.seed(np.where(delta < 0, -delta, 0.0), n)
+
+        series = pd.Series(close)
+        fast = series.ewm(span=12, adjust=False).mean()
+        slow = series.ewm(span=26, adjust=False).mean()
+        macd = fast - slow
+        signal = macd.ewm(span=9, adjust=False).mean()
+        # The state before the last candle is kept so a revision of it can be rolled back
+        for ema, values in ((self.ema_fast, fast), (self.ema_slow, slow), (self.ema_signal, signal)):
+            ema.seed(float(values.iloc[-1]), float(values.iloc[-2]) if n > 1 else math.nan)
+
+        self.last_close = close[-1]
+        self._prev_close = close[-2] if n > 1 else math.nan
+        self.latest = self._snapshot(float(macd.iloc[-1]))
+        return self.latest
+
+    def update(self, candle: Mapping, replace_last: bool = False) -> Dict[str, float]:
+        """
+        Advance by one candle and return its indicator values.
+        Pass replace_last=True when the candle is a revision of the previous
+        (still forming) one rather than a new bar.
+        """
+        if replace_last:
+            self._rollback()
+
+        close = float(candle['close'])
+        delta = 0.0 if math.isnan(self.last_close) else close - self.last_close
+
+        for window in self.ma.values():
+            window.push(close)
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+
+        macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        self.ema_signal.push(macd)
+
+        self._prev_close = self.last_close
+        self.last_close = close
+        self.latest = self._snapshot(macd)
+        return self.latest
+
+    def _rollback(self) -> None:
+        for window in (*self.ma.values(), self.gains, self.losses):
+            window.pop_last()
+        for ema in (self.ema_fast, self.ema_slow, self.ema_signal):
+            ema.pop_last()
+        self.last_close = self._prev_close
+
+    def _snapshot(self, macd: float) -> Dict[str, float]:
+        ma20 = self.ma[20].sma()
+        std20 = self.ma[20].std()
+        signal = self.ema_signal.value
+        return {
+            'MA20': ma20,
+            'MA50': self.ma[50].sma(),
+            'MA200': self.ma[200].sma(),
+            'BB_middle': ma20,
+            'BB_upper': ma20 + self.bb_width * std20,
+            'BB_lower': ma20 - self.bb_width * std20,
+            'RSI': self._rsi(),
+            'MACD': macd,
+            'MACD_Signal': signal,
+            'MACD_Hist': macd - signal,
+        }
+
+    def _rsi(self) -> float:
+        gain = self.gains.sma()
+        loss = self.losses.sma()
+        if math.isnan(gain) or math.isnan(loss):
+            return math.nan
+        if loss == 0:
+            return 100.0 if gain > 0 else math.nan
+        return 100 - (100 / (1 + gain / loss))
+
@@ -0,0 +1,29 @@
+from . import builtin  # registers the built-in indicators
+from .kernels import HAS_NUMBA
+from .registry import (
+    IndicatorCache,
+    IndicatorContext,
+    IndicatorFrame,
+    available_indicators,
+    compute_indicators,
+    get_indicator,
+    get_indicator_cache,
+    register,
+)
+
+# The columns calculate_indicators has always produced
+DEFAULT_INDICATORS = [
+    {'indicator': 'sma', 'params': {'window': 20}, 'columns': {'value': 'MA20'}},
+    {'indicator': 'sma', 'params': {'window': 50}, 'columns': {'value': 'MA50'}},
+    {'indicator': 'sma', 'params': {'window': 200}, 'columns': {'value': 'MA200'}},
+    {'indicator': 'bollinger', 'params': {'window': 20, 'width': 2.0},
+     'columns': {'middle': 'BB_middle', 'upper': 'BB_upper', 'lower': 'BB_lower'}},
+    {'indicator': 'rsi', 'params': {'period': 14}, 'columns': {'value': 'RSI'}},
+    {'indicator': 'macd', 'params': {'fast': 12, 'slow': 26, 'signal': 9},
+     'columns': {'macd': 'MACD', 'signal': 'MACD_Signal', 'hist': 'MACD_Hist'}},
+]
+
+__all__ = [
+    'DEFAULT_INDICATORS', 'HAS_NUMBA', 'IndicatorCache', 'IndicatorContext', 'IndicatorFrame', 'available_indicators',
+    'compute_indicators', 'get_indicator', 'get_indicator_cache', 'register',
+]
@@ -0,0 +1,62 @@
+from . import kernels
+from .registry import register
+
+
+@register('sma', window=20)
+def sma(ctx, window):
+    return kernels.sma(ctx['close'], window)
+
+
+@register('ema', span=20)
+def ema(ctx, span):
+    return kernels.ema(ctx['close'], span=span)
+
+
+@register('rolling_std', window=20)
+def rolling_std(ctx, window):
+    return kernels.rolling_std(ctx['close'], window)
+
+
+@register('bollinger', outputs=('middle', 'upper', 'lower'), window=20, width=2.0)
+def bollinger(ctx, window, width):
+    middle = ctx.value('sma', window=window)
+    std = ctx.value('rolling_std', window=window)
+    return {'middle': middle, 'upper': middle + width * std, 'lower': middle - width * std}
+
+
+@register('rsi', period=14)
+def rsi(ctx, period):
+    # Simple means of gains and losses, like the original pandas rolling RSI
+    gains, losses = kernels.gains_losses(ctx['close'])
+    return kernels.rsi_from_averages(kernels.sma(gains, period), kernels.sma(losses, period))
+
+
+@register('macd', outputs=('macd', 'signal', 'hist'), fast=12, slow=26, signal=9)
+def macd(ctx, fast, slow, signal):
+    line = ctx.value('ema', span=fast) - ctx.value('ema', span=slow)
+    signal_line = kernels.ema(line, span=signal)
+    return {'macd': line, 'signal': signal_line, 'hist': line - signal_line}
+
+
+@register('atr', inputs=('high', 'low', 'close'), period=14)
+def atr(ctx, period):
+    # Wilder smoothing, i.e. an EMA with alpha = 1 / period
+    return kernels.ema(kernels.true_range(ctx['high'], ctx['low'], ctx['close']), alpha=1.0 / period)
+
+
+@register('stochastic', inputs=('high', 'low', 'close'), outputs=('k', 'd'), period=14, smooth=3)
+def stochastic(ctx, period, smooth):
+    highest = kernels.rolling_max(ctx['high'], period)
+    lowest = kernels.rolling_min(ctx['low'], period)
+    k = 100 * (ctx['close'] - lowest) / (highest - lowest)
+    return {'k': k, 'd': kernels.sma(k, smooth)}
+
+
+@register('obv', inputs=('close', 'volume'))
+def obv(ctx):
+    return kernels.on_balance_volume(ctx['close'], ctx['volume'])
+
+
+@register('vwap', inputs=('high', 'low', 'close', 'volume'), window=None)
+def vwap(ctx, window):
+    return kernels.vwap(ctx['high'], ctx['low'], ctx['close'], ctx['volume'], window)
@@ -0,0 +1,233 @@
+"""
+Indicator kernels over float64 NumPy arrays.
+
+Every kernel has a vectorized NumPy/SciPy implementation. When numba is
+installed the windowed and recursive ones (SMA, rolling std, rolling
+max/min, EMA) are replaced by compiled single-pass loops. Outputs follow
+the pandas conventions calculate_indicators used: a window is NaN until it
+is full, EMAs are adjust=False, and the std uses ddof=1.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+try:
+    import numba
+except ImportError:  # pure NumPy kernels
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+
+def _as_float(x) -> np.ndarray:
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _windowed(x: np.ndarray, window: int, reduce) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = reduce(sliding_window_view(x, window), axis=1)
+    return out
+
+
+def _sma_numpy(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) < window:
+        return out
+    missing = np.isnan(x)
+    if not missing.any():
+        sums = np.cumsum(x)
+        out[window - 1] = sums[window - 1] / window
+        out[window:] = (sums[window:] - sums[:-window]) / window
+        return out
+    # Running sums over a NaN-free copy; windows that contained a NaN stay NaN
+    sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, x))))
+    counts = np.concatenate(([0], np.cumsum(missing)))
+    means = (sums[window:] - sums[:-window]) / window
+    means[(counts[window:] - counts[:-window]) > 0] = np.nan
+    out[window - 1:] = means
+    return out
+
+
+def _rolling_std_numpy(x: np.ndarray, window: int, block: int = 4096) -> np.ndarray:
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window or window < 2:
+        return out
+    if np.isnan(x).any():
+        return _windowed(x, window, lambda v, axis: np.std(v, axis=axis, ddof=1))
+
+    # Running sums of squares cancel badly when the mean is large, so each
+    # block of rows is centred on its own mean before accumulating
+    for start in range(window - 1, n, block):
+        stop = min(start + block, n)
+        segment = x[start - window + 1:stop]
+        segment = segment - segment.mean()
+        s1 = np.concatenate(([0.0], np.cumsum(segment)))
+        s2 = np.concatenate(([0.0], np.cumsum(segment * segment)))
+        total = s1[window:] - s1[:-window]
+        squares = s2[window:] - s2[:-window]
+        out[start:stop] = np.sqrt(np.maximum(squares - total * total / window, 0.0) / (window - 1))
+
+    # A window of identical values has a std of exactly 0, as in pandas
+    changes = np.concatenate(([0], np.cumsum(x[1:] != x[:-1])))
+    flat = (changes[window - 1:] - changes[:n - window + 1]) == 0
+    out[window - 1:][flat] = 0.0
+    return out
+
+
+def _rolling_max_numpy(x: np.ndarray, window: int) -> np.ndarray:
+    return _windowed(x, window, np.max)
+
+
+def _rolling_min_numpy(x: np.ndarray, window: int) -> np.ndarray:
+    return _windowed(x, window, np.min)
+
+
+def _ema_numpy(x: np.ndarray, alpha: float) -> np.ndarray:
+    if len(x) == 0:
+        return x.copy()
+    # y[i] = alpha * x[i] + (1 - alpha) * y[i-1] with y[0] = x[0]
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * x[0]])
+    return out
+
+
+if HAS_NUMBA:
+    @numba.njit(cache=True)
+    def _sma_loop(x, window):
+        n = len(x)
+        out = np.full(n, np.nan)
+        total = 0.0
+        missing = 0
+        for i in range(n):
+            if np.isnan(x[i]):
+                missing += 1
+            else:
+                total += x[i]
+            if i >= window:
+                if np.isnan(x[i - window]):
+                    missing -= 1
+                else:
+                    total -= x[i - window]
+            if i >= window - 1 and missing == 0:
+                out[i] = total / window
+        return out
+
+    @numba.njit(cache=True)
+    def _rolling_std_loop(x, window):
+        # Two-pass per window keeps the precision of np.std; window sizes are small
+        n = len(x)
+        out = np.full(n, np.nan)
+        for i in range(window - 1, n):
+            mean = 0.0
+            for j in range(i - window + 1, i + 1):
+                mean += x[j]
+            mean /= window
+            acc = 0.0
+            for j in range(i - window + 1, i + 1):
+                acc += (x[j] - mean) ** 2
+            out[i] = np.sqrt(acc / (window - 1))
+        return out
+
+    @numba.njit(cache=True)
+    def _rolling_extreme_loop(x, window, sign):
+        # A NaN anywhere in the window makes it NaN, as in the NumPy path and pandas
+        n = len(x)
+        out = np.full(n, np.nan)
+        for i in range(window - 1, n):
+            best = x[i] * sign
+            missing = np.isnan(best)
+            for j in range(i - window + 1, i):
+                value = x[j] * sign
+                if np.isnan(value):
+                    missing = True
+                elif value > best:
+                    best = value
+            if not missing:
+                out[i] = best * sign
+        return out
+
+    @numba.njit(cache=True)
+    def _ema_loop(x, alpha):
+        out = np.empty(len(x))
+        if len(x) == 0:
+            return out
+        out[0] = x[0]
+        for i in range(1, len(x)):
+            out[i] = alpha * x[i] + (1.0 - alpha) * out[i - 1]
+        return out
+
+
+def sma(x, window: int) -> np.ndarray:
+    x = _as_float(x)
+    return _sma_loop(x, window) if HAS_NUMBA else _sma_numpy(x, window)
+
+
+def rolling_std(x, window: int) -> np.ndarray:
+    x = _as_float(x)
+    return _rolling_std_loop(x, window) if HAS_NUMBA else _rolling_std_numpy(x, window)
+
+
+def rolling_max(x, window: int) -> np.ndarray:
+    x = _as_float(x)
+    return _rolling_extreme_loop(x, window, 1.0) if HAS_NUMBA else _rolling_max_numpy(x, window)
+
+
+def rolling_min(x, window: int) -> np.ndarray:
+    x = _as_float(x)
+    return _rolling_extreme_loop(x, window, -1.0) if HAS_NUMBA else _rolling_min_numpy(x, window)
+
+
+def ema(x, span: float = None, alpha: float = None) -> np.ndarray:
+    """Exponential moving average (pandas ewm(adjust=False)); give span or alpha"""
+    alpha = alpha if alpha is not None else 2.0 / (span + 1.0)
+    x = _as_float(x)
+    return _ema_loop(x, alpha) if HAS_NUMBA else _ema_numpy(x, alpha)
+
+
+def ema_rows(x, span: float = None, alpha: float = None) -> np.ndarray:
+    """ema() applied to every row of a 2-D array in one call"""
+    alpha = alpha if alpha is not None else 2.0 / (span + 1.0)
+    x = _as_float(x)
+    if x.shape[-1] == 0:
+        return x.copy()
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], x, axis=-1, zi=(1.0 - alpha) * x[..., :1])
+    return out
+
+
+def gains_losses(close) -> tuple:
+    """Per-candle gains and losses, with the first candle counting as no change"""
+    close = _as_float(close)
+    delta = np.empty_like(close)
+    delta[:1] = 0.0
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    # fmax treats a NaN change as 0, like delta.where(delta > 0, 0) in pandas
+    return np.fmax(delta, 0.0), np.fmax(-delta, 0.0)
+
+
+def rsi_from_averages(gain: np.ndarray, loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + gain / loss))
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return np.nanmax(ranges, axis=0)
+
+
+def on_balance_volume(close, volume) -> np.ndarray:
+    direction = np.sign(np.diff(_as_float(close), prepend=np.nan))
+    direction[0] = 0.0
+    return np.cumsum(np.nan_to_num(direction) * _as_float(volume))
+
+
+def vwap(high, low, close, volume, window: int = None) -> np.ndarray:
+    """Volume-weighted average of the typical price, cumulative or over a rolling window"""
+    typical = (_as_float(high) + _as_float(low) + _as_float(close)) / 3
+    volume = _as_float(volume)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if window is None:
+            return np.cumsum(typical * volume) / np.cumsum(volume)
+        return sma(typical * volume, window) / sma(volume, window)
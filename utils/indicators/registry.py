@@ -0,0 +1,202 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class Indicator(NamedTuple):
+    name: str
+    func: Callable
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    defaults: Dict[str, Any]
+
+
+_INDICATORS: Dict[str, Indicator] = {}
+
+
+def register(name: str, inputs: Iterable[str] = ('close',), outputs: Iterable[str] = ('value',), **defaults):
+    """
+    Register an indicator kernel under name.
+    The function receives an IndicatorContext followed by its parameters
+    and returns one array per output (a dict when there are several).
+    """
+    def decorator(func: Callable) -> Callable:
+        _INDICATORS[name] = Indicator(name, func, tuple(inputs), tuple(outputs), defaults)
+        return func
+    return decorator
+
+
+def get_indicator(name: str) -> Indicator:
+    try:
+        return _INDICATORS[name]
+    except KeyError:
+        raise KeyError(f"Unknown indicator {name!r}; available: {sorted(_INDICATORS)}") from None
+
+
+def available_indicators() -> List[str]:
+    return sorted(_INDICATORS)
+
+
+def fingerprint(*arrays: np.ndarray) -> str:
+    """Content hash of the input series, used to key cached indicator outputs"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        digest.update(str(array.shape).encode())
+        digest.update(np.ascontiguousarray(array).view(np.uint8))
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """LRU of indicator outputs keyed by (input fingerprint, name, params), bounded in bytes"""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Tuple[Dict[str, np.ndarray], int]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key: tuple) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key: tuple, outputs: Dict[str, np.ndarray]) -> None:
+        size = sum(array.nbytes for array in outputs.values())
+        with self._lock:
+            if key in self._entries or size > self.max_bytes:
+                return
+            for array in outputs.values():
+                array.flags.writeable = False  # shared between callers
+            self._entries[key] = (outputs, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.stats['evictions'] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_cache = IndicatorCache()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Return the indicator output cache shared by the whole process"""
+    return _cache
+
+
+class IndicatorContext:
+    """
+    Input columns of one frame plus memoized indicator outputs.
+    Kernels call get() for the indicators they build on, so shared pieces
+    such as the 20-period SMA behind both MA20 and the Bollinger middle
+    band are computed once per series.
+    """
+
+    def __init__(self, columns: Mapping[str, np.ndarray], cache: Optional[IndicatorCache] = None):
+        self.columns = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+        self.cache = cache if cache is not None else _cache
+        self._fingerprints: Dict[Tuple[str, ...], str] = {}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def get(self, name: str, **params) -> Dict[str, np.ndarray]:
+        indicator = get_indicator(name)
+        params = dict(indicator.defaults, **params)
+        key = (self._fingerprint(indicator.inputs), name, tuple(sorted(params.items())))
+
+        outputs = self.cache.get(key)
+        if outputs is None:
+            result = indicator.func(self, **params)
+            outputs = result if isinstance(result, dict) else {indicator.outputs[0]: result}
+            self.cache.put(key, outputs)
+        return outputs
+
+    def value(self, name: str, **params) -> np.ndarray:
+        """The single output of a one-output indicator"""
+        return next(iter(self.get(name, **params).values()))
+
+    def _fingerprint(self, inputs: Tuple[str, ...]) -> str:
+        found = self._fingerprints.get(inputs)
+        if found is None:
+            missing = [column for column in inputs if column not in self.columns]
+            if missing:
+                raise KeyError(f"Indicator inputs missing from frame: {missing}")
+            found = self._fingerprints[inputs] = fingerprint(*(self.columns[c] for c in inputs))
+        return found
+
+
+def compute_indicators(df: pd.DataFrame, config: Iterable[Mapping], cache: Optional[IndicatorCache] = None,
+                       columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Evaluate a list of indicator configs against df and return column -> array.
+    Each config is {'indicator': name, 'params': {...}, 'columns': {output: column}};
+    outputs not named in 'columns' are skipped. With columns given, only the
+    configs producing those columns run and only those columns are returned.
+    """
+    return IndicatorFrame(df, config, cache).compute(columns)
+
+
+class IndicatorFrame:
+    """
+    Lazy view of the indicator columns a config can produce for one frame.
+    Nothing is computed until a column is read; reading it runs only the
+    config entry that produces it, and that entry pulls in whatever it is
+    built from (MACD_Hist needs the MACD signal line, which needs the MACD
+    line and its EMAs). Results are memoized for this frame and, through
+    the shared cache, for any frame with the same input series.
+    """
+
+    def __init__(self, df: pd.DataFrame, config: Iterable[Mapping], cache: Optional[IndicatorCache] = None):
+        self.context = IndicatorContext({column: df[column].to_numpy() for column in df.columns
+                                         if column in ('open', 'high', 'low', 'close', 'volume')}, cache)
+        self._producers: Dict[str, Tuple[Mapping, str]] = {}
+        for entry in config:
+            for output, column in entry['columns'].items():
+                self._producers[column] = (entry, output)
+        self._values: Dict[str, np.ndarray] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._producers)
+
+    @property
+    def computed(self) -> List[str]:
+        return list(self._values)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._producers
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        values = self._values.get(column)
+        if values is None:
+            try:
+                entry, output = self._producers[column]
+            except KeyError:
+                raise KeyError(f"No indicator config produces {column!r}") from None
+            values = self._values[column] = self.context.get(
+                entry['indicator'], **entry.get('params', {})
+            )[output]
+        return values
+
+    def compute(self, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """Arrays for the given columns (all producible columns when None)"""
+        return {column: self[column] for column in (self.columns if columns is None else columns)}
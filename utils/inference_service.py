@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+
+class _Request:
+    def __init__(self, model_key: Hashable, model, window: np.ndarray, memo_key: tuple, lock=None):
+        self.model_key = model_key
+        self.model = model
+        self.lock = lock
+        self.window = window
+        self.memo_key = memo_key
+        self.future = Future()
+
+
+class InferenceService:
+    """
+    Micro-batching front end for model inference.
+    Windows submitted from any thread are collected for up to max_latency
+    seconds (or until max_batch arrive) and every group that shares a model
+    runs as one forward pass through a compiled tf.function. Results are
+    memoized on (model key, weights version, window bytes), so an unchanged
+    last window never reaches the model twice.
+    """
+
+    def __init__(self, max_batch: int = 64, max_latency: float = 0.005, memo_size: int = 4096):
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.memo_size = memo_size
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[tuple, float]" = OrderedDict()
+        self._pending: Dict[tuple, Future] = {}
+        self._functions: Dict[Hashable, Tuple[object, object]] = {}
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {'requests': 0, 'memo_hits': 0, 'batches': 0, 'forward_passes': 0, 'windows': 0}
+
+    def submit(self, model_key: Hashable, model, window: np.ndarray, version: int = 0, lock=None) -> Future:
+        """
+        Queue one window of shape (timesteps, features); the future resolves to a float.
+        When given, lock is held around the forward pass so weights cannot change mid-batch.
+        """
+        window = np.ascontiguousarray(window, dtype=np.float32)
+        digest = hashlib.blake2b(window.tobytes(), digest_size=16).digest()
+        memo_key = (model_key, version, window.shape, digest)
+
+        with self._lock:
+            self.stats['requests'] += 1
+            if memo_key in self._memo:
+                self._memo.move_to_end(memo_key)
+                self.stats['memo_hits'] += 1
+                future = Future()
+                future.set_result(self._memo[memo_key])
+                return future
+            # An identical window already queued shares that request's result
+            pending = self._pending.get(memo_key)
+            if pending is not None:
+                self.stats['memo_hits'] += 1
+                return pending
+
+            request = _Request(model_key, model, window, memo_key, lock)
+            self._pending[memo_key] = request.future
+            self._ensure_worker()
+
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, model_key: Hashable, model, window: np.ndarray, version: int = 0,
+                lock=None, timeout: Optional[float] = 30.0) -> float:
+        """Blocking single-window prediction through the batching queue"""
+        return self.submit(model_key, model, window, version, lock).result(timeout)
+
+    def invalidate(self, model_key: Hashable) -> None:
+        """Drop memoized results and the compiled function for a model"""
+        with self._lock:
+            for key in [k for k in self._memo if k[0] == model_key]:
+                del self._memo[key]
+            self._functions.pop(model_key, None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats, memo_entries=len(self._memo))
+        stats['mean_batch'] = stats['windows'] / stats['forward_passes'] if stats['forward_passes'] else 0.0
+        return stats
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, daemon=True, name='inference-service')
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch: List[_Request]) -> None:
+        groups: Dict[tuple, List[_Request]] = {}
+        for request in batch:
+            groups.setdefault((request.model_key, request.window.shape), []).append(request)
+
+        with self._lock:
+            self.stats['batches'] += 1
+
+        for (model_key, _), requests in groups.items():
+            try:
+                forward = self._compiled(model_key, requests[0].model, requests[0].window.shape)
+                windows = np.stack([r.window for r in requests])
+                lock = requests[0].lock
+                if lock is not None:
+                    with lock:
+                        outputs = np.asarray(forward(windows))
+                else:
+                    outputs = np.asarray(forward(windows))
+                results = [float(value) for value in outputs.reshape(len(requests), -1)[:, 0]]
+            except Exception as e:
+                logging.error(f"Batched inference for {model_key} failed: {str(e)}")
+                self._finish(requests, error=e)
+                continue
+
+            with self._lock:
+                self.stats['forward_passes'] += 1
+                self.stats['windows'] += len(requests)
+            self._finish(requests, results)
+
+    def _finish(self, requests: List[_Request], results: Optional[List[float]] = None, error=None) -> None:
+        with self._lock:
+            for i, request in enumerate(requests):
+                self._pending.pop(request.memo_key, None)
+                if results is not None:
+                    self._memo[request.memo_key] = results[i]
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+        for i, request in enumerate(requests):
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(results[i])
+
+    def _compiled(self, model_key: Hashable, model, window_shape: tuple):
+        # One trace per model: the batch dimension is left open in the signature
+        with self._lock:
+            entry = self._functions.get(model_key)
+            if entry is not None and entry[0] is model:
+                return entry[1]
+
+        spec = tf.TensorSpec(shape=(None,) + tuple(window_shape), dtype=tf.float32)
+        forward = tf.function(lambda x: model(x, training=False), input_signature=[spec])
+        with self._lock:
+            self._functions[model_key] = (model, forward)
+        return forward
+
+
+_service = InferenceService()
+
+
+def get_inference_service() -> InferenceService:
+    """Return the inference service shared by the whole process"""
+    return _service
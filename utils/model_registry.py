@@ -0,0 +1,238 @@
+import atexit
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .checkpoints import CheckpointManager
+
+ModelKey = Tuple[str, str, str]
+
+
+class ModelRegistry:
+    """
+    Process-wide store of compiled models.
+    Each (coin, timeframe, architecture) model is built once and then shared
+    by every analyzer and learner that asks for the same key. With a
+    CheckpointManager, new models warm start from their latest checkpoint
+    and learner updates are checkpointed every checkpoint_interval seconds.
+    """
+
+    def __init__(self, checkpoints: Optional[CheckpointManager] = None, checkpoint_interval: float = 600):
+        self.checkpoints = checkpoints
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.Lock()
+        self._models: Dict[ModelKey, object] = {}
+        self._build_locks: Dict[ModelKey, threading.Lock] = {}
+        self._learners: Dict[ModelKey, object] = {}
+        self._timings: Dict[ModelKey, dict] = {}
+        self._versions: Dict[ModelKey, int] = {}
+        self._scalers: Dict[ModelKey, object] = {}
+        self._feature_windows: Dict[ModelKey, object] = {}
+        self._model_locks: Dict[ModelKey, threading.RLock] = {}
+        self._pending_replay: Dict[ModelKey, dict] = {}
+        self._last_checkpoint: Dict[ModelKey, float] = {}
+        self._dirty = set()
+
+    @staticmethod
+    def make_key(coin_id: Optional[str], timeframe: Optional[str], architecture: str) -> ModelKey:
+        """Build a registry key, using '*' for models shared across coins or timeframes"""
+        return ((coin_id or '*').lower(), timeframe or '*', architecture)
+
+    def get_model(self, key: ModelKey, builder: Callable[[], object]):
+        """Return the model for key, building and compiling it on first use"""
+        start = time.perf_counter()
+        model = self._models.get(key)
+        if model is not None:
+            self._record_lookup(key, time.perf_counter() - start)
+            return model
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            # Another thread may have finished the build while we waited
+            model = self._models.get(key)
+            if model is not None:
+                self._record_lookup(key, time.perf_counter() - start)
+                return model
+
+            model = builder()
+            restored = self._warm_start(key, model)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._models[key] = model
+                timing = self._timings.setdefault(key, {'hits': 0, 'warm_seconds': 0.0})
+                timing['cold_seconds'] = elapsed
+                timing['checkpoint'] = restored
+            logging.info(f"Built model {key} in {elapsed:.3f}s")
+            return model
+
+    def get_learner(self, key: ModelKey):
+        """Return the background learner training the model stored under key"""
+        from .incremental_learner import IncrementalLearner
+
+        with self._lock:
+            learner = self._learners.get(key)
+            if learner is None:
+                if key not in self._models:
+                    raise KeyError(f"No model registered for {key}")
+                learner = IncrementalLearner(
+                    self._models[key],
+                    on_update=lambda: self._on_learner_update(key),
+                    model_lock=self._model_locks.setdefault(key, threading.RLock()),
+                )
+                replay = self._pending_replay.pop(key, None)
+                if replay is not None:
+                    try:
+                        learner.buffer.set_state(replay)
+                    except (KeyError, ValueError) as e:
+                        logging.error(f"Error restoring replay buffer for {key}: {str(e)}")
+                learner.start()
+                self._learners[key] = learner
+            return learner
+
+    def get_lock(self, key: ModelKey) -> threading.RLock:
+        """Lock held while the weights of the model under key are read or replaced"""
+        with self._lock:
+            return self._model_locks.setdefault(key, threading.RLock())
+
+    def get_scaler(self, key: ModelKey):
+        """Return the persistent feature scaler paired with the model under key"""
+        from .feature_scaler import FeatureScaler
+
+        with self._lock:
+            scaler = self._scalers.get(key)
+            if scaler is None:
+                scaler = self._scalers[key] = FeatureScaler()
+            return scaler
+
+    def get_feature_windows(self, key: ModelKey):
+        """Return the feature window buffer holding the model inputs for key"""
+        from .feature_windows import FeatureWindowBuffer
+
+        with self._lock:
+            windows = self._feature_windows.get(key)
+            if windows is None:
+                windows = self._feature_windows[key] = FeatureWindowBuffer()
+            return windows
+
+    def get_version(self, key: ModelKey) -> int:
+        """Weights version of the model under key; changes whenever a learner updates it"""
+        return self._versions.get(key, 0)
+
+    def bump_version(self, key: ModelKey) -> None:
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def checkpoint(self, key: ModelKey, metadata: Optional[dict] = None) -> Optional[int]:
+        """Save weights, scaler and replay buffer for key; returns the checkpoint version"""
+        if self.checkpoints is None or key not in self._models:
+            return None
+        with self.get_lock(key):
+            weights = self._models[key].get_weights()
+        scaler = self._scalers.get(key)
+        learner = self._learners.get(key)
+        version = self.checkpoints.save(
+            key,
+            weights,
+            scaler_state=scaler.get_state() if scaler is not None else None,
+            buffer_state=learner.buffer.get_state() if learner is not None else None,
+            metadata=dict(metadata or {}, learner=learner.get_stats() if learner is not None else None),
+        )
+        with self._lock:
+            self._last_checkpoint[key] = time.time()
+            self._dirty.discard(key)
+        return version
+
+    def checkpoint_all(self) -> None:
+        """Checkpoint every model trained since its last checkpoint"""
+        for key in list(self._dirty):
+            try:
+                self.checkpoint(key)
+            except Exception as e:
+                logging.error(f"Error checkpointing {key}: {str(e)}")
+
+    def rollback(self, key: ModelKey, version: Optional[int] = None) -> Optional[int]:
+        """Restore the previous (or the given) checkpoint version into the live model"""
+        if self.checkpoints is None:
+            return None
+        version = self.checkpoints.rollback(key, version)
+        if version is None or key not in self._models:
+            return version
+        state = self.checkpoints.load(key, version)
+        if state is not None:
+            self._apply_checkpoint(key, self._models[key], state)
+            self.bump_version(key)
+        return version
+
+    def get_timings(self) -> Dict[ModelKey, dict]:
+        """Cold build time, last warm lookup time and hit count per key"""
+        with self._lock:
+            return {key: dict(timing) for key, timing in self._timings.items()}
+
+    def clear(self) -> None:
+        """Stop all learners and forget every model"""
+        with self._lock:
+            for learner in self._learners.values():
+                learner.stop()
+            self._learners.clear()
+            self._models.clear()
+            self._build_locks.clear()
+            self._timings.clear()
+            self._versions.clear()
+            self._scalers.clear()
+            self._feature_windows.clear()
+            self._model_locks.clear()
+            self._pending_replay.clear()
+            self._dirty.clear()
+
+    def _on_learner_update(self, key: ModelKey) -> None:
+        self.bump_version(key)
+        with self._lock:
+            self._dirty.add(key)
+            due = time.time() - self._last_checkpoint.get(key, 0) >= self.checkpoint_interval
+        if due and self.checkpoints is not None:
+            try:
+                self.checkpoint(key)
+            except Exception as e:
+                logging.error(f"Error checkpointing {key}: {str(e)}")
+
+    def _warm_start(self, key: ModelKey, model) -> Optional[int]:
+        if self.checkpoints is None:
+            return None
+        state = self.checkpoints.load(key)
+        if state is None:
+            return None
+        try:
+            self._apply_checkpoint(key, model, state)
+        except (ValueError, KeyError) as e:
+            logging.error(f"Checkpoint v{state['version']} for {key} does not fit the model: {str(e)}")
+            return None
+        with self._lock:
+            self._last_checkpoint[key] = time.time()
+            if state['replay'] is not None:
+                self._pending_replay[key] = state['replay']
+        logging.info(f"Warm started {key} from checkpoint v{state['version']}")
+        return state['version']
+
+    def _apply_checkpoint(self, key: ModelKey, model, state: dict) -> None:
+        with self.get_lock(key):
+            model.set_weights(state['weights'])
+        if state['scaler'] is not None:
+            self.get_scaler(key).set_state(state['scaler'])
+
+    def _record_lookup(self, key: ModelKey, elapsed: float) -> None:
+        with self._lock:
+            timing = self._timings.setdefault(key, {'hits': 0, 'warm_seconds': 0.0})
+            timing['hits'] += 1
+            timing['warm_seconds'] = elapsed
+
+
+_registry = ModelRegistry(CheckpointManager())
+atexit.register(_registry.checkpoint_all)
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the registry shared by the whole process"""
+    return _registry
@@ -0,0 +1,263 @@
+"""
+Grid-search backtesting of the TechnicalAnalyzer.generate_signals rule set.
+
+Price arrays are placed in shared memory once and attached zero-copy by
+every ProcessPoolExecutor worker. Combinations are grouped by their
+indicator windows so each worker computes an MA/RSI/MACD array once and
+reuses it for all thresholds that share it. Results are appended to a CSV
+file as chunks finish, and the best combinations are returned ranked.
+
+    python -m utils.parameter_sweep --coins btc eth --timeframe 1h --output sweep.csv
+"""
+import argparse
+import csv
+import heapq
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtester import simulate_long_only
+from .indicators import kernels
+
+
+class SignalParams(NamedTuple):
+    """One rule-set configuration; the defaults are the ones generate_signals uses"""
+    ma_window: int = 50
+    rsi_window: int = 14
+    rsi_lower: float = 30
+    rsi_upper: float = 70
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    threshold: int = 2
+
+
+# Metrics a sweep can be ranked by: 1 when higher is better, -1 when lower is
+RANK_DIRECTIONS = {'total_return': 1, 'win_rate': 1, 'max_drawdown': -1, 'trades': 1}
+RESULT_FIELDS = ['coin'] + list(SignalParams._fields) + list(RANK_DIRECTIONS)
+
+
+def param_grid(**ranges: Iterable) -> List[SignalParams]:
+    """Cartesian product of the given ranges; unspecified fields keep their defaults"""
+    unknown = set(ranges) - set(SignalParams._fields)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+
+    fields = list(ranges)
+    grid = []
+    for values in itertools.product(*(list(ranges[f]) for f in fields)):
+        params = SignalParams()._replace(**dict(zip(fields, values)))
+        if params.macd_fast < params.macd_slow and params.rsi_lower < params.rsi_upper:
+            grid.append(params)
+    return grid
+
+
+# Per-worker state, populated by _init_worker
+_prices: Dict[str, np.ndarray] = {}
+_segments: List[shared_memory.SharedMemory] = []
+_indicator_cache: Dict[tuple, np.ndarray] = {}
+_MAX_CACHED_ARRAYS = 256
+
+
+def _init_worker(layout: Mapping[str, tuple]) -> None:
+    for coin, (name, length) in layout.items():
+        segment = shared_memory.SharedMemory(name=name)
+        _segments.append(segment)
+        _prices[coin] = np.ndarray((length,), dtype=np.float64, buffer=segment.buf)
+
+
+def _cached(key: tuple, compute) -> np.ndarray:
+    result = _indicator_cache.get(key)
+    if result is None:
+        if len(_indicator_cache) >= _MAX_CACHED_ARRAYS:
+            _indicator_cache.clear()
+        result = _indicator_cache[key] = compute()
+    return result
+
+
+def _moving_average(coin: str, window: int) -> np.ndarray:
+    return _cached((coin, 'ma', window), lambda: kernels.sma(_prices[coin], window))
+
+
+def _rsi(coin: str, window: int) -> np.ndarray:
+    def compute():
+        gains, losses = kernels.gains_losses(_prices[coin])
+        return kernels.rsi_from_averages(kernels.sma(gains, window), kernels.sma(losses, window))
+    return _cached((coin, 'rsi', window), compute)
+
+
+def _ema(coin: str, span: int) -> np.ndarray:
+    return _cached((coin, 'ema', span), lambda: kernels.ema(_prices[coin], span=span))
+
+
+def _macd(coin: str, fast: int, slow: int, signal: int) -> tuple:
+    def compute():
+        macd = _ema(coin, fast) - _ema(coin, slow)
+        return np.stack([macd, kernels.ema(macd, span=signal)])
+    return _cached((coin, 'macd', fast, slow, signal), compute)
+
+
+def signal_score(close: np.ndarray, ma: np.ndarray, rsi: np.ndarray, macd: np.ndarray,
+                 macd_signal: np.ndarray, params: SignalParams) -> np.ndarray:
+    """
+    Array version of the Signal_Strength column of generate_signals: the sum
+    of the MA, RSI and MACD votes (-3 to 3), positive when they lean bullish
+    """
+    with np.errstate(invalid='ignore'):
+        ma_vote = np.sign(close - ma)
+        rsi_vote = np.where(rsi < params.rsi_lower, 1, np.where(rsi > params.rsi_upper, -1, 0))
+        macd_vote = np.sign(macd - macd_signal)
+    # NaN indicators vote 0, like the comparisons in generate_signals
+    return np.nan_to_num(ma_vote) + rsi_vote + np.nan_to_num(macd_vote)
+
+
+def signal_codes(close: np.ndarray, ma: np.ndarray, rsi: np.ndarray, macd: np.ndarray,
+                 macd_signal: np.ndarray, params: SignalParams) -> np.ndarray:
+    """1 for BUY, -1 for SELL, 0 for HOLD, as in generate_signals' Final_Signal"""
+    score = signal_score(close, ma, rsi, macd, macd_signal, params)
+    return np.where(score >= params.threshold, 1, np.where(score <= -params.threshold, -1, 0))
+
+
+def _evaluate_chunk(coin: str, chunk: List[SignalParams], initial_capital: float) -> List[dict]:
+    close = _prices[coin]
+    rows = []
+    for params in chunk:
+        ma = _moving_average(coin, params.ma_window)
+        rsi = _rsi(coin, params.rsi_window)
+        macd, macd_signal = _macd(coin, params.macd_fast, params.macd_slow, params.macd_signal)
+        codes = signal_codes(close, ma, rsi, macd, macd_signal, params)
+
+        result = simulate_long_only(close, codes, initial_capital)
+        equity = result['equity']
+        peak = np.maximum.accumulate(equity)
+        pairs = result['executions'] // 2
+        rows.append({
+            'coin': coin,
+            **params._asdict(),
+            'total_return': (equity[-1] / initial_capital - 1) * 100,
+            'win_rate': result['wins'] / pairs if pairs else 0.0,
+            'max_drawdown': float(np.max((peak - equity) / np.where(peak == 0, 1, peak))) * 100,
+            'trades': result['executions'],
+        })
+    return rows
+
+
+def _chunks(coins: Iterable[str], grid: List[SignalParams], chunk_size: int):
+    """Yield (coin, combos) with combos sharing every indicator window"""
+    def windows(p):
+        return (p.ma_window, p.rsi_window, p.macd_fast, p.macd_slow, p.macd_signal)
+
+    ordered = sorted(grid, key=windows)
+    for coin in coins:
+        for _, group in itertools.groupby(ordered, key=windows):
+            group = list(group)
+            for start in range(0, len(group), chunk_size):
+                yield coin, group[start:start + chunk_size]
+
+
+def run_sweep(prices: Mapping[str, object], grid: List[SignalParams], output_path: str,
+              rank_by: str = 'total_return', top_n: int = 100,
+              max_workers: Optional[int] = None, chunk_size: int = 64,
+              initial_capital: float = 10000) -> pd.DataFrame:
+    """
+    Backtest every combination in grid on every coin in prices.
+    prices maps coin ids to close price arrays (or frames with a 'close'
+    column). All results are streamed to output_path as CSV; the top_n
+    combinations by rank_by (one of RANK_DIRECTIONS) are returned, best first.
+    """
+    if rank_by not in RANK_DIRECTIONS:
+        raise ValueError(f"Cannot rank by {rank_by!r}; choose one of {list(RANK_DIRECTIONS)}")
+    direction = RANK_DIRECTIONS[rank_by]
+
+    segments = []
+    layout = {}
+    try:
+        for coin, data in prices.items():
+            close = np.ascontiguousarray(
+                data['close'] if isinstance(data, pd.DataFrame) else data, dtype=np.float64
+            )
+            segment = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+            segments.append(segment)
+            np.ndarray(close.shape, dtype=np.float64, buffer=segment.buf)[:] = close
+            layout[coin] = (segment.name, len(close))
+
+        best = []
+        counter = itertools.count()
+        with open(output_path, 'w', newline='') as f, ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(layout,)
+        ) as executor:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            futures = [
+                executor.submit(_evaluate_chunk, coin, chunk, initial_capital)
+                for coin, chunk in _chunks(layout, grid, chunk_size)
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                rows = future.result()
+                writer.writerows(rows)
+                f.flush()
+                for row in rows:
+                    score = direction * row[rank_by]
+                    if np.isnan(score):
+                        continue
+                    entry = (score, next(counter), row)
+                    if len(best) < top_n:
+                        heapq.heappush(best, entry)
+                    else:
+                        heapq.heappushpop(best, entry)
+                if done % 100 == 0:
+                    logging.info(f"Sweep progress: {done}/{len(futures)} chunks")
+
+        ranked = [row for _, _, row in sorted(best, key=lambda e: (e[0], -e[1]), reverse=True)]
+        return pd.DataFrame(ranked, columns=RESULT_FIELDS)
+
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+
+def main():
+    from .data_fetcher import CryptoDataFetcher
+
+    parser = argparse.ArgumentParser(description="Grid-search the signal rule set")
+    parser.add_argument('--coins', nargs='+', default=['btc'])
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--output', default='sweep_results.csv')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--rank-by', choices=list(RANK_DIRECTIONS), default='total_return')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    fetcher = CryptoDataFetcher()
+    prices = {}
+    for coin in args.coins:
+        df = fetcher.get_historical_data(coin, args.timeframe)
+        if df.empty:
+            logging.warning(f"No data for {coin}, skipping")
+            continue
+        prices[coin] = df
+
+    grid = param_grid(
+        ma_window=[20, 50, 100, 200],
+        rsi_window=[7, 14, 21],
+        rsi_lower=[20, 25, 30, 35],
+        rsi_upper=[65, 70, 75, 80],
+        macd_fast=[8, 12],
+        macd_slow=[21, 26],
+        threshold=[1, 2, 3],
+    )
+    ranked = run_sweep(prices, grid, args.output, rank_by=args.rank_by, top_n=args.top,
+                       max_workers=args.workers)
+    print(ranked.to_string(index=False))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
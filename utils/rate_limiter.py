@@ -0,0 +1,148 @@
+import asyncio
+import email.utils
+import logging
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: buckets are shared between threads only
+    fcntl = None
+
+DEFAULT_STATE_DIR = os.environ.get(
+    'RATE_LIMIT_DIR', os.path.join(os.path.expanduser('~'), '.aphator', 'ratelimits')
+)
+
+_STATE = struct.Struct('dd')  # tokens, time the token count was last brought up to date
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all threads, and all processes when a state
+    directory is used, that refer to the same name.
+    Callers reserve tokens in arrival order and sleep until their
+    reservation matures, so requests queue instead of being dropped. A 429
+    can block the whole bucket until its Retry-After time has passed.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float = 1,
+                 state_dir: Optional[str] = DEFAULT_STATE_DIR):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._fd = None
+        self._state = (capacity, time.time())
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+            self._fd = os.open(os.path.join(state_dir, f"{name}.bucket"), os.O_RDWR | os.O_CREAT, 0o644)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if self._fd is None:
+                yield
+                return
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, _STATE.size, 0)
+                if len(raw) == _STATE.size:
+                    self._state = _STATE.unpack(raw)
+                yield
+                os.pwrite(self._fd, _STATE.pack(*self._state), 0)
+            finally:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _available(self, now: float):
+        """Tokens at the earliest time refilling can happen, and that time"""
+        tokens, updated = self._state
+        start = max(now, updated)
+        return min(self.capacity, tokens + (start - updated) * self.rate), start
+
+    def reserve(self, tokens: float = 1, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Reserve tokens and return how many seconds to wait before using them,
+        or None (reserving nothing) if that wait would exceed max_wait.
+        """
+        with self._locked():
+            now = time.time()
+            available, start = self._available(now)
+            remaining = available - tokens
+            wait = (start - now) + max(0.0, -remaining) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._state = (remaining, start)
+            return wait
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available; False if that would take longer than timeout"""
+        wait = self.reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Non-blocking variant of acquire for event-loop code"""
+        wait = self.reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until tokens could be acquired, without reserving them"""
+        with self._locked():
+            now = time.time()
+            available, start = self._available(now)
+            return (start - now) + max(0.0, tokens - available) / self.rate
+
+    def block_for(self, seconds: float) -> None:
+        """Empty the bucket and stop refilling it for the given number of seconds"""
+        with self._locked():
+            now = time.time()
+            available, start = self._available(now)
+            until = max(start, now + seconds)
+            self._state = (min(0.0, available), until)
+        logging.warning(f"Rate limit bucket {self.name} blocked for {seconds:.0f}s")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(name: str, rate: float, capacity: float = 1) -> TokenBucket:
+    """Return the process-wide bucket for name, creating it on first use"""
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            try:
+                bucket = TokenBucket(name, rate, capacity)
+            except OSError as e:
+                logging.warning(f"Rate limit state dir unavailable ({str(e)}), bucket {name} is process-local")
+                bucket = TokenBucket(name, rate, capacity, state_dir=None)
+            _buckets[name] = bucket
+        return bucket
@@ -0,0 +1,233 @@
+"""
+Shared precomputed results for every dashboard session.
+
+One ResultsWorker thread per (coin, timeframe) runs the analysis pipeline
+on a fixed interval and publishes into a ResultStore, whose result.json
+carries a version counter. Sessions read through ResultsServer.latest,
+which reparses the stored frames only when the version moved, so every
+viewer of a pair in the process shares one computation and one parsed
+result. Across processes (several Streamlit servers, or this module run
+as a standalone publisher) an exclusive lock file per pair elects a
+single worker; the others only read until the owner goes away.
+
+    python -m utils.results_server --coins btc eth --timeframes 1h 1d --interval 60
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .analysis_pipeline import AnalysisPipeline, AnalysisResult, ResultStore
+from .data_fetcher import CryptoDataFetcher
+from .data_providers import YahooFinanceProvider
+
+try:
+    import fcntl
+except ImportError:  # no cross-process election; every process computes
+    fcntl = None
+
+PairKey = Tuple[str, str]
+
+
+class ResultsWorker(threading.Thread):
+    """
+    Background publisher for one coin/timeframe.
+    Computes only while it holds the pair's lock file, and stops on its own
+    once nobody has asked for the pair for idle_timeout seconds.
+    """
+
+    def __init__(self, pipeline: AnalysisPipeline, store: ResultStore, coin: str, timeframe: str,
+                 interval: float = 60, idle_timeout: Optional[float] = 600):
+        super().__init__(daemon=True, name=f'results-{coin}-{timeframe}')
+        self.pipeline = pipeline
+        self.store = store
+        self.coin = coin
+        self.timeframe = timeframe
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.last_request = time.time()
+        # Set once there is something to read or a run failed, so waiters never sit out a failure
+        self.ready = threading.Event()
+        self.last_error: Optional[str] = None
+        self.stats = {'runs': 0, 'failures': 0, 'last_run_seconds': 0.0, 'owner': False}
+        self._stop_event = threading.Event()
+        self._lock_file = None
+
+    def touch(self) -> None:
+        self.last_request = time.time()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _acquire(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        if fcntl is None:
+            self._lock_file = True
+            return True
+        pair_dir = self.store.pair_dir(self.coin, self.timeframe)
+        os.makedirs(pair_dir, exist_ok=True)
+        lock_file = open(os.path.join(pair_dir, 'worker.lock'), 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _release(self) -> None:
+        if self._lock_file not in (None, True):
+            self._lock_file.close()  # closing drops the flock
+        self._lock_file = None
+
+    def run_once(self) -> Optional[AnalysisResult]:
+        start = time.perf_counter()
+        try:
+            result = self.pipeline.run(self.coin, self.timeframe)
+            if result is None:
+                self._failed("no data")
+                return None
+            self.store.save(result)
+        except Exception as e:
+            self._failed(str(e))
+            raise
+        finally:
+            self.stats['runs'] += 1
+            self.stats['last_run_seconds'] = time.perf_counter() - start
+        self.last_error = None
+        self.ready.set()
+        return result
+
+    def _failed(self, error: str) -> None:
+        self.stats['failures'] += 1
+        self.last_error = error
+        self.ready.set()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                if self.idle_timeout is not None and time.time() - self.last_request > self.idle_timeout:
+                    logging.info(f"Stopping idle results worker for {self.coin} {self.timeframe}")
+                    break
+                self.stats['owner'] = self._acquire()
+                if self.stats['owner']:
+                    try:
+                        self.run_once()
+                    except Exception as e:
+                        logging.error(f"Results worker error for {self.coin} {self.timeframe}: {str(e)}")
+                elif self.store.version(self.coin, self.timeframe):
+                    # Another process publishes this pair
+                    self.ready.set()
+                self._stop_event.wait(self.interval)
+        finally:
+            self._release()
+
+
+class ResultsServer:
+    """
+    Process-wide registry of results workers plus an in-memory copy of the
+    newest stored result per pair, reloaded only when its version changes.
+    """
+
+    def __init__(self, store: Optional[ResultStore] = None, fetcher: Optional[CryptoDataFetcher] = None,
+                 interval: float = 60, idle_timeout: Optional[float] = 600):
+        self.store = store or ResultStore()
+        self.fetcher = fetcher or CryptoDataFetcher()
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._workers: Dict[PairKey, ResultsWorker] = {}
+        self._loaded: Dict[PairKey, AnalysisResult] = {}
+        self._lock = threading.Lock()
+        self.stats = {'reads': 0, 'loads': 0}
+
+    def ensure(self, coin: str, timeframe: str) -> ResultsWorker:
+        """The pair's worker, started on first use or after it stopped"""
+        key = (coin.lower(), timeframe)
+        with self._lock:
+            worker = self._workers.get(key)
+            if worker is None or not worker.is_alive():
+                # Each worker gets its own pipeline: Backtester and analyzers are not shared between threads
+                worker = ResultsWorker(AnalysisPipeline(self.fetcher), self.store, *key,
+                                       interval=self.interval, idle_timeout=self.idle_timeout)
+                worker.start()
+                self._workers[key] = worker
+            worker.touch()
+            return worker
+
+    def latest(self, coin: str, timeframe: str, wait: float = 0,
+               max_age: Optional[float] = None) -> Optional[AnalysisResult]:
+        """
+        Newest published result for the pair, starting its worker if needed.
+        Waits up to wait seconds for the worker's first run; None when there
+        is no result yet (see the worker's last_error) or it is older than
+        max_age seconds.
+        """
+        worker = self.ensure(coin, timeframe)
+        key = (coin.lower(), timeframe)
+        version = self.store.version(*key)
+        if not version and wait > 0:
+            worker.ready.wait(wait)
+            version = self.store.version(*key)
+        if not version:
+            return None
+
+        with self._lock:
+            self.stats['reads'] += 1
+            cached = self._loaded.get(key)
+        if cached is None or cached.version != version:
+            cached = self.store.load(*key)
+            if cached is None:
+                return None
+            with self._lock:
+                self.stats['loads'] += 1
+                self._loaded[key] = cached
+        if max_age is not None and cached.age > max_age:
+            return None
+        return cached
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            workers = {f"{coin} {tf}": dict(worker.stats, alive=worker.is_alive(), last_error=worker.last_error)
+                       for (coin, tf), worker in self._workers.items()}
+            return dict(self.stats, workers=workers)
+
+    def stop(self) -> None:
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--coins', nargs='+', help='Coins to publish (default: all supported)')
+    parser.add_argument('--timeframes', nargs='+', default=['1h'])
+    parser.add_argument('--store', help='ResultStore directory (default: RESULTS_DIR)')
+    parser.add_argument('--interval', type=float, default=60)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Pinned workers: they publish whether or not a dashboard is reading
+    server = ResultsServer(ResultStore(args.store), interval=args.interval, idle_timeout=None)
+    coins = args.coins or next(
+        p for p in server.fetcher.providers if isinstance(p, YahooFinanceProvider)
+    ).get_supported_coins()
+    for tf in args.timeframes:
+        for coin in coins:
+            server.ensure(coin, tf)
+
+    try:
+        while True:
+            time.sleep(args.interval)
+            for pair, stats in server.get_stats()['workers'].items():
+                logging.info(f"{pair}: {stats}")
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
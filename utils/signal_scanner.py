@@ -0,0 +1,129 @@
+"""
+Scan every coin and timeframe for the current generate_signals rule signal.
+
+Candles for all (coin, timeframe) pairs are fetched in one
+CryptoDataFetcher.get_many call, which runs the providers concurrently
+through their bulk paths. Per timeframe, the close prices of every coin
+are stacked into one (coins x time) array, so the MA, RSI and MACD behind
+the newest candle of each coin come from a handful of NumPy calls instead
+of one calculate_indicators run per coin. The result is a table ranked by
+signal and confidence.
+
+    python -m utils.signal_scanner --timeframes 1h 1d --output scan.csv
+"""
+import argparse
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_fetcher import CryptoDataFetcher
+from .data_providers import YahooFinanceProvider
+from .indicators import kernels
+from .parameter_sweep import SignalParams, signal_codes, signal_score
+
+SIGNAL_LABELS = np.array(['SELL', 'HOLD', 'BUY'])
+SCAN_COLUMNS = ['coin', 'timeframe', 'signal', 'confidence', 'close', 'MA', 'RSI', 'MACD',
+                'MACD_Signal', 'rows', 'last_candle', 'source']
+
+
+def stack_closes(frames: Sequence[pd.DataFrame]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Right-align the close prices of frames into a (frames, time) array.
+    Shorter series are padded on the left with their first close: an EMA
+    started from a constant stays on it, so the padding leaves the EMAs and
+    MACD of the real candles unchanged. Returns (closes, row counts).
+    """
+    lengths = np.array([len(df) for df in frames])
+    closes = np.empty((len(frames), int(lengths.max(initial=0))))
+    for row, df in enumerate(frames):
+        close = df['close'].to_numpy(dtype=np.float64)
+        closes[row, :closes.shape[1] - len(close)] = close[0] if len(close) else np.nan
+        closes[row, closes.shape[1] - len(close):] = close
+    return closes, lengths
+
+
+def latest_indicators(closes: np.ndarray, lengths: np.ndarray,
+                      params: SignalParams = SignalParams()) -> Dict[str, np.ndarray]:
+    """MA, RSI, MACD and MACD signal at the newest candle of every row of stack_closes output"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ma = closes[:, -params.ma_window:].mean(axis=1)
+        ma[lengths < params.ma_window] = np.nan
+
+        # The first candle of each series counts as no change, as in the padding
+        delta = np.diff(closes, axis=1, prepend=closes[:, :1])[:, -params.rsi_window:]
+        gain = np.fmax(delta, 0.0).mean(axis=1)
+        loss = np.fmax(-delta, 0.0).mean(axis=1)
+        rsi = kernels.rsi_from_averages(gain, loss)
+        rsi[lengths < params.rsi_window] = np.nan
+
+    macd = kernels.ema_rows(closes, span=params.macd_fast) - kernels.ema_rows(closes, span=params.macd_slow)
+    macd_signal = kernels.ema_rows(macd, span=params.macd_signal)
+    return {'close': closes[:, -1], 'MA': ma, 'RSI': rsi, 'MACD': macd[:, -1], 'MACD_Signal': macd_signal[:, -1]}
+
+
+def rank_signals(table: pd.DataFrame) -> pd.DataFrame:
+    """BUY and SELL rows first, then by confidence"""
+    active = (table['signal'] != 'HOLD').astype(int)
+    order = np.lexsort((-table['confidence'].to_numpy(), -active.to_numpy()))
+    return table.iloc[order].reset_index(drop=True)
+
+
+def scan(fetcher: CryptoDataFetcher, coins: Optional[List[str]] = None, timeframes: Sequence[str] = ('1h',),
+         params: SignalParams = SignalParams()) -> pd.DataFrame:
+    """
+    Current signal for every (coin, timeframe) pair, ranked.
+    coins defaults to every coin of the Yahoo Finance symbol map. Pairs that
+    could not be fetched are logged by get_many and left out of the table.
+    """
+    if coins is None:
+        yahoo = next(p for p in fetcher.providers if isinstance(p, YahooFinanceProvider))
+        coins = yahoo.get_supported_coins()
+    frames, metadata = fetcher.get_many([(coin, tf) for tf in timeframes for coin in coins])
+
+    rows = []
+    for tf in timeframes:
+        pairs = [(coin, tf) for coin in coins if not frames[(coin, tf)].empty]
+        if not pairs:
+            continue
+        closes, lengths = stack_closes([frames[pair] for pair in pairs])
+        latest = latest_indicators(closes, lengths, params)
+        votes = (latest['close'], latest['MA'], latest['RSI'], latest['MACD'], latest['MACD_Signal'], params)
+        score = signal_score(*votes)
+        codes = signal_codes(*votes)
+        for i, (coin, _) in enumerate(pairs):
+            rows.append({
+                'coin': coin,
+                'timeframe': tf,
+                'signal': SIGNAL_LABELS[codes[i] + 1],
+                'confidence': abs(score[i]) / 3 * 100,
+                **{column: values[i] for column, values in latest.items()},
+                'rows': int(lengths[i]),
+                'last_candle': frames[(coin, tf)].index[-1],
+                'source': metadata[(coin, tf)]['source'],
+            })
+    return rank_signals(pd.DataFrame(rows, columns=SCAN_COLUMNS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--coins', nargs='+', help='Coins to scan (default: all supported)')
+    parser.add_argument('--timeframes', nargs='+', default=['1h'])
+    parser.add_argument('--output', help='Also write the ranked table to this CSV file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    table = scan(CryptoDataFetcher(), args.coins, args.timeframes)
+    elapsed = time.perf_counter() - start
+
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"\nScanned {len(table)} pairs in {elapsed:.2f}s")
+    if args.output:
+        table.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
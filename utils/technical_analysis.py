@@ -1,12 +1,45 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
 import tensorflow as tf
+import logging
+from .model_registry import get_model_registry
+from .inference_service import get_inference_service
+from .indicators import DEFAULT_INDICATORS, IndicatorFrame
+
+class SignalPoints:
+    """Columnar BUY or SELL markers: one entry per signal row"""
+
+    def __init__(self, timestamps, prices, strengths):
+        self.timestamps = timestamps
+        self.prices = prices
+        self.strengths = strengths
+
+    def __len__(self):
+        return len(self.prices)
+
+    def to_dicts(self):
+        return [
+            {'timestamp': t, 'price': p, 'strength': s}
+            for t, p, s in zip(self.timestamps, self.prices, self.strengths)
+        ]
 
 class TechnicalAnalyzer:
-    def __init__(self):
-        self.scaler = MinMaxScaler()
-        self.model = self._build_model()
+    MODEL_ARCHITECTURE = 'lstm-50-30'
+    # Indicator columns each consumer reads, so callers can ask for only those
+    SIGNAL_COLUMNS = ('MA50', 'RSI', 'MACD', 'MACD_Signal')
+    FEATURE_INDICATORS = ('RSI', 'MACD')
+    PANEL_COLUMNS = ('RSI', 'MACD', 'MACD_Signal', 'MACD_Hist')
+    MA_COLUMNS = ('MA20', 'MA50', 'MA200')
+    BB_COLUMNS = ('BB_upper', 'BB_middle', 'BB_lower')
+
+    def __init__(self, coin_id=None, timeframe=None, registry=None, inference=None, indicators=None):
+        self.indicators = indicators or DEFAULT_INDICATORS
+        self.registry = registry or get_model_registry()
+        self.inference = inference or get_inference_service()
+        self.model_key = self.registry.make_key(coin_id, timeframe, self.MODEL_ARCHITECTURE)
+        self.scaler = self.registry.get_scaler(self.model_key)
+        self.feature_windows = self.registry.get_feature_windows(self.model_key)
+        self.model = self.registry.get_model(self.model_key, self._build_model)
 
     def _build_model(self):
         model = tf.keras.Sequential([
@@ -19,34 +52,38 @@ class TechnicalAnalyzer:
         model.compile(optimizer='adam', loss='mse')
         return model
 
-    def calculate_indicators(self, df):
-        # Moving Averages
-        df['MA20'] = df['close'].rolling(window=20).mean()
-        df['MA50'] = df['close'].rolling(window=50).mean()
-        df['MA200'] = df['close'].rolling(window=200).mean()
-
-        # Bollinger Bands
-        df['BB_middle'] = df['close'].rolling(window=20).mean()
-        df['BB_upper'] = df['BB_middle'] + 2*df['close'].rolling(window=20).std()
-        df['BB_lower'] = df['BB_middle'] - 2*df['close'].rolling(window=20).std()
-
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-
-        # MACD
-        exp1 = df['close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = exp1 - exp2
-        df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        df['MACD_Hist'] = df['MACD'] - df['MACD_Signal']
+    def calculate_indicators(self, df, indicators=None, columns=None):
+        """
+        Add indicator columns to df from the kernel registry.
+        indicators is a list of configs as in utils.indicators.DEFAULT_INDICATORS.
+        With columns given only those are computed, together with whatever they
+        are built from; the rest of the config costs nothing. Outputs are cached
+        by (series fingerprint, params), so shared pieces such as the 20-period
+        SMA behind MA20 and BB_middle are computed once.
+        """
+        frame = IndicatorFrame(df, indicators or self.indicators)
+        for column in frame.columns if columns is None else columns:
+            df[column] = frame[column]
+        return df
 
+    def require_indicators(self, df, columns):
+        """Compute the given indicator columns that df does not have yet"""
+        missing = [column for column in columns if column not in df.columns]
+        if missing:
+            self.calculate_indicators(df, columns=missing)
         return df
 
     def generate_signals(self, df):
+        signals = self.compute_signals(df)
+
+        # Generate prediction
+        prediction = self._generate_prediction(df)
+
+        return signals, prediction
+
+    def compute_signals(self, df):
+        """Rule-based signals only, without the model prediction"""
+        self.require_indicators(df, self.SIGNAL_COLUMNS)
         signals = pd.DataFrame(index=df.index)
         
         # Generate signals based on multiple indicators
@@ -65,45 +102,38 @@ class TechnicalAnalyzer:
             np.where(df['MACD'] < df['MACD_Signal'], -1, 0)
         )
         
-        # Calculate signal strength and confidence
+        # Signed vote sum (-3 to 3): bullish agreement buys, bearish agreement sells
         signals['Signal_Strength'] = (
             signals['MA_Signal'] + 
             signals['RSI_Signal'] + 
             signals['MACD_Signal']
-        ).abs()
+        )
         
-        signals['Confidence'] = signals['Signal_Strength'] / 3 * 100
+        signals['Confidence'] = signals['Signal_Strength'].abs() / 3 * 100
         
         # Generate final signal
         signals['Final_Signal'] = np.where(
             signals['Signal_Strength'] >= 2, 'BUY',
             np.where(signals['Signal_Strength'] <= -2, 'SELL', 'HOLD')
         )
-        
-        # Generate prediction
-        prediction = self._generate_prediction(df)
-        
-        return signals, prediction
+
+        return signals
 
     def _generate_prediction(self, df):
         try:
-            # Prepare features for prediction
-            features = np.column_stack((
-                df['close'].values,
-                df['RSI'].values,
-                df['MACD'].values,
-                df['volume'].values,
-                df['Price_Change'].values
-            ))
-            
-            # Scale features
-            scaled_features = self.scaler.fit_transform(features)
+            # Only rows not seen yet are copied into the window buffer and
+            # extend the scaler's range; the model reads the newest window
+            scaled_features = self.feature_window(df)
+            if scaled_features is None:
+                raise ValueError(f"Need at least 30 rows with features, got {len(df)}")
             
             # Make prediction
             current_price = df['close'].iloc[-1]
-            predicted_change = self.model.predict(
-                scaled_features[-30:].reshape(1, 30, 5)
-            )[0][0]
+            predicted_change = self.inference.predict(
+                self.model_key, self.model, scaled_features,
+                version=self.registry.get_version(self.model_key),
+                lock=self.registry.get_lock(self.model_key)
+            )
             
             pattern_confidence = min(abs(predicted_change) * 100, 100)
             
@@ -117,22 +147,40 @@ class TechnicalAnalyzer:
             logging.error(f"Prediction error: {str(e)}")
             return None
 
+    def feature_window(self, df=None):
+        """Scaled (30, 5) model input for the newest candle, after appending df's new rows"""
+        if df is not None and len(df):
+            self.require_indicators(df, self.FEATURE_INDICATORS)
+            self.scaler.partial_fit(self.feature_windows.append(df), df.index[-1])
+        window = self.feature_windows.latest()
+        return None if window is None else self.scaler.transform(window)
+
+    def training_windows(self):
+        """
+        Scaled (30, 5) inputs no caller has trained on yet, each labelled with
+        the next candle's Price_Change, the same target as the offline
+        walk-forward training and the prediction. Shared per model, so every
+        candle yields one sample however many analyzers see it.
+        """
+        windows, labels = self.feature_windows.claim_training('Price_Change')
+        return self.scaler.transform(windows), labels
+
+    def get_signal_points(self, df, signals):
+        """Return (entries, exits) as SignalPoints arrays for BUY and SELL rows"""
+        if signals.index.equals(df.index):
+            close = df['close'].to_numpy()
+        else:
+            close = df['close'].reindex(signals.index).to_numpy()
+        final_signal = signals['Final_Signal'].to_numpy()
+        confidence = signals['Confidence'].to_numpy()
+
+        points = []
+        for label in ('BUY', 'SELL'):
+            mask = final_signal == label
+            points.append(SignalPoints(signals.index[mask], close[mask], confidence[mask]))
+        return points[0], points[1]
+
     def get_entry_exit_points(self, df, signals):
-        entry_points = []
-        exit_points = []
-        
-        for idx, row in signals.iterrows():
-            if row['Final_Signal'] == 'BUY':
-                entry_points.append({
-                    'timestamp': idx,
-                    'price': df.loc[idx, 'close'],
-                    'strength': row['Confidence']
-                })
-            elif row['Final_Signal'] == 'SELL':
-                exit_points.append({
-                    'timestamp': idx,
-                    'price': df.loc[idx, 'close'],
-                    'strength': row['Confidence']
-                })
-                
-        return entry_points, exit_points
+        """Dict-per-point view of get_signal_points, kept for older callers"""
+        entry_points, exit_points = self.get_signal_points(df, signals)
+        return entry_points.to_dicts(), exit_points.to_dicts()
@@ -0,0 +1,202 @@
+"""
+Offline walk-forward training of the TechnicalAnalyzer LSTM.
+
+Candles come from the local CandleStore (fetched once if nothing is
+stored yet) and go through the same indicator and derived-column code as
+the dashboard. Model inputs are 30x5 windows taken as a strided view of
+the scaled feature matrix, so no window is copied on its own. Each fold
+trains a fresh model on an expanding window of history and reports
+out-of-sample error on the block that follows it. A final model trained
+on all windows is saved as a checkpoint that the dashboard warm starts.
+
+    python -m utils.training_pipeline --coin btc --timeframe 1h --folds 5 --epochs 10
+"""
+
+import argparse
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .feature_scaler import FEATURE_COLUMNS, FeatureScaler
+
+WINDOW = 30
+
+
+def configure_threads(threads: Optional[int] = None) -> None:
+    """Let TensorFlow use every core; must run before the first op executes"""
+    threads = threads or os.cpu_count()
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(max(2, threads // 2))
+
+
+def load_history(fetcher, coin_id: str, timeframe: str) -> pd.DataFrame:
+    """Longest stored candle history for coin/timeframe, with the provider's derived columns"""
+    best, best_provider = pd.DataFrame(), None
+    for provider in fetcher.providers:
+        if not provider.supports(coin_id, timeframe):
+            continue
+        df = fetcher.store.load(provider.name, coin_id, timeframe)
+        if len(df) > len(best):
+            best, best_provider = df, provider
+
+    if best_provider is None:
+        # Nothing stored yet: one regular fetch fills the store
+        return fetcher.get_historical_data(coin_id, timeframe)
+    return best_provider._add_derived_columns(best.copy())
+
+
+def make_windows(features: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Windows of WINDOW rows (a read-only strided view) and the label of the
+    row after each window, i.e. the next candle's price change.
+    """
+    windows = sliding_window_view(features, (WINDOW, features.shape[1]))[:-1, 0]
+    return windows, labels[WINDOW:]
+
+
+def feature_frame(analyzer, df: pd.DataFrame) -> pd.DataFrame:
+    """df with the analyzer's indicators, without the warm-up rows that lack a feature"""
+    return analyzer.calculate_indicators(df.copy()).dropna(subset=FEATURE_COLUMNS)
+
+
+def max_folds(n: int, min_train: int = 100, min_test: int = 30) -> int:
+    """Most folds n samples allow with min_train to start and min_test per test block"""
+    return max(0, (n - min_train) // min_test)
+
+
+def walk_forward_splits(n: int, folds: int, min_train: int = 100,
+                        min_test: int = 30) -> List[Tuple[slice, slice]]:
+    """
+    Expanding-window (train, test) slices over n samples, with test blocks in
+    time order. Every test block holds at least min_test samples, so a fold's
+    error is measured on more than a handful of candles.
+    """
+    block = (n - min_train) // folds
+    if block < min_test:
+        raise ValueError(
+            f"{n} windows are not enough for {folds} folds of {min_test} test windows after {min_train}"
+        )
+    return [
+        (slice(0, min_train + k * block), slice(min_train + k * block, min_train + (k + 1) * block))
+        for k in range(folds)
+    ]
+
+
+def _fit_min_max(features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    low = np.nanmin(features, axis=0)
+    span = np.nanmax(features, axis=0) - low
+    span[span == 0] = 1.0
+    return low, span
+
+
+def _dataset(windows: np.ndarray, labels: np.ndarray, batch_size: int, shuffle: bool) -> tf.data.Dataset:
+    dataset = tf.data.Dataset.from_tensor_slices((windows.astype(np.float32), labels.astype(np.float32)))
+    if shuffle:
+        dataset = dataset.shuffle(min(len(labels), 10_000), reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def train_walk_forward(analyzer, df: pd.DataFrame, folds: int = 5, epochs: int = 10,
+                       batch_size: int = 64, min_train: int = 100, min_test: int = 30) -> Dict:
+    """
+    Walk-forward evaluation followed by a final fit on all data.
+    Trains analyzer.model in place and sets the registry scaler for its key;
+    returns the per-fold report.
+    """
+    df = feature_frame(analyzer, df)
+    raw = df[FEATURE_COLUMNS].to_numpy(dtype=float)
+    price_change = df['Price_Change'].to_numpy(dtype=float)
+
+    n_windows = len(raw) - WINDOW
+    report = {'model_key': list(analyzer.model_key), 'samples': n_windows, 'folds': []}
+
+    for k, (train, test) in enumerate(walk_forward_splits(n_windows, folds, min_train, min_test)):
+        # Scale with statistics from the training rows only, so the test block stays unseen
+        low, span = _fit_min_max(raw[:train.stop + WINDOW])
+        windows, labels = make_windows((raw - low) / span, price_change)
+
+        model = analyzer._build_model()
+        start = time.perf_counter()
+        model.fit(_dataset(windows[train], labels[train], batch_size, True), epochs=epochs, verbose=0)
+        elapsed = time.perf_counter() - start
+
+        predicted = np.ravel(model.predict(_dataset(windows[test], labels[test], batch_size, False), verbose=0))
+        actual = labels[test]
+        fold = {
+            'fold': k,
+            'train_samples': train.stop - train.start,
+            'test_samples': test.stop - test.start,
+            'test_start': str(df.index[test.start + WINDOW]),
+            'mse': float(np.mean((predicted - actual) ** 2)),
+            'mae': float(np.mean(np.abs(predicted - actual))),
+            'baseline_mse': float(np.mean(actual ** 2)),  # always predicting "no change"
+            'direction_accuracy': float(np.mean(np.sign(predicted) == np.sign(actual))),
+            'train_seconds': elapsed,
+        }
+        report['folds'].append(fold)
+        logging.info(
+            f"Fold {k}: mse {fold['mse']:.6g} (baseline {fold['baseline_mse']:.6g}), "
+            f"direction {fold['direction_accuracy']:.1%}"
+        )
+
+    # Final model: the same persistent scaler the dashboard uses, fitted on everything
+    scaler = FeatureScaler()
+    scaler.update(df)
+    windows, labels = make_windows(scaler.scaler.transform(raw), price_change)
+    with analyzer.registry.get_lock(analyzer.model_key):
+        analyzer.model.fit(_dataset(windows, labels, batch_size, True), epochs=epochs, verbose=0)
+    analyzer.scaler.set_state(scaler.get_state())
+    analyzer.registry.bump_version(analyzer.model_key)
+    return report
+
+
+def main():
+    from .data_fetcher import CryptoDataFetcher
+    from .technical_analysis import TechnicalAnalyzer
+
+    parser = argparse.ArgumentParser(description="Walk-forward training of the prediction model")
+    parser.add_argument('--coin', default='btc')
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--min-train', type=int, default=100, help='Windows in the first training block')
+    parser.add_argument('--min-test', type=int, default=30, help='Fewest windows in a test block')
+    parser.add_argument('--threads', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    configure_threads(args.threads)
+    fetcher = CryptoDataFetcher()
+    df = load_history(fetcher, args.coin, args.timeframe)
+    if df.empty:
+        raise SystemExit(f"No candles available for {args.coin} {args.timeframe}")
+
+    analyzer = TechnicalAnalyzer(args.coin, args.timeframe)
+    samples = max(len(feature_frame(analyzer, df)) - WINDOW, 0)
+    folds = min(args.folds, max_folds(samples, args.min_train, args.min_test))
+    if folds == 0:
+        raise SystemExit(
+            f"{args.coin} {args.timeframe} has {samples} training windows; even one fold needs "
+            f"{args.min_train + args.min_test} (--min-train {args.min_train} plus --min-test {args.min_test}). "
+            f"The candle store extends the history as it keeps fetching; try again later, use a "
+            f"timeframe with more stored candles, or lower --min-train"
+        )
+    if folds < args.folds:
+        print(f"{samples} training windows only fit {folds} of the {args.folds} folds with at least "
+              f"{args.min_test} test windows each; running {folds}")
+    report = train_walk_forward(analyzer, df, folds, args.epochs, args.batch_size, args.min_train, args.min_test)
+    print(pd.DataFrame(report['folds']).to_string(index=False))
+
+    version = analyzer.registry.checkpoint(analyzer.model_key, metadata={'walk_forward': report})
+    print(f"Saved checkpoint v{version} for {analyzer.model_key}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()